@@ -0,0 +1,54 @@
+"""Benchmarks for the data plane and the hot loops of the shop.
+
+Run every benchmark with
+
+    python -m benchmarks --output results.json
+
+and compare against an earlier run with
+
+    python -m benchmarks --compare results.json
+
+Benchmarks live in the bench_*.py modules of this package and are
+registered with the benchmark decorator. A benchmark is a function of
+the run configuration which does its setup and returns the function
+to time along with the number of items that function processes, so
+that results can be reported as throughput. Setup is never timed.
+"""
+from typing import (
+    Callable,
+    Dict
+)
+
+# name -> benchmark
+BENCHMARKS: Dict[str, Callable] = {}
+
+
+def benchmark(name: str) -> Callable:
+    """Register a benchmark under a name."""
+    def register(func: Callable) -> Callable:
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def nothing():
+    """Cleanup for benchmarks which need none."""
+
+
+_TABLES = {}
+
+
+def make_table(rows: int, columns: int, seed: int = 0):
+    """Generate a regression table with DataGenerator.
+
+    Tables are cached, so benchmarks share them.
+    """
+    import pyarrow as pa
+    from themodelshop.utils.data.generateData import DataGenerator
+    key = (rows, columns, seed)
+    if key not in _TABLES:
+        generator = DataGenerator(
+            seed, 'regression', n_features=columns, n_informative=min(columns, 5)
+        )
+        _TABLES[key] = pa.Table.from_batches(list(generator.generate(rows)))
+    return _TABLES[key]
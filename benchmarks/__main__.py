@@ -0,0 +1,116 @@
+"""Run the benchmarks and store the results as JSON."""
+import argparse
+import importlib
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+import timeit
+
+import numpy as np
+import pyarrow as pa
+
+from benchmarks import BENCHMARKS
+
+_MODULES = sorted(
+    os.path.splitext(name)[0]
+    for name in os.listdir(os.path.dirname(__file__))
+    if name.startswith('bench_') and name.endswith('.py')
+)
+
+
+def run(config: argparse.Namespace) -> dict:
+    """Run every benchmark matching the filter."""
+    for module in _MODULES:
+        importlib.import_module(f"benchmarks.{module}")
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if config.filter and not re.search(config.filter, name):
+            continue
+        func, items, cleanup = bench(config)
+        try:
+            # Each run calls func enough times to last at least 0.2s.
+            timer = timeit.Timer(func)
+            number, _ = timer.autorange()
+            times = [
+                total / number
+                for total in timer.repeat(repeat=config.repeat, number=number)
+            ]
+        finally:
+            cleanup()
+        best = min(times)
+        results[name] = {
+            'best': best,
+            'median': statistics.median(times),
+            'number': number,
+            'items': items,
+            'throughput': items / best if best else None,
+        }
+        print(
+            f"{name:<40} {best * 1e3:>10.3f} ms {results[name]['throughput']:>14.1f} items/s",
+            flush=True
+        )
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Print the change from a baseline and flag regressions."""
+    regressed = False
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['best'] / baseline[name]['best']
+        flag = ''
+        if ratio > 1 + tolerance:
+            flag = '  REGRESSION'
+            regressed = True
+        print(f"{name:<40} {ratio:>8.2f}x{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('--rows', type=int, default=100000, help="Rows in generated tables.")
+    parser.add_argument('--columns', type=int, default=20, help="Feature columns in generated tables.")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs of each benchmark.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--filter', type=str, help="Only run benchmarks matching this pattern.")
+    parser.add_argument('--output', type=str, help="Write the results to this JSON file.")
+    parser.add_argument('--compare', type=str, help="Compare against results in this JSON file.")
+    parser.add_argument('--tolerance', type=float, default=.1, help="Slowdown flagged as a regression.")
+    config = parser.parse_args()
+    results = run(config)
+    if config.output:
+        with open(config.output, 'w') as f:
+            json.dump(
+                {
+                    'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'config': {
+                        key: value for key, value in vars(config).items()
+                        if key in ('rows', 'columns', 'repeat', 'seed')
+                    },
+                    'machine': {
+                        'python': platform.python_version(),
+                        'platform': platform.platform(),
+                        'processor': platform.processor(),
+                        'cpus': os.cpu_count(),
+                        'numpy': np.__version__,
+                        'pyarrow': pa.__version__,
+                    },
+                    'results': results,
+                },
+                f,
+                indent=2
+            )
+    if config.compare:
+        with open(config.compare) as f:
+            baseline = json.load(f)['results']
+        if compare(results, baseline, config.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
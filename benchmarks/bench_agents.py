@@ -0,0 +1,66 @@
+"""Benchmarks for conversions and the hot loops of the agents."""
+import numpy as np
+
+from benchmarks import (
+    benchmark,
+    make_table,
+    nothing
+)
+from themodelshop.labor_force import LaborPool
+from themodelshop.utils.data.convertors import standardize
+from themodelshop.utils.deprecate_convergence import (
+    ConvergenceMonitor,
+    check_for_convergence_batch
+)
+from themodelshop.utils.scoring import HPEScorer
+
+
+@benchmark('standardize.numpy')
+def standardize_numpy(config):
+    x = np.asfortranarray(
+        np.random.default_rng(config.seed).normal(size=(config.rows, config.columns))
+    )
+    return lambda: standardize(x), x.size, nothing
+
+
+@benchmark('standardize.pandas')
+def standardize_pandas(config):
+    df = make_table(config.rows, config.columns, config.seed).to_pandas()
+    return lambda: standardize(df), df.size, nothing
+
+
+@benchmark('labor_pool.hire')
+def hire(config):
+    pool = LaborPool('mspe', seed=config.seed)
+    pool.insert(mspe=np.random.default_rng(config.seed).uniform(size=10000))
+
+    def cycle():
+        pool.insert(**pool.hire(200))
+    return cycle, 200, nothing
+
+
+@benchmark('convergence.batch')
+def convergence_batch(config):
+    rng = np.random.default_rng(config.seed)
+    curves = np.exp(-np.linspace(0, 10, 1000)) + rng.normal(scale=1e-3, size=(200, 1000))
+    return lambda: check_for_convergence_batch(curves), len(curves), nothing
+
+
+@benchmark('convergence.monitor')
+def convergence_monitor(config):
+    values = np.exp(-np.linspace(0, 10, 10000))
+
+    def monitor():
+        watch = ConvergenceMonitor(buffer_size=50)
+        for value in values:
+            watch.update(value)
+    return monitor, len(values), nothing
+
+
+@benchmark('scoring.hpe')
+def hpe(config):
+    rng = np.random.default_rng(config.seed)
+    y = rng.normal(size=10000)
+    predictions = y + rng.normal(size=(50, 10000))
+    scorer = HPEScorer(y, n_bootstraps=100, seed=config.seed)
+    return lambda: scorer.score(predictions), predictions.size, nothing
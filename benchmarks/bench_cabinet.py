@@ -0,0 +1,91 @@
+"""Benchmarks for the filing cabinet and its catalog."""
+import pyarrow.flight as fl
+
+from benchmarks import (
+    benchmark,
+    make_table,
+    nothing
+)
+from themodelshop.file_cabinet import FileCabinet
+from themodelshop.utils.data.catalog import MetadataCatalog
+
+
+def _serve(config):
+    """Start a cabinet on a free port with a table filed in it."""
+    tbl = make_table(config.rows, config.columns, config.seed)
+    cabinet = FileCabinet(address="grpc://localhost:0")
+    client = fl.connect(f"grpc://localhost:{cabinet.port}")
+    ticket = cabinet.put(tbl)
+
+    def cleanup():
+        client.close()
+        cabinet.shutdown()
+    return tbl, cabinet, client, ticket, cleanup
+
+
+@benchmark('cabinet.flight.do_put')
+def flight_put(config):
+    tbl, cabinet, client, ticket, cleanup = _serve(config)
+    descriptor = fl.FlightDescriptor.for_path(ticket)
+
+    def put():
+        writer, reader = client.do_put(descriptor, tbl.schema)
+        writer.write_table(tbl)
+        writer.done_writing()
+        reader.read()
+        writer.close()
+    return put, tbl.num_rows, cleanup
+
+
+@benchmark('cabinet.flight.do_get')
+def flight_get(config):
+    tbl, cabinet, client, ticket, cleanup = _serve(config)
+
+    def get():
+        client.do_get(fl.Ticket(ticket)).read_all()
+    return get, tbl.num_rows, cleanup
+
+
+@benchmark('cabinet.put')
+def put(config):
+    tbl = make_table(config.rows, config.columns, config.seed)
+    cabinet = FileCabinet(address="grpc://localhost:0")
+    # Each put digests every column, even though the columns are
+    # only stored the first time.
+    return lambda: cabinet.put(tbl), tbl.num_rows, cabinet.shutdown
+
+
+@benchmark('cabinet.register')
+def register(config):
+    tbl = make_table(config.rows, config.columns, config.seed)
+    cabinet = FileCabinet(address="grpc://localhost:0")
+    return (
+        lambda: cabinet.register(tbl, {'source': 'benchmark'}),
+        tbl.num_rows,
+        cabinet.shutdown
+    )
+
+
+@benchmark('cabinet.get.filtered')
+def get_filtered(config):
+    tbl, cabinet, client, ticket, cleanup = _serve(config)
+    return (
+        lambda: cabinet.get(ticket, columns=['x0', 'y'], filters=[('x0', '>', 0)]),
+        tbl.num_rows,
+        cleanup
+    )
+
+
+def _catalog(size):
+    catalog = MetadataCatalog()
+    for i in range(size):
+        catalog.add({'ticket': str(i), 'kind': i % 10, 'owner': i % 97})
+    catalog.to_table()
+    return catalog
+
+
+for _size in (100, 10000, 100000):
+    @benchmark(f"catalog.query.{_size}")
+    def query(config, size=_size):
+        catalog = _catalog(size)
+        return lambda: catalog.query(kind=3, owner=5), 1, nothing
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from themodelshop.company_store import CompanyStore
+
+
+def _brute_force(models, losses, n_variables, window, decay):
+    """Compute the statistics directly from the last models."""
+    models, losses = models[-window:], np.array(losses[-window:])
+    used = np.zeros((len(models), n_variables), dtype=bool)
+    for row, variables in enumerate(models):
+        used[row, variables] = True
+    complexity = np.array([len(v) * np.log(len(v)) for v in models])
+    count = used.sum(axis=0)
+    weights = decay ** np.arange(len(models), 0, -1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        differential = (
+            (losses @ ~used) / (~used).sum(axis=0) - (losses @ used) / count
+        ) / losses.max()
+        return differential, (complexity @ used) / count, weights @ used / len(models)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('n_models', [10, 40, 150])
+def test_running_statistics(n_models):
+    rng = np.random.default_rng(0)
+    store = CompanyStore(8, window=30, decay=.9, alpha=50., rebase=45, seed=0)
+    models, losses = [], []
+    for _ in range(n_models):
+        variables = rng.choice(8, size=rng.integers(1, 8), replace=False)
+        loss = rng.uniform()
+        store.add_model(variables, loss)
+        models.append(variables)
+        losses.append(loss)
+    differential, complexity, frequency = _brute_force(models, losses, 8, 30, .9)
+    assert len(store) == min(n_models, 30)
+    assert store.max_loss == max(losses[-30:])
+    np.testing.assert_allclose(store.frequency(), frequency)
+    np.testing.assert_allclose(store.complexity(), complexity)
+    # With a large alpha only unused or always used variables explore.
+    explored = ~np.isfinite(differential)
+    np.testing.assert_allclose(
+        store.loss_differential()[~explored], differential[~explored]
+    )
+
+
+@pytest.mark.unit
+def test_extreme_decay():
+    rng = np.random.default_rng(0)
+    store = CompanyStore(8, window=2000, decay=.5, seed=0)
+    models, losses = [], []
+    for _ in range(2500):
+        variables = rng.choice(8, size=rng.integers(1, 8), replace=False)
+        loss = rng.uniform()
+        store.add_model(variables, loss)
+        models.append(variables)
+        losses.append(loss)
+    _, _, frequency = _brute_force(models, losses, 8, 2000, .5)
+    assert np.isfinite(store.frequency()).all()
+    np.testing.assert_allclose(store.frequency(), frequency)
+    assert np.isfinite(store.quote()).all()
+
+
+@pytest.mark.unit
+def test_quote():
+    store = CompanyStore(['a', 'b', 'c'], window=9, alpha=50., seed=0)
+    # Before any models every variable is explored.
+    assert (store.loss_differential() >= 0).all()
+    for _ in range(3):
+        store.add_model([0], 1.)
+        store.add_model([1], .1)
+        store.add_model([0, 1], .5)
+    prices = store.quote()
+    assert prices.shape == (3,)
+    assert (prices > 0).all()
+    # 'a' hurts, 'b' is predictive, and 'c' is unused.
+    assert prices[1] < prices[0] and prices[2] < prices[0]
+
+
+@pytest.mark.unit
+def test_signals():
+    def constant(store):
+        return np.ones(len(store.variables))
+    def pricing(constant, **signals):
+        return constant * 2
+    store = CompanyStore(4, signals=[constant], pricing=pricing)
+    assert set(store.show_signals()) == {
+        'loss_differential', 'complexity', 'frequency', 'constant'
+    }
+    np.testing.assert_array_equal(store.quote(), np.full(4, 2.))
@@ -0,0 +1,58 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pytest
+
+from themodelshop.employees.analyst import Analyst
+
+
+def _table(seed=0, n=5000):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=n)
+    y = 2 * x + rng.normal(size=n)
+    z = rng.uniform(size=n)
+    return pa.table({
+        'x': x,
+        'y': y,
+        'z': pa.array(z, mask=z < .1),
+        'label': pa.array(rng.choice(['a', 'b'], n)),
+    })
+
+
+@pytest.mark.unit
+def test_analyze():
+    tbl = _table()
+    report = Analyst(batch_size=700, seed=0).analyze(tbl, target='y').to_pydict()
+    assert report['column'] == ['x', 'y', 'z', 'label']
+    x = tbl['x'].to_numpy()
+    z = tbl['z'].drop_null().to_numpy()
+    np.testing.assert_allclose(report['mean'][0], x.mean())
+    np.testing.assert_allclose(report['variance'][0], x.var())
+    np.testing.assert_allclose(report['variance'][2], z.var())
+    assert report['min'][2] == z.min() and report['max'][2] == z.max()
+    assert report['count'][2] + report['nulls'][2] == 5000
+    assert report['nulls'][2] == 5000 - len(z)
+    np.testing.assert_allclose(
+        report['correlation'][0], np.corrcoef(x, tbl['y'].to_numpy())[0, 1]
+    )
+    np.testing.assert_allclose(report['correlation'][1], 1.)
+    assert abs(report['q0.5'][0] - np.median(x)) < .1
+    # Text columns only have counts.
+    assert report['count'][3] == 5000
+    assert report['mean'][3] is None and report['correlation'][3] is None
+
+
+@pytest.mark.unit
+def test_merge_and_stream(tmp_path):
+    first, second = _table(0), _table(1)
+    ds.write_dataset(first, tmp_path / 'first', format='parquet')
+    whole = Analyst(seed=0).analyze(pa.concat_tables([first, second]), target='y')
+    left, right = Analyst(seed=0), Analyst(seed=1)
+    left.analyze(ds.dataset(tmp_path / 'first', format='parquet'), target='y')
+    right.analyze(second.to_reader(max_chunksize=999), target='y')
+    merged = left.merge(right).report()
+    for column in ['count', 'nulls', 'min', 'max', 'mean', 'variance', 'correlation']:
+        np.testing.assert_allclose(
+            np.array(merged[column].to_pylist(), dtype=float),
+            np.array(whole[column].to_pylist(), dtype=float)
+        )
@@ -0,0 +1,85 @@
+import asyncio
+import multiprocessing
+import pyarrow as pa
+import pyarrow.flight as fl
+import pytest
+import socket
+
+from themodelshop.federation import (
+    Federation,
+    serve
+)
+
+
+def _free_ports(n):
+    sockets = [socket.socket() for _ in range(n)]
+    for sock in sockets:
+        sock.bind(('localhost', 0))
+    ports = [sock.getsockname()[1] for sock in sockets]
+    for sock in sockets:
+        sock.close()
+    return ports
+
+
+@pytest.mark.unit
+def test_federation(tmp_path):
+    locations = [f"grpc://localhost:{port}" for port in _free_ports(3)]
+    context = multiprocessing.get_context('spawn')
+    cabinets = [
+        context.Process(target=serve, args=(location, str(tmp_path / str(i))), daemon=True)
+        for i, location in enumerate(locations)
+    ]
+    for cabinet in cabinets:
+        cabinet.start()
+    # Filing is not retried, so wait for every cabinet to be up.
+    for location in locations:
+        with fl.connect(location) as client:
+            client.wait_for_available(timeout=30)
+    tbl = pa.table({'x': list(range(1000)), 'y': [float(i) for i in range(1000)]})
+
+    async def run():
+        async with Federation(locations, partition_rows=100, retries=8, backoff=.1) as federation:
+            ticket = await federation.put(tbl, 'large')
+            info = await federation.info(ticket)
+            assert len(info.endpoints) == 10
+            assert info.total_records == 1000
+            # Every partition is at the cabinet its name routes to.
+            holders = [endpoint.locations[0].uri.decode() for endpoint in info.endpoints]
+            assert holders == [federation.owner(f"{ticket}/{i}") for i in range(10)]
+            assert (await federation.get(ticket)).equals(tbl)
+            filtered = await federation.get(ticket, columns=['x'], filters=[('x', '>=', 950)])
+            assert filtered['x'].to_pylist() == list(range(950, 1000))
+            # Small datasets are a single partition on one cabinet.
+            small = await federation.put(tbl.slice(0, 5))
+            assert len((await federation.info(small)).endpoints) == 1
+            # Refiling with fewer partitions discards the rest.
+            await federation.put(tbl, 'refiled')
+            await federation.put(tbl.slice(0, 250), 'refiled')
+            assert len((await federation.info('refiled')).endpoints) == 3
+            assert (await federation.get('refiled')).equals(tbl.slice(0, 250))
+            filed = {
+                flight.descriptor.path[0].decode()
+                for location in locations
+                for flight in fl.connect(location).list_flights()
+            }
+            assert {name for name in filed if name.startswith('refiled/')} == {
+                'refiled/0', 'refiled/1', 'refiled/2'
+            }
+            return ticket
+    try:
+        ticket = asyncio.run(run())
+        # Any Flight client can follow the endpoints.
+        owner = fl.connect(Federation(locations).owner(ticket))
+        info = owner.get_flight_info(fl.FlightDescriptor.for_path(ticket))
+        parts = [
+            fl.connect(endpoint.locations[0]).do_get(endpoint.ticket).read_all()
+            for endpoint in info.endpoints
+        ]
+        assert pa.concat_tables(parts).equals(tbl)
+        assert ticket in [
+            flight.descriptor.path[0].decode() for flight in owner.list_flights()
+        ]
+    finally:
+        for cabinet in cabinets:
+            cabinet.terminate()
+            cabinet.join()
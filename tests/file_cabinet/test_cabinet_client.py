@@ -0,0 +1,75 @@
+import asyncio
+import pyarrow as pa
+import pyarrow.flight as fl
+import pytest
+import socket
+import threading
+
+from themodelshop.cabinet_client import CabinetClient
+from themodelshop.file_cabinet import FileCabinet
+
+
+def _table(n=95):
+    return pa.table({'x': list(range(n)), 'y': [float(i) for i in range(n)]})
+
+
+@pytest.mark.unit
+def test_client():
+    cabinet = FileCabinet(address="grpc://localhost:0", max_chunksize=10)
+
+    async def run():
+        async with CabinetClient(f"grpc://localhost:{cabinet.port}", pool_size=2, prefetch=2) as client:
+            ticket = await client.put(_table(), 'training')
+            assert ticket == 'training'
+            cabinet.register(_table(5), {'kind': 'small'})
+            tables = await asyncio.gather(*[client.get(ticket) for _ in range(6)])
+            assert all(tbl.equals(_table()) for tbl in tables)
+            filtered = await client.get(ticket, columns=['x'], filters=[('x', '<', 5)])
+            assert filtered['x'].to_pylist() == list(range(5))
+            batches = [batch async for batch in client.batches(ticket)]
+            assert len(batches) == 10
+            assert pa.Table.from_batches(batches).equals(_table())
+            # Stopping a stream early releases it.
+            async for batch in client.batches(ticket):
+                break
+            fetched = [name async for name, _ in client.get_many([ticket] * 5)]
+            assert fetched == [ticket] * 5
+            metadata = await client.query(kind='small')
+            assert metadata.num_rows == 1
+            assert (await client.query(kind='large')).num_rows == 0
+    try:
+        asyncio.run(run())
+    finally:
+        cabinet.shutdown()
+
+
+@pytest.mark.unit
+def test_reconnect():
+    # Find a free port, then only start the cabinet after the client
+    # has started trying to reach it.
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        port = sock.getsockname()[1]
+    cabinets = []
+    timer = threading.Timer(
+        .3,
+        lambda: cabinets.append(FileCabinet(address=f"grpc://localhost:{port}"))
+    )
+
+    async def run():
+        async with CabinetClient(f"grpc://localhost:{port}", retries=6, backoff=.05) as client:
+            # Filing is not repeated, since the cabinet may have
+            # acted on the first attempt.
+            with pytest.raises(fl.FlightUnavailableError):
+                await client.put(_table(), 'late')
+            timer.start()
+            metadata = await client.query()
+            return await client.put(_table(), 'late'), metadata
+    try:
+        ticket, metadata = asyncio.run(run())
+        assert ticket == 'late'
+        assert metadata.num_rows == 0
+    finally:
+        timer.join()
+        for cabinet in cabinets:
+            cabinet.shutdown()
@@ -0,0 +1,46 @@
+import asyncio
+import pyarrow as pa
+import pytest
+
+from themodelshop.cabinet_client import CabinetClient
+from themodelshop.file_cabinet import FileCabinet
+
+
+@pytest.mark.unit
+def test_derive():
+    cabinet = FileCabinet(address="grpc://localhost:0", max_chunksize=10)
+    try:
+        tbl = pa.table({'x': list(range(25)), 'y': [float(i) for i in range(25)]})
+        cabinet._put(tbl, 'data')
+        data = cabinet._manifests['data'][:]
+        derived = cabinet.derive('data', 'z', 'multiply', ['x', 'y'])
+        assert derived['z'].num_chunks == 3
+        assert cabinet._manifests['data'][:2] == data
+        assert cabinet.get('data')['z'].to_pylist() == [float(i * i) for i in range(25)]
+        # The dataset is found by its new content.
+        assert cabinet.put(cabinet.get('data')) == 'data'
+        with pytest.raises(ValueError):
+            cabinet.derive('data', 'z', 'add', ['x', 'y'])
+        with pytest.raises(KeyError):
+            cabinet.derive('data', 'w', 'bogus', ['x'])
+    finally:
+        cabinet.shutdown()
+
+
+@pytest.mark.unit
+def test_exchange():
+    cabinet = FileCabinet(address="grpc://localhost:0", max_chunksize=10)
+
+    async def run():
+        async with CabinetClient(f"grpc://localhost:{cabinet.port}") as client:
+            await client.put(pa.table({'x': [1., None, 3.]}), 'data')
+            derived = await client.transform('data', 'cube', 'power', ['x'], scalars=[3])
+            assert derived['cube'].to_pylist() == [1., None, 27.]
+            await client.transform('data', 'round', 'round', ['cube'], params={'ndigits': -1})
+            return await client.get('data')
+    try:
+        tbl = asyncio.run(run())
+        assert tbl.schema.names == ['x', 'cube', 'round']
+        assert tbl['round'].to_pylist() == [0., None, 30.]
+    finally:
+        cabinet.shutdown()
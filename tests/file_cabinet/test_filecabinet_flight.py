@@ -0,0 +1,191 @@
+import pyarrow as pa
+import pyarrow.flight as fl
+import pytest
+from themodelshop.file_cabinet import (
+    FileCabinet,
+    make_ticket,
+    open_local
+)
+from themodelshop.utils.data.content import column_digest
+from themodelshop.utils.data.generateData import DataGenerator
+
+
+@pytest.fixture
+def cabinet():
+    cabinet = FileCabinet(address="grpc://localhost:0", max_chunksize=10)
+    yield cabinet
+    cabinet.shutdown()
+
+
+@pytest.mark.unit
+def test_do_put_do_get(cabinet):
+    tbl = pa.table({'x': list(range(95)), 'y': [float(i) for i in range(95)]})
+    client = fl.connect(f"grpc://localhost:{cabinet.port}")
+    writer, reader = client.do_put(
+        fl.FlightDescriptor.for_path('training'),
+        tbl.schema
+    )
+    for batch in tbl.to_batches(max_chunksize=30):
+        writer.write_batch(batch)
+    writer.done_writing()
+    ticket = reader.read().to_pybytes().decode()
+    writer.close()
+    assert ticket == 'training'
+    assert cabinet.get(ticket).equals(tbl)
+    # The dataset is streamed back in batches of max_chunksize rows.
+    stream = client.do_get(fl.Ticket(ticket))
+    batches = [chunk.data for chunk in stream]
+    assert max(batch.num_rows for batch in batches) == 10
+    assert pa.Table.from_batches(batches).equals(tbl)
+
+
+@pytest.mark.unit
+def test_register_get(cabinet):
+    tbl = pa.table({'x': [1, 2, 3]})
+    ticket = cabinet.register(tbl, {'name': 'small'})
+    assert cabinet.get(ticket).equals(tbl)
+
+
+@pytest.mark.unit
+def test_projection_and_filters(cabinet):
+    tbl = pa.table({'x': list(range(100)), 'y': ['a', 'b'] * 50, 'z': [0.5] * 100})
+    ticket = cabinet.register(tbl, {'name': 'wide'})
+    expected = pa.table({'x': list(range(90, 100, 2))})
+    filters = [('x', '>=', 90), ('y', '==', 'a')]
+    assert cabinet.get(ticket, columns=['x'], filters=filters).equals(expected)
+    client = fl.connect(f"grpc://localhost:{cabinet.port}")
+    stream = client.do_get(make_ticket(ticket, columns=['x'], filters=filters))
+    assert stream.read_all().equals(expected)
+    # A list of lists of filters is combined with 'or'.
+    either = [[('x', '<', 2)], [('x', 'in', [50, 51])]]
+    assert cabinet.get(ticket, ['x'], either)['x'].to_pylist() == [0, 1, 50, 51]
+
+
+@pytest.mark.unit
+def test_query(cabinet):
+    first = cabinet.register(pa.table({'x': [1]}), {'name': 'a', 'kind': 'raw'})
+    cabinet.register(pa.table({'x': [2]}), {'name': 'b', 'kind': 'raw'})
+    assert cabinet.query().num_rows == 2
+    assert cabinet.query(name='a', kind='raw')['ticket'].to_pylist() == [first]
+
+
+@pytest.mark.unit
+def test_open_local(tmp_path):
+    cabinet = FileCabinet(
+        location=str(tmp_path),
+        address="grpc://localhost:0",
+        persist=True
+    )
+    tbl = pa.table({'x': list(range(1000))})
+    ticket = cabinet.register(tbl, {'name': 'shared'})
+    paths = cabinet.local_paths(ticket)
+    assert list(paths) == ['x']
+    assert paths['x'].startswith(str(tmp_path))
+    client = fl.connect(f"grpc://localhost:{cabinet.port}")
+    before = pa.total_allocated_bytes()
+    local = open_local(client, ticket)
+    # The memory mapped table is not allocated on the heap.
+    assert pa.total_allocated_bytes() == before
+    assert local.equals(tbl)
+    cabinet.shutdown()
+
+
+@pytest.mark.unit
+def test_deduplication(cabinet):
+    tbl = pa.table({'x': list(range(100)), 'y': [0.5] * 100})
+    ticket = cabinet.register(tbl, {'name': 'base'})
+    assert cabinet.register(tbl, {'name': 'again'}) == ticket
+    # The ticket keeps one row of metadata, holding the latest fields.
+    assert cabinet.query(ticket=ticket)['name'].to_pylist() == ['again']
+    assert cabinet.query(name='base').num_rows == 0
+    derived = tbl.append_column('z', pa.array([1.5] * 100))
+    child = cabinet.register(derived, {'name': 'derived'})
+    assert child != ticket
+    # Only the new column is stored.
+    assert len(cabinet._data) == 3
+    assert cabinet.get(child).equals(derived)
+    lineage = cabinet.query(name='derived')
+    assert lineage['parent'].to_pylist() == [ticket]
+    assert lineage['derived_columns'].to_pylist() == [['z']]
+
+
+@pytest.mark.unit
+def test_generated_put(cabinet):
+    generator = DataGenerator(11, 'regression', n_features=4)
+    client = fl.connect(f"grpc://localhost:{cabinet.port}")
+    ticket = generator.to_cabinet(client, 'generated', 250, chunk_size=100)
+    expected = DataGenerator(11, 'regression', n_features=4).generate(250, chunk_size=100)
+    assert cabinet.get(ticket).equals(pa.Table.from_batches(list(expected)))
+
+
+@pytest.mark.unit
+def test_streamed_digests(cabinet):
+    tbl = pa.table({'x': list(range(90)), 'y': ['a'] * 90})
+    client = fl.connect(f"grpc://localhost:{cabinet.port}")
+
+    def upload():
+        writer, reader = client.do_put(
+            fl.FlightDescriptor.for_command(b''),
+            tbl.schema
+        )
+        for batch in tbl.to_batches(max_chunksize=25):
+            writer.write_batch(batch)
+        writer.done_writing()
+        ticket = reader.read().to_pybytes().decode()
+        writer.close()
+        return ticket
+
+    ticket = upload()
+    # Digests computed as the batches arrive match those of the table.
+    filed = cabinet.get(ticket)
+    assert cabinet._manifests[ticket] == [
+        column_digest(column) for column in filed.columns
+    ]
+    assert upload() == ticket
+    assert len(cabinet._data) == 2
+
+
+@pytest.mark.unit
+def test_refile(cabinet):
+    first = pa.table({'x': [1, 2, 3]})
+    second = pa.table({'x': [4, 5, 6]})
+    cabinet._put(first, 't')
+    cabinet._put(second, 't')
+    assert cabinet.get('t').equals(second)
+    # The first table is no longer filed anywhere.
+    assert cabinet.put(first) != 't'
+    assert cabinet.put(second) == 't'
+    assert cabinet.get('t').equals(second)
+
+
+@pytest.mark.unit
+def test_concurrent_put_get(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    cabinet = FileCabinet(
+        location=str(tmp_path),
+        address="grpc://localhost:0",
+        memory_budget=200_000
+    )
+
+    # Flight handles requests on many threads while columns spill.
+    def work(worker):
+        for i in range(200):
+            tbl = pa.table({'x': [worker * 1000 + i] * 2000, 'y': [float(i)] * 2000})
+            assert cabinet._get(cabinet._put(tbl)).equals(tbl)
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(work, range(8)))
+    finally:
+        cabinet.shutdown()
+
+
+@pytest.mark.unit
+def test_discard(cabinet):
+    client = fl.connect(f"grpc://localhost:{cabinet.port}")
+    actions = {action.type for action in client.list_actions()}
+    assert actions == {'discard', 'federate', 'local_paths', 'propose', 'query'}
+    ticket = cabinet.put(pa.table({'x': [1, 2, 3]}))
+    list(client.do_action(fl.Action('discard', ticket.encode())))
+    assert ticket not in [
+        flight.descriptor.path[0].decode() for flight in client.list_flights()
+    ]
@@ -34,6 +34,7 @@ def test_null_init():
     for attr in required_attr:
         if not hasattr(cabinet,attr):
             raise AttributeError(f"Filing cabinet is missing {attr}")
+    cabinet.shutdown()
 
 def test_serve():
     cabinet = FileCabinet()
\ No newline at end of file
@@ -0,0 +1,49 @@
+import asyncio
+import pyarrow as pa
+import pytest
+
+from themodelshop.cabinet_client import CabinetClient
+from themodelshop.file_cabinet import FileCabinet
+
+
+@pytest.mark.unit
+def test_propose(tmp_path):
+    n = 1000
+    tbl = pa.table({'x': [float(i) for i in range(n)], 'y': [2.] * n})
+    cabinet = FileCabinet(location=str(tmp_path), address="grpc://localhost:0")
+    try:
+        cabinet.put(tbl)
+        ticket = cabinet.put(pa.table({'x': tbl['x'], 'y': tbl['y'], 'z': [1.] * n}))
+        first = cabinet.propose(ticket, 'xy', 'multiply', ['x', 'y'])
+        # A second agent proposing the same feature shares the column.
+        assert cabinet.propose(ticket, 'product', 'multiply', ['x', 'y']) == first
+        cabinet.propose(ticket, 'root', 'sqrt', ['xy'])
+        graph = cabinet.expression_graph()
+        assert graph.num_rows == 2
+        assert not any(graph['materialized'].to_pylist())
+        assert cabinet.get(ticket, columns=['root'])['root'].to_pylist() == [
+            (2. * i) ** .5 for i in range(n)
+        ]
+        assert all(cabinet.expression_graph()['materialized'].to_pylist())
+        # Dropped columns are computed again when they are read.
+        for digest in cabinet.expression_graph()['digest'].to_pylist():
+            del cabinet._data[digest]
+        assert cabinet.get(ticket)['product'].equals(cabinet.get(ticket)['xy'])
+        assert all(cabinet.expression_graph()['materialized'].to_pylist())
+    finally:
+        cabinet.shutdown()
+
+
+@pytest.mark.unit
+def test_propose_remotely():
+    cabinet = FileCabinet(address="grpc://localhost:0")
+
+    async def run():
+        async with CabinetClient(f"grpc://localhost:{cabinet.port}") as client:
+            ticket = await client.put(pa.table({'x': [1., 4., 9.]}))
+            await client.propose(ticket, 'root', 'sqrt', ['x'])
+            return await client.get(ticket)
+    try:
+        assert asyncio.run(run())['root'].to_pylist() == [1., 2., 3.]
+    finally:
+        cabinet.shutdown()
@@ -0,0 +1,69 @@
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.flight as fl
+import pyarrow.parquet as pq
+import pytest
+
+from themodelshop.file_cabinet import FileCabinet
+
+
+def _table(n=1000):
+    return pa.table({
+        'x': list(range(n)),
+        'y': [float(i) for i in range(n)],
+        'kind': [['a', 'b', 'c'][i % 3] for i in range(n)],
+    })
+
+
+@pytest.mark.unit
+def test_close_and_open(tmp_path):
+    cabinet = FileCabinet(location=str(tmp_path), address="grpc://localhost:0")
+    try:
+        ticket = cabinet.register(_table(), {'stage': 'raw'})
+        cabinet.propose(ticket, 'double', 'add', ['y', 'y'])
+        grouped = cabinet.put(_table(30))
+        cabinet.federate('remote', _table().schema, [['grpc://elsewhere:8815', 10]])
+        cabinet.close(row_group_size=100, partition_by={grouped: ['kind']})
+        # The datasets are still available after closing.
+        assert cabinet.get(ticket, filters=[('x', '<', 3)])['double'].to_pylist() == [0., 2., 4.]
+    finally:
+        cabinet.shutdown()
+    root = tmp_path / 'cabinet'
+    parquet = pq.ParquetFile(next((root / ticket).glob('*.parquet')))
+    # Proposed columns are not computed when closing.
+    assert parquet.schema_arrow.names == ['x', 'y', 'kind']
+    metadata = parquet.metadata
+    assert metadata.num_row_groups == 10
+    kind = metadata.row_group(0).column(2)
+    assert kind.statistics.has_min_max
+    assert 'RLE_DICTIONARY' in kind.encodings
+    assert sorted(p.name for p in (root / grouped).iterdir()) == ['kind=a', 'kind=b', 'kind=c']
+
+    reopened = FileCabinet(location=str(tmp_path), address="grpc://localhost:0")
+    try:
+        reopened.open()
+        assert reopened.query(stage='raw')['ticket'].to_pylist() == [ticket]
+        assert reopened.query(stage='raw')['parent'].to_pylist() == [None]
+        graph = reopened.expression_graph()
+        assert graph['transform'].to_pylist() == ['add']
+        assert graph['materialized'].to_pylist() == [False]
+        # Filters skip the row groups which cannot match.
+        dataset, _ = reopened._datasets[ticket]
+        fragment = next(dataset.get_fragments())
+        assert len(fragment.split_by_row_group(ds.field('x') >= 950)) == 1
+        tbl = reopened.get(ticket, columns=['x', 'double'], filters=[('x', '>=', 995)])
+        assert tbl['double'].to_pylist() == [2. * i for i in range(995, 1000)]
+        assert reopened.expression_graph()['materialized'].to_pylist() == [True]
+        assert reopened.get(grouped).equals(_table(30))
+        assert reopened.get(ticket).drop_columns(['double']).equals(_table())
+        # Data filed before closing is found by its content.
+        assert reopened.put(_table(30)) == grouped
+        info = reopened._flight_info(fl.FlightDescriptor.for_path('remote'), 'remote')
+        assert info.endpoints[0].locations[0].uri == b'grpc://elsewhere:8815'
+        # Closing again only writes datasets which changed.
+        written = (root / ticket / 'part-0.parquet').stat().st_mtime_ns
+        reopened.close(row_group_size=100)
+        assert (root / ticket / 'part-0.parquet').stat().st_mtime_ns == written
+        assert reopened.get(grouped).equals(_table(30))
+    finally:
+        reopened.shutdown()
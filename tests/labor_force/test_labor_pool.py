@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from themodelshop.labor_force import LaborPool
+
+
+@pytest.mark.unit
+def test_seed_pool():
+    pool = LaborPool('mspe', maxlen=100, seed=0)
+    slots = pool.seed_pool({'mspe': 0.5}, copies=10)
+    assert len(pool) == 10
+    assert len(slots) == 10
+    workers = pool.workers()
+    np.testing.assert_array_equal(workers['mspe'], np.full(10, 0.5))
+    # Every copy is given its own random integer.
+    assert len(np.unique(workers['seed'])) == 10
+
+
+@pytest.mark.unit
+def test_ring_evicts_oldest():
+    pool = LaborPool('mspe', maxlen=8, seed=0)
+    pool.insert(mspe=np.arange(6.))
+    pool.insert(mspe=np.arange(6., 12.))
+    assert len(pool) == 8
+    assert set(pool.workers()['mspe']) == set(np.arange(4., 12.))
+    # Hired workers leave empty slots which are filled first.
+    hired = pool.hire(3)
+    pool.insert(mspe=[20., 21., 22.])
+    assert len(pool) == 8
+    assert set(pool.workers()['mspe']) == (
+        set(np.arange(4., 12.)) - set(hired['mspe'])
+    ) | {20., 21., 22.}
+    with pytest.raises(KeyError):
+        pool.insert(accuracy=1.)
+
+
+@pytest.mark.unit
+def test_hire_without_replacement():
+    pool = LaborPool('mspe', maxlen=10000, seed=0)
+    pool.insert(mspe=np.random.default_rng(0).uniform(0, 10, 10000))
+    hired = pool.hire(500)
+    assert len(hired['mspe']) == 500
+    assert len(np.unique(hired['seed'])) == 500
+    assert len(pool) == 9500
+    # Hired workers have left the pool.
+    assert not np.isin(hired['seed'], pool.workers()['seed']).any()
+    # Low error workers are preferred.
+    assert hired['mspe'].mean() < pool.workers()['mspe'].mean()
+    # Hiring more than the pool holds hires everyone.
+    assert len(pool.hire(20000)['mspe']) == 9500
+    assert len(pool) == 0
+    assert len(pool.hire(1)['mspe']) == 0
+
+
+@pytest.mark.unit
+def test_empty():
+    pool = LaborPool('mspe', maxlen=4, seed=0)
+    np.testing.assert_array_equal(pool.probabilities(), np.zeros(4))
+    assert len(pool.insert(mspe=[])) == 0
+    assert len(pool) == 0
+    np.testing.assert_array_equal(pool.probabilities(), np.zeros(4))
+
+
+@pytest.mark.unit
+def test_hiring_follows_softmax():
+    pool = LaborPool('mspe', maxlen=4, seed=0)
+    pool.insert(mspe=[0., 1., 2., 3.])
+    probabilities = pool.probabilities()
+    expected = np.exp(-np.arange(4.)) / np.exp(-np.arange(4.)).sum()
+    np.testing.assert_allclose(probabilities, expected)
+    counts = np.zeros(4)
+    for seed in range(4000):
+        pool = LaborPool('mspe', maxlen=4, seed=seed)
+        pool.insert(mspe=[0., 1., 2., 3.])
+        counts[int(pool.hire(1)['mspe'][0])] += 1
+    np.testing.assert_allclose(counts / counts.sum(), expected, atol=.03)
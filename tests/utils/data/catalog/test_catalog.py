@@ -0,0 +1,78 @@
+import pyarrow as pa
+import pytest
+from themodelshop.utils.data.catalog import (
+    MetadataCatalog,
+    MetaDataError
+)
+
+
+@pytest.mark.unit
+def test_query():
+    catalog = MetadataCatalog(flush_size=3)
+    for i in range(10):
+        catalog.add({'ticket': str(i), 'x': i % 2, 'y': i % 3})
+    # Fields which were not seen before are null for earlier rows.
+    catalog.add({'ticket': '10', 'x': 0, 'kind': 'derived'})
+    assert len(catalog) == 11
+    assert catalog.to_table().num_rows == 11
+    assert catalog.query(x=0, y=0)['ticket'].to_pylist() == ['0', '6']
+    assert catalog.query(kind='derived')['y'].to_pylist() == [None]
+    assert catalog.query(x=5).num_rows == 0
+    with pytest.raises(MetaDataError):
+        catalog.query(z=1)
+
+
+@pytest.mark.unit
+def test_update():
+    catalog = MetadataCatalog(flush_size=2)
+    for i in range(5):
+        catalog.add({'ticket': str(i), 'x': i % 2})
+    catalog.update(3, {'x': 0, 'kind': 'fixed'})
+    assert len(catalog) == 5
+    assert catalog.to_table()['ticket'].to_pylist() == ['0', '1', '2', '3', '4']
+    assert catalog.query(x=0)['ticket'].to_pylist() == ['0', '2', '3', '4']
+    assert catalog.query(x=1)['ticket'].to_pylist() == ['1']
+    assert catalog.query(kind='fixed')['ticket'].to_pylist() == ['3']
+    with pytest.raises(IndexError):
+        catalog.update(5, {'x': 1})
+
+
+@pytest.mark.unit
+def test_typed_keys():
+    catalog = MetadataCatalog()
+    catalog.add({'ticket': 'int', 'value': 1})
+    catalog.add({'ticket': 'bool', 'value': True})
+    catalog.add({'ticket': 'float', 'value': 1.0})
+    assert catalog.rows(value=1) == [0]
+    assert catalog.rows(value=True) == [1]
+    assert catalog.rows(value=1.0) == [2]
+
+
+@pytest.mark.unit
+def test_failed_flush():
+    catalog = MetadataCatalog(flush_size=2)
+    catalog.add({'ticket': 'a', 'x': 1})
+    with pytest.raises(pa.ArrowException):
+        catalog.add({'ticket': 'b', 'x': 'one'})
+    # The rejected row is neither counted nor indexed.
+    assert len(catalog) == 1
+    assert catalog.rows(ticket='b') == []
+    catalog.add({'ticket': 'c', 'x': 2})
+    assert catalog.query(x=2)['ticket'].to_pylist() == ['c']
+
+
+@pytest.mark.unit
+def test_update_keeps_other_rows():
+    catalog = MetadataCatalog(flush_size=4)
+    for i in range(10):
+        catalog.add({'ticket': str(i), 'kind': 'raw'})
+    catalog.update(4, {'kind': 'clean'})
+    catalog.update(4, {'kind': 'final'})
+    catalog.update(7, {'kind': 'clean'})
+    assert catalog.rows(kind='raw') == [0, 1, 2, 3, 5, 6, 8, 9]
+    assert catalog.rows(kind='clean') == [7]
+    assert catalog.rows(kind='final') == [4]
+    # A value can not be changed to one Arrow can not hold with the rest.
+    with pytest.raises(pa.ArrowException):
+        catalog.update(5, {'kind': 1})
+    assert catalog.rows(kind='raw') == [0, 1, 2, 3, 5, 6, 8, 9]
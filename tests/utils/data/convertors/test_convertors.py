@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from themodelshop.utils.data.convertors import standardize
+
+
+@pytest.mark.unit
+def test_zero_copy_numpy():
+    features = np.asfortranarray(np.random.default_rng(0).normal(size=(1000, 4)))
+    tbl, report = standardize(features, report=True)
+    assert not report.copied
+    assert tbl.column_names == ['x0', 'x1', 'x2', 'x3']
+    np.testing.assert_array_equal(tbl['x2'].to_numpy(), features[:, 2])
+    # Rows of a C ordered array are contiguous, its columns are not.
+    _, report = standardize(np.ascontiguousarray(features), report=True)
+    assert report.bytes_copied == features.nbytes
+
+
+@pytest.mark.unit
+def test_zero_copy_pandas():
+    df = pd.DataFrame({
+        'x': np.arange(1000, dtype=float),
+        'y': np.arange(1000),
+        'label': ['a', 'b'] * 500,
+    })
+    tbl, report = standardize(df, report=True)
+    assert list(report.copies) == ['label']
+    assert pa.types.is_dictionary(tbl['label'].type)
+    assert tbl['label'].to_pylist() == df['label'].tolist()
+    assert tbl['y'].to_pylist() == df['y'].tolist()
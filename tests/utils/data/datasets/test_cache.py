@@ -0,0 +1,78 @@
+import hashlib
+import pyarrow as pa
+import pytest
+from themodelshop.utils.data import datasets as ds
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'source.csv'
+    path.write_text('a,b\n1,x\n2,y\n')
+    return path
+
+
+@pytest.mark.unit
+def test_cached(source, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    url = source.as_uri()
+    tbl, _ = ds.cached(url, 'source', cache_dir=cache_dir)
+    assert tbl.equals(pa.table({'a': [1, 2], 'b': ['x', 'y']}))
+    # Once cached the source is never read again.
+    source.unlink()
+    before = pa.total_allocated_bytes()
+    cached, httpmsg = ds.cached(url, 'source', cache_dir=cache_dir, offline=True, verify=True)
+    assert pa.total_allocated_bytes() == before
+    assert cached.equals(tbl)
+    assert httpmsg['Content-type'] == 'text/csv'
+
+
+@pytest.mark.unit
+def test_checksum(source, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    url = source.as_uri()
+    with pytest.raises(FileNotFoundError):
+        ds.cached(url, 'source', cache_dir=cache_dir, offline=True)
+    with pytest.raises(ValueError):
+        ds.cached(url, 'source', sha256='0' * 64, cache_dir=cache_dir)
+    checksum = hashlib.sha256(source.read_bytes()).hexdigest()
+    tbl, _ = ds.cached(url, 'source', sha256=checksum, cache_dir=cache_dir)
+    assert tbl.num_rows == 2
+
+
+@pytest.mark.unit
+def test_retries(source, tmp_path, monkeypatch):
+    cache_dir = tmp_path / 'cache'
+    attempts = []
+    urlretrieve = ds.urlretrieve
+
+    def flaky(url, path):
+        attempts.append(url)
+        if len(attempts) < 3:
+            raise ds.ContentTooShortError('cut short', None)
+        return urlretrieve(url, path)
+
+    monkeypatch.setattr(ds, 'urlretrieve', flaky)
+    tbl, _ = ds.cached(source.as_uri(), 'source', retries=3, cache_dir=str(cache_dir))
+    assert tbl.num_rows == 2
+    assert len(attempts) == 3
+    # Only the cached dataset and its record are left behind.
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+@pytest.mark.unit
+def test_permanent_failure(tmp_path, monkeypatch):
+    cache_dir = tmp_path / 'cache'
+    attempts = []
+    urlretrieve = ds.urlretrieve
+
+    def counted(url, path):
+        attempts.append(url)
+        return urlretrieve(url, path)
+
+    monkeypatch.setattr(ds, 'urlretrieve', counted)
+    missing = (tmp_path / 'missing.csv').as_uri()
+    with pytest.raises(FileNotFoundError):
+        ds.cached(missing, 'missing', retries=3, cache_dir=str(cache_dir))
+    # A missing file is not retried, and nothing is left in the cache.
+    assert len(attempts) == 1
+    assert list(cache_dir.iterdir()) == []
@@ -0,0 +1,36 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from themodelshop.utils.data.generateData import (
+    DataGenerator,
+    InputError
+)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('problem_domain', ['classification', 'regression'])
+def test_reproducible_across_workers(problem_domain):
+    serial = DataGenerator(7, problem_domain).generate(1050, chunk_size=100)
+    parallel = DataGenerator(7, problem_domain).generate(1050, chunk_size=100, n_jobs=2)
+    serial = pa.Table.from_batches(list(serial))
+    parallel = pa.Table.from_batches(list(parallel))
+    assert serial.num_rows == 1050
+    assert serial.num_columns == 21
+    assert serial.equals(parallel)
+
+
+@pytest.mark.unit
+def test_to_parquet(tmp_path):
+    generator = DataGenerator(3, 'classification', n_features=5, n_informative=3, n_classes=3)
+    generator.to_parquet(str(tmp_path / 'data.parquet'), 500, chunk_size=128)
+    tbl = pq.read_table(str(tmp_path / 'data.parquet'))
+    assert tbl.schema.equals(generator.schema)
+    assert set(tbl['y'].to_pylist()) == {0, 1, 2}
+
+
+@pytest.mark.unit
+def test_verify_args():
+    with pytest.raises(InputError):
+        DataGenerator(0, 'segmentation')
+    with pytest.raises(InputError):
+        DataGenerator(0, 'classification', n_features=3)
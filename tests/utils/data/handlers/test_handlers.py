@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from themodelshop.utils.data import handlers
+from themodelshop.utils.data.convertors import standardize
+
+
+@pytest.mark.unit
+def test_dispatch():
+    expected = pa.table({'x': [1, 2, 3]})
+    objects = [
+        expected,
+        expected.to_batches()[0],
+        pa.RecordBatchReader.from_batches(expected.schema, expected.to_batches()),
+        pd.DataFrame({'x': [1, 2, 3]}),
+        np.array([1, 2, 3]),
+    ]
+    for obj in objects:
+        assert standardize(obj).equals(expected)
+    with pytest.raises(TypeError):
+        standardize(object())
+
+
+@pytest.fixture
+def clean_registry(monkeypatch):
+    """Restore the handler registry once the test is done."""
+    handlers._discover()
+    monkeypatch.setattr(handlers, '_REGISTRY', dict(handlers._REGISTRY))
+    monkeypatch.setattr(handlers, '_LOADED', dict(handlers._LOADED))
+
+
+@pytest.mark.unit
+def test_extra_handlers(tmp_path, clean_registry):
+    (tmp_path / 'handle_builtins_dict.py').write_text(
+        "import pyarrow as pa\n"
+        "def standardize(obj, report=None):\n"
+        "    return pa.table(obj)\n"
+    )
+    for key, source in handlers._get_handlers(str(tmp_path)).items():
+        if key == 'builtins.dict':
+            handlers.register_handler(key, source)
+    assert standardize({'x': [1]}).equals(pa.table({'x': [1]}))
+    assert 'builtins.dict' in handlers.registered_handlers()
+
+
+@pytest.mark.unit
+def test_concurrent_discovery(monkeypatch):
+    monkeypatch.setattr(handlers, '_REGISTRY', {})
+    monkeypatch.setattr(handlers, '_LOADED', {})
+    monkeypatch.setattr(handlers, '_DISCOVERED', False)
+    expected = pa.table({'x': [1, 2, 3]})
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: standardize(expected), range(32)))
+    assert all(result.equals(expected) for result in results)
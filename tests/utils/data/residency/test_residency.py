@@ -0,0 +1,48 @@
+import pyarrow as pa
+import pytest
+from themodelshop.utils.data.residency import ResidencyManager
+
+
+@pytest.mark.unit
+def test_spill_and_reload(tmp_path):
+    tables = {i: pa.table({'x': [i] * 1000}) for i in range(3)}
+    size = tables[0].get_total_buffer_size()
+    data = ResidencyManager(str(tmp_path), budget=2 * size)
+    data[0] = tables[0]
+    data[1] = tables[1]
+    # Touching 0 makes 1 the least recently used table.
+    data[0]
+    data[2] = tables[2]
+    assert data.used == 2 * size
+    assert not data.is_resident(1)
+    assert (tmp_path / '1.arrow').exists()
+    assert data[1].equals(tables[1])
+    assert sorted(data) == [0, 1, 2]
+    del data[1]
+    assert not (tmp_path / '1.arrow').exists()
+    assert 1 not in data
+
+
+@pytest.mark.unit
+def test_write_through(tmp_path):
+    data = ResidencyManager(str(tmp_path), write_through=True)
+    data['a'] = pa.table({'x': [1, 2, 3]})
+    assert data.used == 0
+    assert data.persist('a') == str(tmp_path / 'a.arrow')
+    assert data['a']['x'].to_pylist() == [1, 2, 3]
+
+
+@pytest.mark.unit
+def test_memoize(tmp_path):
+    tables = {i: pa.table({'x': [i] * 1000}) for i in range(3)}
+    size = tables[0].get_total_buffer_size()
+    data = ResidencyManager(str(tmp_path), budget=2 * size, bandwidth=size)
+    # Computing 0 took longer than spilling it, computing 1 did not.
+    data.memoize(0, tables[0], cost=10.)
+    data.memoize(1, tables[1], cost=.1)
+    data[2] = tables[2]
+    assert data.is_resident(0) and data.is_memoized(0)
+    assert 1 not in data
+    assert not (tmp_path / '1.arrow').exists()
+    assert data.persist(0) == str(tmp_path / '0.arrow')
+    assert not data.is_memoized(0)
@@ -0,0 +1,23 @@
+import pytest
+
+from collections import Counter
+from themodelshop.utils.data.routing import HashRing
+
+
+@pytest.mark.unit
+def test_ring():
+    nodes = [f"grpc://localhost:{port}" for port in range(9000, 9004)]
+    ring = HashRing(nodes)
+    keys = [f"ticket/{i}" for i in range(4000)]
+    placed = {key: ring.node(key) for key in keys}
+    assert placed == {key: HashRing(nodes).node(key) for key in keys}
+    counts = Counter(placed.values())
+    assert set(counts) == set(nodes)
+    assert min(counts.values()) > 500
+    # Removing a node only moves the keys it owned.
+    ring.remove(nodes[0])
+    moved = [key for key in keys if ring.node(key) != placed[key]]
+    assert all(placed[key] == nodes[0] for key in moved)
+    assert len(moved) == counts[nodes[0]]
+    with pytest.raises(LookupError):
+        HashRing().node('ticket')
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from themodelshop.secretary import Secretary
+from themodelshop.utils.data.transactions import TransactionLog
+
+
+@pytest.mark.unit
+def test_rollover(tmp_path):
+    log = TransactionLog(capacity=100, location=str(tmp_path))
+    log.record(np.arange(250) % 5, 'purchase', np.arange(250), 2.)
+    assert len(log) == 250
+    assert len(log.parts) == 2
+    tbl = log.to_table()
+    assert tbl.num_rows == 250
+    # Transactions come back in the order they were made.
+    np.testing.assert_array_equal(tbl['variable_id'].to_numpy(), np.arange(250))
+    assert log.to_table(agent_id=3).num_rows == 50
+    with pytest.raises(KeyError):
+        log.to_table(employee=3)
+    with pytest.raises(ValueError):
+        log.record(1, 'promote')
+
+
+@pytest.mark.unit
+def test_shared_location(tmp_path):
+    first = TransactionLog(capacity=10, location=str(tmp_path))
+    second = TransactionLog(capacity=10, location=str(tmp_path))
+    first.record(1, 'purchase', np.arange(10))
+    second.record(2, 'purchase', np.arange(10))
+    # Neither log overwrites the files of the other.
+    assert not set(first.parts) & set(second.parts)
+    assert first.to_table()['agent_id'].to_pylist() == [1] * 10
+    assert second.to_table()['agent_id'].to_pylist() == [2] * 10
+
+
+@pytest.mark.unit
+def test_default_location(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    log = TransactionLog(capacity=10)
+    log.record(1, 'hire', np.arange(10))
+    assert len(log.parts) == 1
+    # Nothing is written relative to the working directory.
+    assert not any(tmp_path.iterdir())
+    secretary = Secretary(max_transactions=10, location=str(tmp_path / 'shop'))
+    secretary.record_transaction(0, 'purchase', np.arange(10))
+    assert (tmp_path / 'shop' / 'transactions').is_dir()
+
+
+@pytest.mark.unit
+def test_report(tmp_path):
+    log = TransactionLog(capacity=7, location=str(tmp_path))
+    log.record([1, 2], 'hire', timestamp=[0, 1])
+    log.record(1, 'purchase', [4, 5, 6], [1., 2., 3.], timestamp=2)
+    log.record(2, 'purchase', 4, 10., timestamp=3)
+    log.record(2, 'fire', timestamp=4)
+    report = log.report().to_pydict()
+    assert report['agent_id'] == [1, 2]
+    assert report['n_hire'] == [1, 1]
+    assert report['n_purchase'] == [3, 1]
+    assert report['n_fire'] == [0, 1]
+    assert report['spent'] == [6., 10.]
+    by_variable = log.report('variable_id').to_pydict()
+    assert by_variable['variable_id'] == [-1, 4, 5, 6]
+    assert by_variable['spent'] == [0., 11., 2., 3.]
+
+
+@pytest.mark.unit
+def test_secretary_report():
+    secretary = Secretary(max_transactions=10)
+    secretary.record_transaction(0, 'hire')
+    secretary.record_transaction(0, 'purchase', [1, 2], 1.)
+    report = secretary.employee_report().to_pydict()
+    assert report['n_purchase'] == [2]
+    assert report['spent'] == [2.]
@@ -0,0 +1,29 @@
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from themodelshop.utils.data import transforms
+from themodelshop.utils.data.transforms import (
+    get_transform,
+    register_transform,
+    registered_transforms
+)
+
+
+@pytest.fixture
+def clean_registry(monkeypatch):
+    """Restore the transform registry once the test is done."""
+    monkeypatch.setattr(transforms, '_TRANSFORMS', dict(transforms._TRANSFORMS))
+
+
+@pytest.mark.unit
+def test_transforms(clean_registry):
+    x = pa.array([1., None, 8.])
+    assert get_transform('cbrt')(x).to_pylist() == [1., None, 2.]
+    hypot = get_transform('hypot')(pa.array([3., 5.]), pa.array([4., 12.]))
+    assert np.allclose(hypot.to_numpy(), [5., 13.])
+    assert get_transform('add')(x, x).to_pylist() == [2., None, 16.]
+    register_transform('double', lambda values: values.cast(pa.float64()) * 2)
+    assert 'double' in registered_transforms()
+    with pytest.raises(KeyError):
+        get_transform('bogus')
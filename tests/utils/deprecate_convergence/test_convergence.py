@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from scipy.linalg import lstsq
+from themodelshop.utils.deprecate_convergence import (
+    ConvergenceMonitor,
+    check_for_convergence,
+    check_for_convergence_batch
+)
+
+
+def _batch_slope(y, buffer_size):
+    M = np.arange(buffer_size).reshape(-1, 1)**[0, 1]
+    return lstsq(M, y[-buffer_size:])[0][1]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('buffer_size', [1, 2, 3, 10])
+def test_monitor_matches_batch(buffer_size):
+    rng = np.random.default_rng(buffer_size)
+    # A noisy curve which flattens out, so both outcomes occur.
+    x = np.exp(-np.arange(150) / 10) + rng.normal(scale=1e-7, size=150)
+    x[120:] = x[120]
+    monitor = ConvergenceMonitor(buffer_size)
+    outcomes = set()
+    for n in range(1, len(x) + 1):
+        converged = monitor.update(x[n - 1])
+        if n < max(buffer_size, 2):
+            assert not converged
+            continue
+        assert converged == check_for_convergence(x[:n], buffer_size)
+        outcomes.add(converged)
+    if buffer_size > 1:
+        assert outcomes == {True, False}
+    # The slopes match a least squares fit to the batch derivatives.
+    alpha = 2 / (buffer_size + 1)
+    d_1 = np.abs(np.gradient(x))
+    for i in range(1, len(d_1)):
+        d_1[i] = (1 - alpha) * d_1[i - 1] + alpha * d_1[i]
+    np.testing.assert_allclose(
+        monitor.slopes[0],
+        _batch_slope(d_1, buffer_size),
+        atol=1e-12
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('buffer_size', [.1, 4])
+def test_batch_matches_loop(buffer_size):
+    rng = np.random.default_rng(0)
+    curves = []
+    for scale in rng.uniform(2, 40, size=50):
+        t = np.arange(rng.integers(20, 200))
+        curves.append(np.exp(-t / scale) + rng.normal(scale=1e-8, size=len(t)))
+    expected = [check_for_convergence(curve, buffer_size) for curve in curves]
+    converged = check_for_convergence_batch(curves, buffer_size)
+    assert converged.tolist() == expected
+    assert 0 < converged.sum() < len(curves)
+    # Curves of equal length can be passed as a matrix.
+    matrix = np.stack([curve[:20] for curve in curves])
+    expected = [check_for_convergence(row, buffer_size) for row in matrix]
+    assert check_for_convergence_batch(matrix, buffer_size).tolist() == expected
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from themodelshop.utils import scoring
+from themodelshop.utils.scoring import (
+    HPEScorer,
+    hpe
+)
+
+
+def _brute_force(scorer, predictions):
+    """Score each resample one at a time."""
+    accuracy = scorer.accuracy(predictions)
+    scores = []
+    for indices in scorer.indices:
+        buckets = indices.reshape(scorer.n_buckets, -1)
+        means = accuracy[buckets].mean(axis=1)
+        scores.append(scorer.n_buckets / (1 / means).sum())
+    return np.array(scores)
+
+
+@pytest.mark.unit
+def test_categorical():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 3, 300)
+    scorer = HPEScorer(y, n_bootstraps=20, seed=0)
+    assert scorer.categorical
+    assert scorer.n_buckets == 3
+    # Every resample draws the same number from each class.
+    classes = y[scorer.indices].reshape(20, 3, -1)
+    assert (classes == np.arange(3)[None, :, None]).all()
+    np.testing.assert_allclose(scorer.score(y), np.ones(20))
+    # Always predicting one class misses the others entirely.
+    np.testing.assert_allclose(scorer.score(np.zeros_like(y)), np.zeros(20))
+    noisy = np.where(rng.random(300) < .7, y, rng.integers(0, 3, 300))
+    np.testing.assert_allclose(scorer.score(noisy), _brute_force(scorer, noisy))
+
+
+@pytest.mark.unit
+def test_continuous_batch():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=500)
+    predictions = y + rng.normal(scale=[[.1], [.5], [2.]], size=(3, 500))
+    scorer = HPEScorer(y, n_buckets=5, n_bootstraps=30, seed=0)
+    assert not scorer.categorical
+    scores = scorer.score(predictions)
+    assert scores.shape == (3, 30)
+    for row, prediction in zip(scores, predictions):
+        np.testing.assert_allclose(row, _brute_force(scorer, prediction))
+    # Noisier models score worse.
+    means = scores.mean(axis=1)
+    assert means[0] > means[1] > means[2]
+    np.testing.assert_allclose(hpe(y, y, n_buckets=5), 1.)
+
+
+@pytest.mark.unit
+def test_gathered_in_chunks(monkeypatch):
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=400)
+    predictions = y + rng.normal(size=(7, 400))
+    scorer = HPEScorer(y, n_buckets=4, n_bootstraps=10, seed=0)
+    expected = scorer.bucket_accuracy(predictions)
+    # Only one model fits in the buffer at a time.
+    monkeypatch.setattr(scoring, '_GATHER_SIZE', 500)
+    np.testing.assert_allclose(scorer.bucket_accuracy(predictions), expected)
+    np.testing.assert_allclose(scorer.bucket_accuracy(predictions[2]), expected[2])
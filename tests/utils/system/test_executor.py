@@ -0,0 +1,84 @@
+import multiprocessing
+import numpy as np
+import pyarrow as pa
+import pytest
+import time
+
+from themodelshop.file_cabinet import FileCabinet
+from themodelshop.utils.system.executor import (
+    ContractExecutor,
+    linear_contract
+)
+
+# Workers are forked so that they can run the contracts in this file.
+_CONTEXT = multiprocessing.get_context('fork')
+
+
+def _paths(tmp_path):
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(1200, 4))
+    tbl = pa.table({
+        'x0': x[:, 0], 'x1': x[:, 1], 'x2': x[:, 2], 'x3': x[:, 3],
+        'y': x[:, 0] * 3 + rng.normal(scale=.1, size=1200),
+    })
+    cabinet = FileCabinet(str(tmp_path), address="grpc://localhost:0", persist=True)
+    paths = cabinet.local_paths(cabinet.put(tbl))
+    cabinet.shutdown()
+    return paths
+
+
+def _columns(features, target, cancelled):
+    return features.column_names, target.num_chunks > 0
+
+
+def _wait_until_fired(features, target, cancelled):
+    while not cancelled():
+        time.sleep(.01)
+    return 'fired'
+
+
+@pytest.mark.unit
+def test_contracts(tmp_path):
+    with ContractExecutor(_paths(tmp_path), 'y', max_workers=2, mp_context=_CONTEXT) as executor:
+        assert executor.features == ['x0', 'x1', 'x2', 'x3']
+        names = executor.submit('a', _columns, [1, 3]).result()
+        assert names.score == (['x1', 'x3'], True)
+        good = executor.submit('good', linear_contract, [0], months=4)
+        bad = executor.submit('bad', linear_contract, [2], months=4)
+        assert good.result().score < .1 < bad.result().score
+        assert good.result().wall_time > 0
+
+
+@pytest.mark.unit
+def test_cancel(tmp_path):
+    with ContractExecutor(_paths(tmp_path), 'y', max_workers=1, mp_context=_CONTEXT) as executor:
+        running = executor.submit('running', _wait_until_fired, [0])
+        queued = [executor.submit(i, _wait_until_fired, [0]) for i in range(3)]
+        time.sleep(.5)
+        assert executor.cancel(2)
+        assert not executor.cancel('running')
+        result = running.result(timeout=10)
+        assert result.cancelled and result.score == 'fired'
+        assert queued[2].cancelled()
+        for employee_id in range(2):
+            executor.cancel(employee_id)
+            # These may have started once the first contract ended.
+            assert queued[employee_id].cancelled() or (
+                queued[employee_id].result(timeout=10).cancelled
+            )
+
+
+@pytest.mark.unit
+def test_slots_are_reused(tmp_path):
+    with ContractExecutor(
+        _paths(tmp_path), 'y', max_workers=1, max_employees=2, mp_context=_CONTEXT
+    ) as executor:
+        for employee_id in range(6):
+            executor.submit(employee_id, _columns, [0]).result(timeout=10)
+            # The slot is freed by a callback which may run just after
+            # the result is set.
+            deadline = time.time() + 10
+            while executor._slots and time.time() < deadline:
+                time.sleep(.01)
+            assert not executor._slots and not executor._futures
+        assert not executor.cancel(0)
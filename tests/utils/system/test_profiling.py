@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from themodelshop.secretary import Secretary
+from themodelshop.utils.system import profiling
+from themodelshop.utils.system.profiling import (
+    CostLedger,
+    record_read,
+    record_written,
+    track
+)
+
+
+@pytest.mark.unit
+def test_track():
+    ledger = CostLedger()
+
+    @track('load', agent_id=7, ledger=ledger)
+    def load(n):
+        record_read(n)
+        return np.ones(n)
+
+    with track('fit', ledger=ledger, memory=True) as fit:
+        load(100)
+        record_written(8)
+    tbl = ledger.to_table().to_pydict()
+    assert tbl['action'] == ['load', 'fit']
+    assert tbl['agent_id'] == [7, -1]
+    # The bytes read by the inner action count for the outer action.
+    assert tbl['bytes_read'] == [100, 100]
+    assert tbl['bytes_written'] == [0, 8]
+    assert tbl['peak_memory'][0] == -1 and tbl['peak_memory'][1] >= 800
+    assert tbl['wall_time'][1] >= tbl['wall_time'][0] > 0
+    assert fit.bytes_read == 100
+    summary = ledger.summary().to_pydict()
+    assert summary['action'] == ['fit', 'load']
+    assert summary['count'] == [1, 1]
+
+
+@pytest.mark.unit
+def test_nested_peak():
+    ledger = CostLedger()
+    with track('outer', ledger=ledger, memory=True):
+        large = np.ones(1_000_000)
+        del large
+        with track('inner', ledger=ledger, memory=True):
+            small = np.ones(1000)
+        del small
+    peaks = dict(zip(*ledger.to_table().select(['action', 'peak_memory']).to_pydict().values()))
+    # The inner action does not wipe out the peak of the outer one.
+    assert peaks['outer'] >= 8_000_000
+
+
+@pytest.mark.unit
+def test_pool_cpu_time():
+    ledger = CostLedger()
+
+    def spin():
+        start = time.process_time()
+        while time.process_time() - start < .2:
+            pass
+
+    with track('pool', ledger=ledger):
+        with ThreadPoolExecutor(1) as pool:
+            pool.submit(spin).result()
+    assert ledger.to_table()['cpu_time'][0].as_py() >= .1
+
+
+@pytest.mark.unit
+def test_disable():
+    ledger = CostLedger(capacity=3)
+
+    @track(ledger=ledger)
+    def act():
+        return 1
+
+    profiling.disable()
+    try:
+        assert act() == 1
+        assert len(ledger) == 0
+    finally:
+        profiling.enable()
+    for _ in range(5):
+        act()
+    # Only the most recent actions are kept.
+    assert len(ledger) == 3
+    assert ledger.to_table()['action'].to_pylist() == ['test_disable.<locals>.act'] * 3
+
+
+@pytest.mark.unit
+def test_secretary_cost_report():
+    profiling.LEDGER.clear()
+    Secretary().employee_report()
+    report = Secretary().cost_report().to_pydict()
+    assert report['action'] == ['secretary.employee_report']
@@ -0,0 +1,475 @@
+"""An asynchronous client for a filing cabinet.
+
+The client keeps a pool of Flight connections to a cabinet and hands
+calls out to them in turn, so many agents in one process can fetch
+data concurrently without opening a connection per request. Every
+call runs in a thread pool and is awaited from asyncio, which lets the
+caller keep working while data is in flight.
+
+Reads which fail because the cabinet could not be reached are retried
+with exponential backoff over a fresh connection. Calls which file or
+add data are not retried, since the cabinet may have acted on them
+before the connection failed.
+
+Streams are read ahead of the caller; while one record batch is being
+used the next ones are already being received.
+"""
+import asyncio
+import json
+import pyarrow as pa
+import pyarrow.flight as fl
+import threading
+import time
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Sequence,
+    Tuple
+)
+
+from themodelshop.file_cabinet import make_ticket
+from themodelshop.utils.data.convertors import standardize
+
+# These errors mean the cabinet could not be reached; others, such as
+# asking for a ticket which does not exist, are not retried.
+_TRANSIENT = (
+    fl.FlightUnavailableError,
+    fl.FlightTimedOutError,
+    ConnectionError,
+)
+
+# Marks the end of a stream.
+_END = object()
+
+
+class CabinetClient():
+    """A pooled, retrying, asynchronous client for a filing cabinet.
+
+    Parameters
+    ----------
+    location: str = "grpc://localhost:8815"
+        The location of the cabinet.
+    pool_size: int = 4
+        The number of connections, which is also the number of calls
+        which run at the same time.
+    retries: int = 3
+        The number of times a read is retried if the cabinet cannot
+        be reached.
+    backoff: float = 0.1
+        The wait in seconds before the first retry. The wait doubles
+        with every retry.
+    prefetch: int = 4
+        The number of record batches, or of datasets in get_many,
+        read ahead of the caller.
+    """
+    def __init__(
+        self,
+        location: str = "grpc://localhost:8815",
+        pool_size: int = 4,
+        retries: int = 3,
+        backoff: float = 0.1,
+        prefetch: int = 4
+    ):
+        self._location = location
+        self._retries = retries
+        self._backoff = backoff
+        self._prefetch = prefetch
+        self._connections = [None] * pool_size
+        self._next = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(pool_size)
+
+    ################################################################
+    # Connections
+    ################################################################
+    def _connection(self) -> Tuple[int, fl.FlightClient]:
+        """Pick the next connection in the pool, opening it if needed."""
+        with self._lock:
+            slot = self._next
+            self._next = (self._next + 1) % len(self._connections)
+            if self._connections[slot] is None:
+                self._connections[slot] = fl.connect(self._location)
+            return slot, self._connections[slot]
+
+    def _reconnect(self, slot: int, connection: fl.FlightClient):
+        """Drop a connection which failed so that it is reopened."""
+        with self._lock:
+            if self._connections[slot] is connection:
+                self._connections[slot] = None
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _call(
+        self,
+        method: Callable[[fl.FlightClient], Any],
+        retry: bool = True
+    ) -> Any:
+        """Call a method with a connection.
+
+        If retry is set the call is retried if the cabinet cannot be
+        reached; only calls which are safe to repeat should be.
+        """
+        retries = self._retries if retry else 0
+        for attempt in range(retries + 1):
+            slot, connection = self._connection()
+            try:
+                return method(connection)
+            except _TRANSIENT:
+                self._reconnect(slot, connection)
+                if attempt == retries:
+                    raise
+                time.sleep(self._backoff * 2 ** attempt)
+
+    async def _run(
+        self,
+        method: Callable[[fl.FlightClient], Any],
+        retry: bool = True
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._call, method, retry
+        )
+
+    ################################################################
+    # Calls
+    #   1. get
+    #   2. get_many
+    #   3. batches
+    #   4. read
+    #   5. info
+    #   6. flights
+    #   7. put
+    #   8. transform
+    #   9. propose
+    #   10. federate
+    #   11. discard
+    #   12. query
+    ################################################################
+    async def get(
+        self,
+        ticket: str,
+        columns: List[str] = None,
+        filters: List = None
+    ) -> pa.Table:
+        """Get a dataset from the cabinet.
+
+        Parameters
+        ----------
+        ticket: str
+            This is the ticket the data was filed under.
+        columns: List[str] = None
+            These are the columns to return.
+        filters: List = None
+            These are (column, operator, value) tuples which rows
+            must satisfy; see FileCabinet.get.
+
+        Returns
+        -------
+        data: pyarrow.Table
+            This is the data filed under the ticket.
+        """
+        flight_ticket = make_ticket(ticket, columns, filters)
+        return await self._run(
+            lambda connection: connection.do_get(flight_ticket).read_all()
+        )
+
+    async def get_many(
+        self,
+        tickets: Sequence[str],
+        columns: List[str] = None,
+        filters: List = None
+    ) -> AsyncIterator[Tuple[str, pa.Table]]:
+        """Get datasets in order, fetching the next ones in advance.
+
+        Up to prefetch datasets are fetched while the caller works
+        on the current one.
+
+        Returns
+        -------
+        datasets: AsyncIterator[Tuple[str,pyarrow.Table]]
+            The ticket and data of each dataset.
+        """
+        pending = deque()
+        tickets = iter(tickets)
+        for ticket in tickets:
+            pending.append((ticket, asyncio.ensure_future(self.get(ticket, columns, filters))))
+            if len(pending) >= self._prefetch:
+                break
+        try:
+            while pending:
+                ticket, fetch = pending.popleft()
+                tbl = await fetch
+                for following in tickets:
+                    pending.append((
+                        following,
+                        asyncio.ensure_future(self.get(following, columns, filters))
+                    ))
+                    break
+                yield ticket, tbl
+        finally:
+            for _, fetch in pending:
+                fetch.cancel()
+
+    async def batches(
+        self,
+        ticket: str,
+        columns: List[str] = None,
+        filters: List = None
+    ) -> AsyncIterator[pa.RecordBatch]:
+        """Stream a dataset from the cabinet.
+
+        The stream is read on its own thread, up to prefetch record
+        batches ahead of the caller. Opening the stream is retried if
+        the cabinet cannot be reached, but a stream which fails part
+        way through is not restarted.
+
+        Returns
+        -------
+        batches: AsyncIterator[pyarrow.RecordBatch]
+            The record batches of the dataset.
+        """
+        loop = asyncio.get_running_loop()
+        flight_ticket = make_ticket(ticket, columns, filters)
+        reader = await self._run(lambda connection: connection.do_get(flight_ticket))
+        queue = asyncio.Queue(self._prefetch)
+        stop = threading.Event()
+
+        def put(item):
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def produce():
+            try:
+                for chunk in reader:
+                    if stop.is_set():
+                        return
+                    put(chunk.data)
+                put(_END)
+            except BaseException as error:
+                if not stop.is_set():
+                    put(error)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Unblock the producer if the caller stopped early.
+            stop.set()
+            reader.cancel()
+            while producer.is_alive():
+                while not queue.empty():
+                    queue.get_nowait()
+                await asyncio.sleep(0.001)
+
+    async def read(self, flight_ticket: fl.Ticket) -> pa.Table:
+        """Get the data behind a Flight ticket, i.e. of an endpoint."""
+        return await self._run(
+            lambda connection: connection.do_get(flight_ticket).read_all()
+        )
+
+    async def info(
+        self,
+        ticket: str,
+        columns: List[str] = None,
+        filters: List = None
+    ) -> fl.FlightInfo:
+        """Find out how to fetch a dataset; see FileCabinet.get_flight_info."""
+        descriptor = fl.FlightDescriptor.for_command(
+            make_ticket(ticket, columns, filters).ticket
+        )
+        return await self._run(
+            lambda connection: connection.get_flight_info(descriptor)
+        )
+
+    async def flights(self) -> List[fl.FlightInfo]:
+        """Describe every dataset in the cabinet."""
+        return await self._run(
+            lambda connection: list(connection.list_flights())
+        )
+
+    async def put(self, data: Any, ticket: str = None) -> str:
+        """File a dataset into the cabinet.
+
+        This is not retried if the cabinet cannot be reached.
+
+        Parameters
+        ----------
+        data: Any
+            This is the object to store in the cabinet. It is
+            standardized to a PyArrow Table before it is sent.
+        ticket: str = None
+            This is the ticket to file the data under. If this is not
+            passed the cabinet chooses a ticket.
+
+        Returns
+        -------
+        ticket: str
+            This is the ticket the data was filed under.
+        """
+        tbl = standardize(data)
+        if ticket is None:
+            descriptor = fl.FlightDescriptor.for_command(b'')
+        else:
+            descriptor = fl.FlightDescriptor.for_path(ticket)
+
+        def put(connection: fl.FlightClient) -> str:
+            writer, reader = connection.do_put(descriptor, tbl.schema)
+            writer.write_table(tbl)
+            writer.done_writing()
+            filed = reader.read().to_pybytes().decode()
+            writer.close()
+            return filed
+        return await self._run(put, retry=False)
+
+    async def transform(
+        self,
+        ticket: str,
+        name: str,
+        transform: str,
+        columns: List[str],
+        scalars: List = None,
+        params: Dict[str, Any] = None
+    ) -> pa.Table:
+        """Add a column computed by the cabinet to a dataset.
+
+        Only the names are sent; the column is computed next to the
+        data and added to the dataset, and streamed back as it is
+        computed. See FileCabinet.derive. This is not retried if the
+        cabinet cannot be reached.
+
+        Returns
+        -------
+        derived: pyarrow.Table
+            A table holding only the new column.
+        """
+        descriptor = fl.FlightDescriptor.for_command(json.dumps(dict(
+            ticket=ticket,
+            name=name,
+            transform=transform,
+            columns=columns,
+            scalars=scalars,
+            params=params
+        )).encode())
+
+        def exchange(connection: fl.FlightClient) -> pa.Table:
+            writer, reader = connection.do_exchange(descriptor)
+            writer.done_writing()
+            derived = reader.read_all()
+            writer.close()
+            return derived
+        return await self._run(exchange, retry=False)
+
+    async def propose(
+        self,
+        ticket: str,
+        name: str,
+        transform: str,
+        columns: List[str],
+        scalars: List = None,
+        params: Dict[str, Any] = None
+    ) -> str:
+        """Add a column to a dataset which is computed when it is read.
+
+        See FileCabinet.propose. This is not retried if the cabinet
+        cannot be reached.
+
+        Returns
+        -------
+        digest: str
+            This identifies the column in the expression graph.
+        """
+        action = fl.Action('propose', json.dumps(dict(
+            ticket=ticket,
+            name=name,
+            transform=transform,
+            columns=columns,
+            scalars=scalars,
+            params=params
+        )).encode())
+
+        def propose(connection: fl.FlightClient) -> str:
+            result = next(iter(connection.do_action(action)))
+            return result.body.to_pybytes().decode()
+        return await self._run(propose, retry=False)
+
+    async def federate(
+        self,
+        ticket: str,
+        schema: pa.Schema,
+        partitions: List[Tuple[str, int]]
+    ):
+        """Record where the partitions of a dataset are filed.
+
+        See FileCabinet.federate. This is not retried if the cabinet
+        cannot be reached, since a repeated call would return the new
+        partitions as the previous ones.
+
+        Returns
+        -------
+        previous: List[Tuple[str,int]]
+            The partitions previously recorded under the ticket.
+        """
+        action = fl.Action('federate', json.dumps(dict(
+            ticket=ticket,
+            schema=schema.serialize().to_pybytes().hex(),
+            partitions=partitions
+        )).encode())
+
+        def federate(connection: fl.FlightClient) -> List[Tuple[str, int]]:
+            result = next(iter(connection.do_action(action)))
+            return [tuple(part) for part in json.loads(result.body.to_pybytes())]
+        return await self._run(federate, retry=False)
+
+    async def discard(self, ticket: str):
+        """Remove the data filed under a ticket; see FileCabinet.discard."""
+        action = fl.Action('discard', ticket.encode())
+        await self._run(lambda connection: list(connection.do_action(action)))
+
+    async def query(self, **kwargs: Any) -> pa.Table:
+        """Retrieve metadata for the datasets in the cabinet.
+
+        Parameters
+        ----------
+        **kwargs: Any
+            Exact filter criteria; see FileCabinet.query.
+
+        Returns
+        -------
+        metadata: pyarrow.Table
+            This is one row of metadata for each matching object.
+        """
+        action = fl.Action('query', json.dumps(kwargs).encode())
+
+        def query(connection: fl.FlightClient) -> pa.Table:
+            result = next(iter(connection.do_action(action)))
+            return pa.ipc.open_stream(result.body).read_all()
+        return await self._run(query)
+
+    def close(self):
+        """Close every connection."""
+        self._executor.shutdown()
+        with self._lock:
+            connections, self._connections = self._connections, [None] * len(self._connections)
+        for connection in connections:
+            if connection is not None:
+                connection.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
@@ -0,0 +1,277 @@
+"""The Company Store sells variables to the modelers.
+
+The price of every variable is a function of statistics kept over the
+last models run:
+
+* The recent mean loss differential, the difference between the mean
+  loss of models which did not use the variable and the mean loss of
+  models which did, scaled by the largest recent loss.
+* The recent mean complexity of the models which used the variable.
+* The recent frequency of the variable, discounted by age.
+
+The models are kept in a ring buffer which records the loss and
+complexity of each model along with a bitmap of the variables it
+used. Every statistic is kept as a running aggregate which is updated
+as models enter and leave the buffer, so adding a model only touches
+the variables the new model and the evicted model used. Quotes for
+every variable are computed from the aggregates in a single pass.
+"""
+import numpy as np
+
+from collections import deque
+from numpy.random import default_rng
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Sequence,
+    Union
+)
+
+
+def _scale(x: np.ndarray) -> np.ndarray:
+    """Standardize a signal across variables."""
+    x = np.nan_to_num(x, nan=np.nanmean(x) if np.isfinite(x).any() else 0.)
+    std = x.std()
+    if std == 0:
+        return np.zeros_like(x)
+    return (x - x.mean()) / std
+
+
+def default_pricing(
+    loss_differential: np.ndarray,
+    complexity: np.ndarray,
+    frequency: np.ndarray,
+    **signals: np.ndarray
+) -> np.ndarray:
+    """Price variables from their signals.
+
+    Each signal is scaled to unit variance across the variables so
+    that they are weighted alike. Variables which are predictive,
+    which are seldom used, and which are used in simple models are
+    cheap.
+
+    Returns
+    -------
+    prices: numpy.ndarray
+        A positive price for each variable.
+    """
+    return np.exp(_scale(complexity) + _scale(frequency) - _scale(loss_differential))
+
+
+# The largest weight, decay^-t, a model may be given before the running
+# aggregates are recomputed; past this small decays overflow.
+_MAX_WEIGHT = 1e12
+
+
+class CompanyStore():
+    """Quotes prices for variables from the last models run.
+
+    Parameters
+    ----------
+    variables: Union[int,Sequence[str]]
+        The number of variables, or their names.
+    window: int = 1000
+        The number of recent models the statistics are kept over.
+    decay: float = 0.99
+        The factor, lambda, by which the weight of a model in the
+        frequency of its variables falls with each newer model.
+    alpha: float = 1.0
+        Governs exploration. The loss differential of a variable used
+        by n models in the window is replaced with the absolute value
+        of a standard normal draw with probability exp(-n alpha).
+    signals: Union[List[Callable],Dict[str,Callable]] = None
+        Additional signals. Each is a function of the store which
+        returns one value per variable, and is passed to the pricing
+        function as a keyword named for the function.
+    pricing: Callable = default_pricing
+        Turns the signals into prices. It is called with every
+        signal as a keyword argument and returns one price per
+        variable.
+    rebase: int = None
+        The number of models after which the running aggregates are
+        recomputed from the buffer, which bounds rounding error. This
+        defaults to the window. They are also recomputed whenever the
+        weight of the newest model in the frequency grows past 1e12,
+        so that small decays do not overflow.
+    seed: int = None
+        Seed for exploration.
+    """
+    def __init__(
+        self,
+        variables: Union[int, Sequence[str]],
+        window: int = 1000,
+        decay: float = 0.99,
+        alpha: float = 1.0,
+        signals: Union[List[Callable], Dict[str, Callable]] = None,
+        pricing: Callable = default_pricing,
+        rebase: int = None,
+        seed: int = None
+    ):
+        if isinstance(variables, int):
+            variables = [str(variable) for variable in range(variables)]
+        self.variables = list(variables)
+        n_variables = len(self.variables)
+        self._window = window
+        self._decay = decay
+        self._alpha = alpha
+        self._pricing = pricing
+        self._rebase = window if rebase is None else rebase
+        self._rng = default_rng(seed)
+        self._signals = {
+            'loss_differential': CompanyStore.loss_differential,
+            'complexity': CompanyStore.complexity,
+            'frequency': CompanyStore.frequency,
+        }
+        if isinstance(signals, dict):
+            self._signals.update(signals)
+        else:
+            self._signals.update({signal.__name__: signal for signal in signals or []})
+        # The ring buffer of models.
+        self._used = np.zeros((window, n_variables), dtype=bool)
+        self._members = [np.zeros(0, dtype=np.intp)] * window
+        self._loss = np.zeros(window)
+        self._complexity = np.zeros(window)
+        self._time = 0
+        # Running aggregates over the models in the buffer.
+        self._count = np.zeros(n_variables, dtype=np.int64)
+        self._loss_sum = np.zeros(n_variables)
+        self._complexity_sum = np.zeros(n_variables)
+        self._total_loss = 0.
+        # The decayed frequency is kept as a sum of decay^-t, where t
+        # counts models since the origin, and scaled by decay^now.
+        self._weighted = np.zeros(n_variables)
+        self._origin = 0
+        # The times of the models which may yet be the largest loss.
+        self._maxima = deque()
+
+    def __len__(self):
+        return min(self._time, self._window)
+
+    def show_signals(self) -> Dict[str, Callable]:
+        """The signals which are passed to the pricing function."""
+        return dict(self._signals)
+
+    def add_model(self, variables: Sequence[int], loss: float):
+        """Add a model to the buffer.
+
+        Parameters
+        ----------
+        variables: Sequence[int]
+            The indices of the variables the model used.
+        loss: float
+            The loss of the model.
+        """
+        variables = np.unique(np.asarray(variables, dtype=np.intp))
+        slot = self._time % self._window
+        if self._time >= self._window:
+            self._remove(slot)
+        complexity = _log_complexity(len(variables))
+        self._used[slot, variables] = True
+        self._members[slot] = variables
+        self._loss[slot] = loss
+        self._complexity[slot] = complexity
+        self._count[variables] += 1
+        self._loss_sum[variables] += loss
+        self._complexity_sum[variables] += complexity
+        self._total_loss += loss
+        self._weighted[variables] += self._decay ** (self._origin - self._time)
+        while self._maxima and self._loss[self._maxima[-1] % self._window] <= loss:
+            self._maxima.pop()
+        self._maxima.append(self._time)
+        self._time += 1
+        if self._maxima[0] <= self._time - 1 - self._window:
+            self._maxima.popleft()
+        if (
+            self._time - self._origin >= self._rebase
+            or self._decay ** (self._origin - self._time) > _MAX_WEIGHT
+        ):
+            self._recompute()
+
+    def _remove(self, slot: int):
+        """Remove the model in this slot from the running aggregates."""
+        variables = self._members[slot]
+        loss = self._loss[slot]
+        self._used[slot, variables] = False
+        self._count[variables] -= 1
+        self._loss_sum[variables] -= loss
+        self._complexity_sum[variables] -= self._complexity[slot]
+        self._total_loss -= loss
+        self._weighted[variables] -= self._decay ** (
+            self._origin - (self._time - self._window)
+        )
+
+    def _recompute(self):
+        """Recompute the running aggregates from the buffer."""
+        n = len(self)
+        times = np.arange(self._time - n, self._time)
+        slots = times % self._window
+        used = self._used[slots]
+        self._count = used.sum(axis=0)
+        self._loss_sum = self._loss[slots] @ used
+        self._complexity_sum = self._complexity[slots] @ used
+        self._total_loss = self._loss[slots].sum()
+        self._origin = self._time
+        self._weighted = self._decay ** (self._origin - times).astype(float) @ used
+
+    @property
+    def max_loss(self) -> float:
+        """The largest loss of the models in the buffer."""
+        if not self._maxima:
+            return np.nan
+        return self._loss[self._maxima[0] % self._window]
+
+    def loss_differential(self) -> np.ndarray:
+        """The recent mean loss differential of every variable.
+
+        Variables which have been used by few models are explored by
+        replacing their loss differential with the absolute value of
+        a standard normal draw; see alpha.
+        """
+        n = len(self)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            with_variable = self._loss_sum / self._count
+            without_variable = (self._total_loss - self._loss_sum) / (n - self._count)
+            differential = (without_variable - with_variable) / self.max_loss
+        explore = self._rng.random(len(self.variables)) < np.exp(-self._count * self._alpha)
+        explore |= ~np.isfinite(differential)
+        draws = np.abs(self._rng.standard_normal(len(self.variables)))
+        return np.where(explore, draws, differential)
+
+    def complexity(self) -> np.ndarray:
+        """The recent mean complexity of models using every variable.
+
+        The complexity of a model with n variables is n^n, which
+        grows too quickly to be averaged directly; the mean is taken
+        over its logarithm, n log n. Unused variables are nan.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self._complexity_sum / self._count
+
+    def frequency(self) -> np.ndarray:
+        """The recent decayed frequency of every variable.
+
+        This is the sum of decay^i over the models in the buffer
+        which used the variable, where i is 1 for the newest model,
+        divided by the number of models in the buffer.
+        """
+        n = len(self)
+        if n == 0:
+            return np.zeros(len(self.variables))
+        return self._weighted * self._decay ** (self._time - self._origin) / n
+
+    def quote(self) -> np.ndarray:
+        """Quote a price for every variable.
+
+        Returns
+        -------
+        prices: numpy.ndarray
+            The price of each variable, in the order of variables.
+        """
+        signals = {name: signal(self) for name, signal in self._signals.items()}
+        return self._pricing(**signals)
+
+
+def _log_complexity(n: int) -> float:
+    """The logarithm of the complexity, n^n, of a model."""
+    return n * np.log(n) if n else 0.
@@ -1,13 +1,302 @@
+"""The Analyst computes simple statistics for every feature.
+
+Statistics are computed in one streaming pass over the record batches
+of a dataset, so datasets larger than memory can be analyzed. Every
+column is summarized by a ColumnProfile; the profile of a batch is
+computed with PyArrow compute kernels and merged into the running
+profile, and profiles of different parts of a dataset can be merged
+in the same way. Columns are profiled in parallel in a thread pool,
+since the compute kernels release the GIL.
+"""
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from concurrent.futures import ThreadPoolExecutor
+from numpy.random import default_rng
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    Sequence
+)
+
+from themodelshop.utils.data.convertors import standardize
+from themodelshop.utils.system.profiling import (
+    record_read,
+    track
+)
+
+
+def _is_numeric(data_type: pa.DataType) -> bool:
+    return (
+        pa.types.is_integer(data_type)
+        or pa.types.is_floating(data_type)
+        or pa.types.is_boolean(data_type)
+    )
+
+
+class ColumnProfile():
+    """Mergeable statistics of one column.
+
+    The mean and variance are kept as a count, mean, and sum of
+    squared deviations, which are merged with Chan's parallel
+    formulas; the correlation with the target is kept the same way
+    from co-moments. Quantiles are estimated from a uniform sample of
+    the values, chosen as the values with the smallest random keys,
+    which can also be merged.
+
+    Parameters
+    ----------
+    sample_size: int = 4096
+        The number of values kept to estimate quantiles.
+    seed: int = None
+        Seed for the sampling keys.
+    """
+    def __init__(self, sample_size: int = 4096, seed: int = None):
+        self.sample_size = sample_size
+        self._rng = default_rng(seed)
+        self.count = 0
+        self.nulls = 0
+        self.min = None
+        self.max = None
+        self.mean = 0.
+        self.m2 = 0.
+        # Co-moments with the target, over rows where both are valid.
+        self.pairs = 0
+        self.mean_x = 0.
+        self.mean_y = 0.
+        self.m2_x = 0.
+        self.m2_y = 0.
+        self.c_xy = 0.
+        self._keys = np.empty(0)
+        self._sample = np.empty(0)
+
+    @property
+    def variance(self) -> float:
+        """The population variance of the values."""
+        return self.m2 / self.count if self.count else np.nan
+
+    @property
+    def correlation(self) -> float:
+        """The Pearson correlation of the values with the target."""
+        denominator = np.sqrt(self.m2_x * self.m2_y)
+        return self.c_xy / denominator if denominator else np.nan
+
+    def quantiles(self, q: Sequence[float]) -> np.ndarray:
+        """Estimate quantiles of the values."""
+        if len(self._sample) == 0:
+            return np.full(len(q), np.nan)
+        return np.quantile(self._sample, q)
+
+    def update(self, values: Any, target: Any = None):
+        """Add a batch of values, and the matching target values."""
+        partial = ColumnProfile(self.sample_size)
+        partial._rng = self._rng
+        partial._describe(values, target)
+        self.merge(partial)
+
+    def _describe(self, values: Any, target: Any):
+        """Compute the profile of one batch."""
+        self.nulls = values.null_count
+        self.count = len(values) - self.nulls
+        if not _is_numeric(values.type) or self.count == 0:
+            return
+        values = pc.cast(values, pa.float64())
+        extrema = pc.min_max(values)
+        self.min = extrema['min'].as_py()
+        self.max = extrema['max'].as_py()
+        self.mean = pc.mean(values).as_py()
+        self.m2 = pc.variance(values, ddof=0).as_py() * self.count
+        valid = pc.drop_null(values).to_numpy()
+        self._keys = self._rng.random(len(valid))
+        self._sample = valid
+        self._shrink()
+        if target is None or not _is_numeric(target.type):
+            return
+        target = pc.cast(target, pa.float64())
+        both = pc.and_(pc.is_valid(values), pc.is_valid(target))
+        x = pc.filter(values, both)
+        y = pc.filter(target, both)
+        self.pairs = len(x)
+        if self.pairs == 0:
+            return
+        self.mean_x = pc.mean(x).as_py()
+        self.mean_y = pc.mean(y).as_py()
+        self.m2_x = pc.variance(x, ddof=0).as_py() * self.pairs
+        self.m2_y = pc.variance(y, ddof=0).as_py() * self.pairs
+        self.c_xy = pc.sum(pc.multiply(
+            pc.subtract(x, self.mean_x), pc.subtract(y, self.mean_y)
+        )).as_py()
+
+    def _shrink(self):
+        """Keep the sampled values with the smallest keys."""
+        if len(self._keys) > self.sample_size:
+            keep = np.argpartition(self._keys, self.sample_size)[:self.sample_size]
+            self._keys = self._keys[keep]
+            self._sample = self._sample[keep]
+
+    def merge(self, other: 'ColumnProfile') -> 'ColumnProfile':
+        """Merge another profile into this one.
+
+        Returns
+        -------
+        profile: ColumnProfile
+            This profile, which now describes both.
+        """
+        n = self.count + other.count
+        if other.count:
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / n
+            self.m2 += other.m2 + delta ** 2 * self.count * other.count / n
+        self.count = n
+        self.nulls += other.nulls
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        pairs = self.pairs + other.pairs
+        if other.pairs:
+            dx = other.mean_x - self.mean_x
+            dy = other.mean_y - self.mean_y
+            weight = self.pairs * other.pairs / pairs
+            self.mean_x += dx * other.pairs / pairs
+            self.mean_y += dy * other.pairs / pairs
+            self.m2_x += other.m2_x + dx ** 2 * weight
+            self.m2_y += other.m2_y + dy ** 2 * weight
+            self.c_xy += other.c_xy + dx * dy * weight
+        self.pairs = pairs
+        self._keys = np.concatenate([self._keys, other._keys])
+        self._sample = np.concatenate([self._sample, other._sample])
+        self._shrink()
+        return self
 
 
 class Analyst():
     """Performs simple calculation on datasets
 
+    Parameters
+    ----------
+    quantiles: Sequence[float] = (0.05, 0.25, 0.5, 0.75, 0.95)
+        The quantiles to estimate for every column.
+    sample_size: int = 4096
+        The number of values kept per column to estimate quantiles.
+    batch_size: int = 65536
+        The number of rows read at a time.
+    max_workers: int = None
+        The number of threads profiling columns.
+    seed: int = None
+        Seed for quantile sampling.
     """
-    def __init__(self):
+    def __init__(
+        self,
+        quantiles: Sequence[float] = (0.05, 0.25, 0.5, 0.75, 0.95),
+        sample_size: int = 4096,
+        batch_size: int = 65536,
+        max_workers: int = None,
+        seed: int = None
+    ):
         self._data = None
+        self._quantiles = list(quantiles)
+        self._sample_size = sample_size
+        self._batch_size = batch_size
+        self._max_workers = max_workers
+        self._rng = default_rng(seed)
+        self.profiles: Dict[str, ColumnProfile] = {}
 
-    def analyze(self,dataset):
+    def _batches(self, dataset: Any) -> Iterator[pa.RecordBatch]:
+        """Stream the record batches of a dataset."""
+        if isinstance(dataset, pa.RecordBatch):
+            yield dataset
+        elif isinstance(dataset, pa.RecordBatchReader):
+            yield from dataset
+        elif isinstance(dataset, pa.Table):
+            yield from dataset.to_batches(max_chunksize=self._batch_size)
+        elif hasattr(dataset, 'to_batches'):
+            # Datasets and scanners are read lazily.
+            yield from dataset.to_batches(batch_size=self._batch_size)
+        else:
+            yield from standardize(dataset).to_batches(max_chunksize=self._batch_size)
+
+    def update(self, batch: pa.RecordBatch, target: str = None):
+        """Add a record batch to the running profiles."""
+        with ThreadPoolExecutor(self._max_workers) as pool:
+            self._update(pool, batch, target)
+
+    def merge(self, other: 'Analyst') -> 'Analyst':
+        """Merge the profiles of an Analyst who read other data."""
+        for name, profile in other.profiles.items():
+            if name in self.profiles:
+                self.profiles[name].merge(profile)
+            else:
+                self.profiles[name] = profile
+        return self
+
+    @track('analyst.analyze')
+    def analyze(self, dataset: Any, target: str = None) -> pa.Table:
         """Produces statistics for a dataset.
 
-        """
\ No newline at end of file
+        Parameters
+        ----------
+        dataset: Any
+            A PyArrow Table, RecordBatch, RecordBatchReader, or
+            dataset, or anything which can be standardized. Datasets
+            and readers are streamed, so they may be larger than
+            memory.
+        target: str = None
+            The column to correlate every column with.
+
+        Returns
+        -------
+        statistics: pyarrow.Table
+            One row per column with the count of valid values, the
+            number of nulls, the minimum, maximum, mean, variance,
+            the estimated quantiles, and the correlation with the
+            target. Statistics which do not apply are null.
+        """
+        self.profiles = {}
+        with ThreadPoolExecutor(self._max_workers) as pool:
+            for batch in self._batches(dataset):
+                self._update(pool, batch, target)
+        self._data = self.report()
+        return self._data
+
+    def _update(self, pool: ThreadPoolExecutor, batch: pa.RecordBatch, target: str):
+        """Profile the columns of a batch in parallel."""
+        record_read(batch.nbytes)
+        for name in batch.schema.names:
+            if name not in self.profiles:
+                self.profiles[name] = ColumnProfile(
+                    self._sample_size, seed=self._rng.integers(2 ** 32)
+                )
+        target_values = None if target is None else batch.column(target)
+        list(pool.map(
+            lambda name: self.profiles[name].update(batch.column(name), target_values),
+            batch.schema.names
+        ))
+
+    def report(self) -> pa.Table:
+        """Tabulate the current profiles; see analyze."""
+        names = list(self.profiles)
+        profiles = [self.profiles[name] for name in names]
+        quantiles = np.array(
+            [profile.quantiles(self._quantiles) for profile in profiles]
+        ).reshape(len(profiles), len(self._quantiles))
+        columns = {
+            'column': pa.array(names, pa.string()),
+            'count': pa.array([p.count for p in profiles], pa.int64()),
+            'nulls': pa.array([p.nulls for p in profiles], pa.int64()),
+            'min': pa.array([p.min for p in profiles], pa.float64()),
+            'max': pa.array([p.max for p in profiles], pa.float64()),
+            'mean': pa.array(
+                [p.mean if p.min is not None else None for p in profiles], pa.float64()
+            ),
+            'variance': pa.array(
+                [p.variance if p.min is not None else None for p in profiles], pa.float64()
+            ),
+        }
+        for i, q in enumerate(self._quantiles):
+            columns[f"q{q:g}"] = pa.array(quantiles[:, i], pa.float64(), from_pandas=True)
+        columns['correlation'] = pa.array(
+            [p.correlation for p in profiles], pa.float64(), from_pandas=True
+        )
+        return pa.table(columns)
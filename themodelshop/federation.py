@@ -0,0 +1,192 @@
+"""Spreads datasets over a federation of filing cabinets.
+
+One cabinet serving every employee is limited by the one process and
+the one host it runs on. A federation is a set of cabinets, usually
+one per process or host, which each hold a share of the data. Every
+dataset is split into partitions of consecutive rows, and partition i
+of a dataset is filed as '{ticket}/{i}' in the cabinet that ticket
+routes to on a consistent hash ring. Small datasets are a single
+partition, so whole datasets are spread over the cabinets as well.
+
+The cabinet the ticket of the whole dataset routes to records where
+its partitions are. Putting a dataset under a ticket which is already
+in use replaces it, and partitions which are not refiled are
+discarded. Asking that cabinet for the FlightInfo of the
+dataset returns one endpoint per partition, so any Flight client can
+fetch the partitions in parallel from every cabinet holding them.
+
+Cabinets do not need to know about each other; only the clients of a
+federation need the list of cabinets, in the same order and with the
+same number of virtual nodes, so that they all route alike.
+"""
+import asyncio
+import pyarrow as pa
+import pyarrow.flight as fl
+import uuid
+
+from typing import (
+    Any,
+    Dict,
+    List,
+    Sequence
+)
+
+from themodelshop.cabinet_client import CabinetClient
+from themodelshop.file_cabinet import FileCabinet
+from themodelshop.utils.data.convertors import standardize
+from themodelshop.utils.data.routing import HashRing
+
+
+def serve(address: str, location: str = ".data", **kwargs: Any):
+    """Run a cabinet of a federation until it is shut down.
+
+    This is meant to be the target of a process, one per cabinet.
+
+    Parameters
+    ----------
+    address: str
+        The location the cabinet listens on.
+    location: str = ".data"
+        The folder the cabinet writes its files to.
+    **kwargs: Any
+        Passed to FileCabinet.
+    """
+    FileCabinet(location=location, address=address, **kwargs).serve()
+
+
+class Federation():
+    """A client of a federation of filing cabinets.
+
+    Parameters
+    ----------
+    locations: Sequence[str]
+        The locations of the cabinets.
+    replicas: int = 64
+        The number of virtual nodes of every cabinet on the ring.
+    partition_rows: int = 65536
+        The largest number of rows in a partition.
+    **kwargs: Any
+        Passed to the CabinetClient of every cabinet.
+    """
+    def __init__(
+        self,
+        locations: Sequence[str],
+        replicas: int = 64,
+        partition_rows: int = 65536,
+        **kwargs: Any
+    ):
+        self.ring = HashRing(locations, replicas)
+        self._partition_rows = partition_rows
+        self._clients: Dict[str, CabinetClient] = {
+            location: CabinetClient(location, **kwargs)
+            for location in locations
+        }
+
+    def owner(self, ticket: str) -> str:
+        """The location of the cabinet a ticket routes to."""
+        return self.ring.node(ticket)
+
+    async def put(self, data: Any, ticket: str = None) -> str:
+        """Partition a dataset and file the partitions in parallel.
+
+        Parameters
+        ----------
+        data: Any
+            This is the object to store. It is standardized to a
+            PyArrow Table before it is sent.
+        ticket: str = None
+            This is the ticket to file the data under. If this is not
+            passed a unique ticket is generated. Data already filed
+            under the ticket is replaced.
+
+        Returns
+        -------
+        ticket: str
+            This is the ticket the data was filed under.
+        """
+        tbl = standardize(data)
+        if ticket is None:
+            ticket = str(uuid.uuid1())
+        parts = [
+            tbl.slice(start, self._partition_rows)
+            for start in range(0, max(tbl.num_rows, 1), self._partition_rows)
+        ]
+        names = [f"{ticket}/{i}" for i in range(len(parts))]
+        locations = [self.owner(name) for name in names]
+        await asyncio.gather(*[
+            self._clients[location].put(part, name)
+            for part, name, location in zip(parts, names, locations)
+        ])
+        previous = await self._clients[self.owner(ticket)].federate(
+            ticket,
+            tbl.schema,
+            [[location, part.num_rows] for location, part in zip(locations, parts)]
+        )
+        # A dataset filed again with fewer partitions leaves the rest.
+        await asyncio.gather(*[
+            self._clients[location].discard(f"{ticket}/{i}")
+            for i, (location, _) in enumerate(previous[len(parts):], len(parts))
+            if location in self._clients
+        ])
+        return ticket
+
+    async def info(
+        self,
+        ticket: str,
+        columns: List[str] = None,
+        filters: List = None
+    ) -> fl.FlightInfo:
+        """Describe the partitions of a dataset; see FileCabinet.get_flight_info."""
+        return await self._clients[self.owner(ticket)].info(ticket, columns, filters)
+
+    async def get(
+        self,
+        ticket: str,
+        columns: List[str] = None,
+        filters: List = None
+    ) -> pa.Table:
+        """Get a dataset, fetching its partitions in parallel.
+
+        Parameters
+        ----------
+        ticket: str
+            This is the ticket the data was filed under.
+        columns: List[str] = None
+            These are the columns to return.
+        filters: List = None
+            These are (column, operator, value) tuples which rows
+            must satisfy; see FileCabinet.get. They are applied by
+            the cabinets holding the partitions.
+
+        Returns
+        -------
+        data: pyarrow.Table
+            This is the data filed under the ticket, in order.
+        """
+        info = await self.info(ticket, columns, filters)
+        owner = self.owner(ticket)
+        parts = await asyncio.gather(*[
+            self._client(endpoint, owner).read(endpoint.ticket)
+            for endpoint in info.endpoints
+        ])
+        return pa.concat_tables(parts)
+
+    def _client(self, endpoint: fl.FlightEndpoint, owner: str) -> CabinetClient:
+        """The client for the cabinet serving an endpoint."""
+        if not endpoint.locations:
+            return self._clients[owner]
+        location = endpoint.locations[0].uri.decode()
+        if location not in self._clients:
+            raise LookupError(f"{location} is not in the federation.")
+        return self._clients[location]
+
+    def close(self):
+        """Close every connection."""
+        for client in self._clients.values():
+            client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
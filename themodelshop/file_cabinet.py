@@ -29,19 +29,43 @@ API
 https://arrow.apache.org/docs/python/api.html
 """
 
-import pandas as pd
+import json
+import numpy as np
+import os
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.flight as fl
-import numpy as np
 import shutil
+import threading
+import time
 import uuid
 
+from collections import Counter
 from typing import (
     Any,
-    Dict
+    Dict,
+    Iterator,
+    List,
+    Tuple
 )
+from urllib.parse import quote
 
+from themodelshop.utils.data.catalog import MetadataCatalog
+from themodelshop.utils.data.content import (
+    StreamDigest,
+    column_digest,
+    expression_digest,
+    table_digest
+)
 from themodelshop.utils.data.convertors import standardize as _standardize
+from themodelshop.utils.data.handlers import handle_pyarrow_Table
+from themodelshop.utils.data.residency import ResidencyManager
+from themodelshop.utils.data.transforms import get_transform
+from themodelshop.utils.system.profiling import (
+    record_read,
+    record_written,
+    track
+)
 
 # https://mirai-solutions.ch/news/2020/06/11/apache-arrow-flight-tutorial/
 class TicketError(Exception):
@@ -62,11 +86,123 @@ class TicketError(Exception):
             ticket_message = ""
         else:
             ticket_message = f"Ticket: {ticket}"
-        message = ('\n\t'.join(message_header,custom_message,ticket_message))
+        message = '\n\t'.join([message_header,custom_message,ticket_message])
         self.ticket = ticket
         self.message = message
         super().__init__(self.message)
 
+# These are the comparisons which can be used in filters.
+_OPERATORS = {
+    '=': lambda field, value: field == value,
+    '==': lambda field, value: field == value,
+    '!=': lambda field, value: field != value,
+    '<': lambda field, value: field < value,
+    '<=': lambda field, value: field <= value,
+    '>': lambda field, value: field > value,
+    '>=': lambda field, value: field >= value,
+    'in': lambda field, value: field.isin(value),
+    'not in': lambda field, value: ~field.isin(value),
+}
+
+def _to_expression(filters: List) -> pc.Expression:
+    """Convert filters into a PyArrow dataset expression.
+
+    Filters follow the same convention as the filters in
+    pyarrow.parquet; a list of (column, operator, value) tuples is
+    combined with 'and', while a list of such lists is combined with
+    'or'.
+
+    Parameters
+    ----------
+    filters: List
+        This is a list of (column, operator, value) tuples, or a
+        list of lists of tuples.
+
+    Returns
+    -------
+    expression: pyarrow.compute.Expression
+        The filter expression, or None if no filters were passed.
+    """
+    if not filters:
+        return None
+    if isinstance(filters[0][0], str):
+        filters = [filters]
+    disjunction = None
+    for conjunction in filters:
+        expression = None
+        for column, op, value in conjunction:
+            if op not in _OPERATORS:
+                raise ValueError(f"Unsupported filter operator {op}.")
+            term = _OPERATORS[op](pc.field(column), value)
+            expression = term if expression is None else expression & term
+        if disjunction is None:
+            disjunction = expression
+        else:
+            disjunction = disjunction | expression
+    return disjunction
+
+def _filter_columns(filters: List) -> List[str]:
+    """List the columns referenced by filters."""
+    if not filters:
+        return []
+    if isinstance(filters[0][0], str):
+        filters = [filters]
+    return [column for conjunction in filters for column, _, _ in conjunction]
+
+def make_ticket(
+    ticket: str,
+    columns: List[str] = None,
+    filters: List = None
+) -> fl.Ticket:
+    """Create a Flight ticket for a filed dataset.
+
+    Parameters
+    ----------
+    ticket: str
+        This is the ticket the data was filed under.
+    columns: List[str] = None
+        These are the columns to return. All columns are returned
+        if this is not passed.
+    filters: List = None
+        These are filters in the same form accepted by
+        FileCabinet.get. Only matching rows are returned.
+
+    Returns
+    -------
+    ticket: pyarrow.flight.Ticket
+        A ticket which can be passed to do_get.
+    """
+    if columns is None and filters is None:
+        return fl.Ticket(ticket)
+    return fl.Ticket(json.dumps(
+        {'ticket': ticket, 'columns': columns, 'filters': filters}
+    ))
+
+def _read_ticket(ticket: bytes) -> Tuple[str, List[str], List]:
+    """Parse a Flight ticket created by make_ticket."""
+    ticket = ticket.decode()
+    if not ticket.startswith('{'):
+        return ticket, None, None
+    request = json.loads(ticket)
+    return (
+        request['ticket'],
+        request.get('columns'),
+        request.get('filters')
+    )
+
+# Partitioned datasets are written with the row numbers in this column,
+# because partitioning groups their rows by partition.
+_ROW = '__row'
+
+
+def _write_schema(schema: pa.Schema) -> str:
+    return schema.serialize().to_pybytes().hex()
+
+
+def _read_schema(serialized: str) -> pa.Schema:
+    return pa.ipc.read_schema(pa.py_buffer(bytes.fromhex(serialized)))
+
+
 class FileCabinet(fl.FlightServerBase):
     """Maintains records and data for a project.
 
@@ -115,6 +251,24 @@ class FileCabinet(fl.FlightServerBase):
     address: str = "grpc://0.0.0.0:8815"
         This is a string denoting the bind address and port to use.
 
+    max_chunksize: int = 65536
+        This is the largest number of rows sent in a single record
+        batch when a dataset is streamed out of the cabinet.
+
+    memory_budget: int = None
+        This is the number of bytes of datasets which the cabinet
+        keeps in memory. When this is exceeded the least recently
+        used datasets are spilled to Arrow IPC files in location and
+        are memory mapped when they are next requested. If this is
+        not passed datasets are always kept in memory.
+
+    persist: bool = False
+        Write every dataset to an uncompressed Arrow IPC file in
+        location as soon as it is filed. The cabinet then only holds
+        a memory map of the file, and consumers on the same host can
+        map the same file instead of streaming it over Flight, so
+        every process shares one copy of the data.
+
     dataset_metadata: Dict
         This is an optional dictionary keyed by dataset name with
         values of dataset functions coupled with optional
@@ -132,17 +286,15 @@ class FileCabinet(fl.FlightServerBase):
         at this location and creates a default schema if not
         available.
 
-    query(**kwargs): This overloads the standard Pandas .query().
-        If no parameters are passed this will return an unfiltered
-        tabular dataset of metadata from all registered objects in
-        this cabinet. If kwargs are passed they are assumed to be
-        filters for data matching. I.e. 'X' is a metadata element.
-        If the keyword expression "X=2" is passed then the internal
-        dataset of metadata is queried using Pandas DataFrame.query().
-        If the feature of the metadata does not exist then a MetaDataError
-        is thrown.
-
-        https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.query.html
+    query(**kwargs): If no parameters are passed this will return an
+        unfiltered PyArrow Table of metadata from all registered
+        objects in this cabinet. If kwargs are passed they are
+        assumed to be exact filters for data matching. I.e. 'X' is a
+        metadata element. If the keyword expression "X=2" is passed
+        then only the rows where X is 2 are returned. Every metadata
+        field is hash indexed, so these lookups do not scan the
+        catalog. If the feature of the metadata does not exist then
+        a MetaDataError is thrown.
 
     put(something): This adds an item to the filing cabinet and
         ensures that the metadata matches the appropriate schema.
@@ -155,21 +307,58 @@ class FileCabinet(fl.FlightServerBase):
         to 'open'. This will throw a 'QueryTooNarrow' error if no
         datasets are identified.
 
+    get(ticket, columns, filters): This services a get request by
+        returning the dataset filed under the ticket. Columns and
+        filters are applied before any data is returned.
+
+    do_get(context, ticket): Flight endpoint which streams the
+        dataset filed under the ticket back to the client in record
+        batches of at most max_chunksize rows. Tickets created with
+        make_ticket carry columns and filters which are evaluated
+        here, before anything is put on the wire.
+
+    do_put(context, descriptor, reader, writer): Flight endpoint
+        which files record batches as they arrive. The dataset is
+        filed under the first path element of the descriptor and the
+        ticket is written back to the client as metadata.
+
+    derive(ticket, name, transform, columns): This computes a new
+        column from columns of a dataset with a registered
+        transformation and adds it to the dataset. The same is done
+        by the do_exchange Flight endpoint.
+
+    propose(ticket, name, transform, columns): This adds a new column
+        to a dataset without computing it. The column is computed the
+        first time it is read and memoized; see expression_graph.
+
+    federate(ticket, schema, partitions): This records where the
+        partitions of a dataset split across a federation of cabinets
+        are filed. get_flight_info then returns an endpoint for every
+        partition; see themodelshop.federation.
+
+    local_paths(ticket): This writes the columns of the dataset
+        filed under the ticket to Arrow IPC files, if they are not on
+        disk already, and returns the location of those files. The
+        same paths are returned by the 'local_paths' Flight action;
+        open_local uses them to memory map datasets on the same host.
+
     get(**kwargs): This takes the dataset identified by this
         .query(**kwargs) and services a get request by returning the
         information. This is using appropriate file or variable
         handling functions which are loaded from the file_cabinet
         utilities to allow returning an item appropriately.
 
-    open(**kwargs): This uses appropriate handling techniques to
-        read the datasets identified by this .query(**kwargs) and
-        ensure they are available for get operations. This will
-        throw a QueryTooNarrow error if no datasets are identified.
+    open(): This registers the datasets written by close as lazy
+        PyArrow datasets without reading them. A column is read into
+        memory the first time it is needed, while filtered gets scan
+        the Parquet files and skip row groups whose statistics rule
+        them out.
 
-    close(**kwargs): This uses appropriate handling techniques to
-        write the datasets identified by this .query(**kwargs) and
-        ensure their open status is set to false. This will throw a
-        QueryTooNarrow error if no datasets are identified.
+    close(row_group_size, rows_per_file, compression, partition_by):
+        This writes the stored columns of every dataset to
+        partitioned Parquet, along with the metadata, lineage,
+        expression graph, and federated partitions, and releases the
+        memory the datasets used.
 
     Returns
     -------
@@ -182,22 +371,53 @@ class FileCabinet(fl.FlightServerBase):
         address: str = "grpc://0.0.0.0:8815",
         #grpc_on: bool = False,
         name: str = None,
+        max_chunksize: int = 65536,
+        memory_budget: int = None,
+        persist: bool = False,
         **kwargs
     ):
         # TODO: Think about this, should I embed the capability to
         # turn grpc off?
         super().__init__(address, **kwargs)
-        # The internal dataset should be PyArrow?
-        self._data = {}
-        self._metadata = {}
+        # The internal datasets are stored as columns keyed by the
+        # digest of their contents. Each ticket has a schema and a
+        # manifest listing the digests of its columns.
+        self._location = location
+        self._data = ResidencyManager(location, memory_budget, persist)
+        self._schemas = {}
+        self._manifests = {}
+        self._digests = {}
+        self._column_tickets = {}
+        self._lineage = {}
+        # Columns which are computed when they are read, keyed by the
+        # digest of their expression.
+        self._expressions = {}
+        # Datasets partitioned across a federation which this cabinet
+        # routes; the schema and the location and rows of every part.
+        self._partitions = {}
+        # Datasets written by close; the pyarrow dataset and its
+        # entry in the manifest. Their stored columns are read from
+        # disk the first time they are needed.
+        self._datasets = {}
+        self._on_disk = {}
+        # Flight serves requests on many threads; this guards the
+        # indexes above.
+        self._lock = threading.RLock()
+        self._metadata = MetadataCatalog()
+        self._max_chunksize = max_chunksize
         # This is an identifier for this cabinet.
         self._name = name
         if name is None:
             self._uuid = uuid.uuid1()
         else:
-            uuid.uuid3(uuid.NAMESPACE_DNS, self._name)
+            self._uuid = uuid.uuid3(uuid.NAMESPACE_DNS, self._name)
 
-    def query(self, **kwargs: Any):
+    @property
+    def location(self) -> str:
+        """The folder this cabinet writes its files to."""
+        return self._location
+
+    def query(self, **kwargs: Any) -> pa.Table:
         """Retrieve filterable metadata for internal datasets.
 
         This is a function that will return, if no parameters are
@@ -208,13 +428,24 @@ class FileCabinet(fl.FlightServerBase):
 
         ```python
         file_cabinet.query(x=2,y=3)
+        ```
+
+        only the metadata for objects registered with x equal to 2
+        and y equal to 3 is returned.
+
+        Returns
+        -------
+        metadata: pyarrow.Table
+            This is one row of metadata for each matching object,
+            including the ticket it was filed under.
 
+        Raises
+        ------
+        MetaDataError
+            If any of the filtered fields are not in the metadata.
         """
-        # TODO: Change this syntax to the appropriate effect.
-        # This will likely need some further work, but it will
-        # work as a placeholder.
-        query_str = ["f{k} == {v}" for k,v in kwargs.items()]
-        return pd.DataFrame(self._metadata).query(*query_str)
+        with self._lock:
+            return self._metadata.query(**kwargs)
 
     def _handle(rw:str='r',obj:Any=None):
         """Read or write a file appropriately.
@@ -231,37 +462,239 @@ class FileCabinet(fl.FlightServerBase):
             'd': Delete
         """
         pass
-    def _put(self,data):
+    def _put(self, data: Any, ticket: str = None) -> str:
         """Files a thing into the cabinet.
 
         This will place an item into storage and will return the
         necessary metadata to retrieve the data upon request.
+
+        Storage is content addressed. Every column is stored once,
+        keyed by the digest of its contents, and a table is a list
+        of column digests. Filing data which is already in the
+        cabinet returns the ticket it is filed under, and a table
+        which shares columns with a filed table only stores the
+        columns which are new. The filed table sharing the most
+        columns is recorded as the parent of the new table.
+
+        Parameters
+        ----------
+        data: Any
+            This is the object to store in the cabinet.
+        ticket: str = None
+            This is the ticket to file the data under. If this is not
+            passed a unique ticket is generated, unless the data is
+            already filed.
+
+        Returns
+        -------
+        ticket: str
+            This is the ticket the data was filed under.
         """
-        # Generate a unique identifier for the data.
-        _ticket = uuid.uuid1()
         # This will blow up if the data cannot be cast to PyArrow.
-        _data = _standardize(data)
-        # At this point the data is PyArrow format.
-        # self.tables[ticket_name] = reader.read_all()
+        tbl = _standardize(data)
+        digests = [column_digest(column) for column in tbl.columns]
+        return self._file(tbl, digests, ticket)
+
+    def _file(self, tbl: pa.Table, digests: List[str], ticket: str = None) -> str:
+        """File a table whose column digests are already known.
+
+        Parameters
+        ----------
+        tbl: pyarrow.Table
+            This is the table to file.
+        digests: List[str]
+            These are the digests of the columns of the table.
+        ticket: str = None
+            This is the ticket to file the table under.
+
+        Returns
+        -------
+        ticket: str
+            This is the ticket the table was filed under.
+        """
+        digest = table_digest(tbl.schema, digests)
+        with self._lock:
+            if ticket is None and digest in self._digests:
+                return self._digests[digest]
+            # Generate a unique identifier for the data.
+            if ticket is None:
+                ticket = str(uuid.uuid1())
+            if ticket in self._schemas:
+                self._unfile(ticket)
+            # Find the filed table with the most columns in common.
+            shared = Counter(
+                parent
+                for column in set(digests)
+                for parent in self._column_tickets.get(column, ())
+                if parent != ticket
+            )
+            self._lineage[ticket] = None
+            if shared:
+                self._lineage[ticket] = shared.most_common(1)[0][0]
+            for column, name in zip(tbl.columns, digests):
+                if name not in self._data:
+                    self._data[name] = pa.table([column], names=['data'])
+                    record_written(column.nbytes)
+                self._column_tickets.setdefault(name, set()).add(ticket)
+            self._schemas[ticket] = tbl.schema
+            self._manifests[ticket] = digests
+            self._digests.setdefault(digest, ticket)
+            self._datasets.pop(ticket, None)
+            return ticket
 
-        return _ticket
+    def _unfile(self, ticket: str):
+        """Forget the table filed under a ticket before it is refiled.
+
+        The columns stay in storage, since other tables may share
+        them, but they no longer point back at the ticket.
+        """
+        manifest = self._manifests.pop(ticket)
+        previous = table_digest(self._schemas.pop(ticket), manifest)
+        if self._digests.get(previous) == ticket:
+            del self._digests[previous]
+        for column in manifest:
+            tickets = self._column_tickets.get(column, set())
+            tickets.discard(ticket)
+            if not tickets:
+                self._column_tickets.pop(column, None)
 
-    def _get(self):
+    def _get(self, ticket: str, columns: List[str] = None) -> pa.Table:
         """Get a thing from the cabinet.
 
         This will get an item from storage, regardless of cabinet
         location, as long as the information is available (i.e.
         registered or available locally.)
+
+        Parameters
+        ----------
+        ticket: str
+            This is the ticket the data was filed under.
+        columns: List[str] = None
+            If this is passed only these columns are assembled.
+
+        Returns
+        -------
+        data: pyarrow.Table
+            This is the data filed under the ticket.
+        """
+        with self._lock:
+            try:
+                schema = self._schemas[ticket]
+                manifest = self._manifests[ticket]
+            except KeyError:
+                raise TicketError("No data filed under ticket.", ticket)
+            if columns is None:
+                columns = schema.names
+            positions = [schema.get_field_index(name) for name in columns]
+            if -1 in positions:
+                raise KeyError(f"Columns {columns} are not all in {schema.names}.")
+            return pa.Table.from_arrays(
+                [self._column(manifest[i]) for i in positions],
+                schema=pa.schema(
+                    [schema.field(i) for i in positions],
+                    metadata=schema.metadata
+                )
+            )
+
+    def _scan(
+        self,
+        ticket: str,
+        columns: List[str] = None,
+        filters: List = None
+    ):
+        """Build a scanner over a filed dataset.
+
+        The projection and filters are evaluated by the PyArrow
+        dataset engine so that only the requested data is ever
+        materialized.
+        """
+        # The dataset engine imports pandas, so only import it when
+        # a scan is needed.
+        import pyarrow.dataset as ds
+        if ticket in self._datasets:
+            dataset, entry = self._datasets[ticket]
+            needed = columns if columns is not None else self._schemas[ticket].names
+            if set(needed + _filter_columns(filters)) <= set(entry['columns']):
+                # Row groups are skipped using their statistics.
+                return dataset.scanner(
+                    columns=needed,
+                    filter=_to_expression(filters),
+                    batch_size=self._max_chunksize
+                )
+        needed = None
+        if columns is not None:
+            needed = list(dict.fromkeys(columns + _filter_columns(filters)))
+        return ds.dataset(self._get(ticket, needed)).scanner(
+            columns=columns,
+            filter=_to_expression(filters),
+            batch_size=self._max_chunksize
+        )
+
+    @track('cabinet.get')
+    def get(
+        self,
+        ticket: str,
+        columns: List[str] = None,
+        filters: List = None
+    ) -> pa.Table:
+        """Get a dataset from the cabinet.
+
+        Parameters
+        ----------
+        ticket: str
+            This is the ticket the data was filed under.
+        columns: List[str] = None
+            These are the columns to return. All columns are
+            returned if this is not passed.
+        filters: List = None
+            These are (column, operator, value) tuples which rows
+            must satisfy. A list of tuples is combined with 'and'
+            while a list of lists of tuples is combined with 'or'.
+            The operators are =, ==, !=, <, <=, >, >=, in and not in.
+
+        Returns
+        -------
+        data: pyarrow.Table
+            This is the data filed under the ticket.
+        """
+        if columns is None and filters is None:
+            tbl = self._get(ticket)
+        else:
+            tbl = self._scan(ticket, columns, filters).to_table()
+        record_read(tbl.nbytes)
+        return tbl
+
+    @track('cabinet.put')
+    def put(self, data: Any) -> str:
+        """File a dataset into the cabinet without metadata.
+
+        Parameters
+        ----------
+        data: Any
+            This is the object to store in the cabinet.
+
+        Returns
+        -------
+        ticket: str
+            This is the ticket the data was filed under.
         """
-        raise NotImplementedError
+        return self._put(data)
 
-    def register(self,data:Any,metadata:Dict[str,str]):
+    @track('cabinet.register')
+    def register(self,data:Any,metadata:Dict[str,str]) -> str:
         """Register a dataset.
 
         This publishes an item in the cabinet, marking it as
         available. By default this will create a dissemination mask
         empty for all users aside from the current cabinet.
 
+        The lineage of the item is added to its metadata; 'parent'
+        is the ticket of the filed table sharing the most columns
+        with it and 'derived_columns' are the columns it does not
+        share with its parent. Registering data which is already
+        filed returns the ticket it is filed under, and updates the
+        metadata of that ticket rather than adding a second row.
+
         Parameters
         ----------
         data: Any
@@ -276,38 +709,785 @@ class FileCabinet(fl.FlightServerBase):
             This is the unique identifier in this cabinet which is
             used to identify this dataset.
         """
-        
         # Attempt to publish the data.
         ticket = self._put(data)
+        row = {
+            'ticket': ticket,
+            'parent': self._lineage[ticket],
+            'derived_columns': self._derived_columns(ticket),
+            **metadata
+        }
+        with self._lock:
+            filed = self._metadata.rows(ticket=ticket) if len(self._metadata) else []
+            if filed:
+                self._metadata.update(filed[0], row)
+            else:
+                self._metadata.add(row)
+        return ticket
+
+    def _derived_columns(self, ticket: str) -> List[str]:
+        """List the columns a table does not share with its parent."""
+        parent = self._lineage[ticket]
+        if parent is None:
+            return self._schemas[ticket].names
+        inherited = set(self._manifests[parent])
+        return [
+            name
+            for name, column in zip(
+                self._schemas[ticket].names,
+                self._manifests[ticket]
+            )
+            if column not in inherited
+        ]
+
+    def local_paths(self, ticket: str) -> Dict[str, str]:
+        """Get the location of a dataset's columns on disk.
+
+        Columns which are only held in memory are written to an
+        uncompressed Arrow IPC file first, after which the cabinet
+        holds a memory map of that file as well. Columns shared
+        between datasets are stored in the same file.
+
+        Parameters
+        ----------
+        ticket: str
+            This is the ticket the data was filed under.
+
+        Returns
+        -------
+        paths: Dict[str,str]
+            This is the absolute location of the Arrow IPC file for
+            each column, in column order.
+        """
+        with self._lock:
+            try:
+                names = self._schemas[ticket].names
+                manifest = self._manifests[ticket]
+            except KeyError:
+                raise TicketError("No data filed under ticket.", ticket)
+            paths = {}
+            for name, column in zip(names, manifest):
+                self._column(column)
+                paths[name] = self._data.persist(column)
+            return paths
+
+    def _column(self, digest: str) -> pa.ChunkedArray:
+        """Read a column, computing it if it is a proposed column.
+
+        Proposed columns are computed batch by batch from their
+        parents, which are computed first if need be, and memoized
+        with the time they took to compute. Under memory pressure they
+        are dropped and are computed again when next read.
+        """
         try:
-            self._put(data)
+            return self._data[digest].column(0)
+        except KeyError:
+            pass
+        if digest in self._on_disk:
+            dataset, name, ordered = self._on_disk[digest]
+            if ordered:
+                tbl = dataset.to_table(columns=[name, _ROW])
+                column = tbl[name].take(pc.sort_indices(tbl[_ROW]))
+            else:
+                column = dataset.to_table(columns=[name])[name]
+            record_read(column.nbytes)
+            self._data[digest] = pa.table([column], names=['data'])
+            return column
         try:
-            self._metadata[_ticket] = metadata
-            self._data[_ticket] = data
-        except:
-            raise TicketError("Unable to add.")
+            expression = self._expressions[digest]
+        except KeyError:
+            raise KeyError(f"Column {digest} is not in the cabinet.") from None
+        parents = pa.table(
+            [self._column(parent) for parent in expression['parents']],
+            names=[str(i) for i in range(len(expression['parents']))]
+        )
+        func = get_transform(expression['transform'])
+        scalars, params = expression['scalars'] or [], expression['params'] or {}
+        start = time.perf_counter()
+        chunks = [
+            func(*batch.columns, *scalars, **params)
+            for batch in parents.to_batches(max_chunksize=self._max_chunksize)
+        ]
+        column = pa.chunked_array(chunks, type=expression['type'])
+        record_written(column.nbytes)
+        self._data.memoize(
+            digest,
+            pa.table([column], names=['data']),
+            time.perf_counter() - start
+        )
+        return column
+
+    @track('cabinet.propose')
+    def propose(
+        self,
+        ticket: str,
+        name: str,
+        transform: str,
+        columns: List[str],
+        scalars: List = None,
+        params: Dict[str, Any] = None
+    ) -> str:
+        """Add a column to a dataset without computing it.
+
+        The column is identified by its expression, the
+        transformation and the columns it is computed from, so the
+        same column proposed by different agents, or for different
+        datasets sharing its parents, is computed and stored once.
+        Proposed columns may be used in other proposals. See derive
+        for the parameters.
+
+        Returns
+        -------
+        digest: str
+            This identifies the column in the expression graph.
+        """
+        with self._lock:
+            try:
+                schema = self._schemas[ticket]
+                manifest = self._manifests[ticket]
+            except KeyError:
+                raise TicketError("No data filed under ticket.", ticket)
+            if name in schema.names:
+                raise ValueError(f"{name} is already a column of {ticket}.")
+            func = get_transform(transform)
+            parents = []
+            for column in columns:
+                position = schema.get_field_index(column)
+                if position == -1:
+                    raise KeyError(f"Column {column} is not in {schema.names}.")
+                parents.append(manifest[position])
+            digest = expression_digest(transform, parents, scalars, params)
+            if digest not in self._expressions:
+                # Find the type of the column without computing it.
+                empty = [pa.array([], type=schema.field(column).type) for column in columns]
+                self._expressions[digest] = {
+                    'transform': transform,
+                    'parents': parents,
+                    'scalars': scalars,
+                    'params': params,
+                    'type': func(*empty, *(scalars or []), **(params or {})).type,
+                }
+            self._append(ticket, name, self._expressions[digest]['type'], digest)
+            return digest
+
+    def expression_graph(self) -> pa.Table:
+        """List the proposed columns.
+
+        Returns
+        -------
+        graph: pyarrow.Table
+            One row per proposed column with its digest, its
+            transformation, the digests of its parents, its scalars
+            and parameters as JSON, and whether it is in memory or on
+            disk.
+        """
+        digests = list(self._expressions)
+        nodes = [self._expressions[digest] for digest in digests]
+        return pa.table({
+            'digest': pa.array(digests, pa.string()),
+            'transform': pa.array([node['transform'] for node in nodes], pa.string()),
+            'parents': pa.array(
+                [node['parents'] for node in nodes], pa.list_(pa.string())
+            ),
+            'scalars': pa.array(
+                [json.dumps(node['scalars']) for node in nodes], pa.string()
+            ),
+            'params': pa.array(
+                [json.dumps(node['params']) for node in nodes], pa.string()
+            ),
+            'materialized': pa.array(
+                [digest in self._data for digest in digests], pa.bool_()
+            ),
+        })
+
+    def _derive(
+        self,
+        ticket: str,
+        name: str,
+        transform: str,
+        columns: List[str],
+        scalars: List = None,
+        params: Dict[str, Any] = None
+    ) -> Iterator[pa.RecordBatch]:
+        """Compute a derived column batch by batch.
+
+        Yields
+        ------
+        batch: pyarrow.RecordBatch
+            A batch with the single derived column.
+        """
+        if name in self._schemas.get(ticket, pa.schema([])).names:
+            raise ValueError(f"{name} is already a column of {ticket}.")
+        func = get_transform(transform)
+        tbl = self._get(ticket, columns)
+        batches = tbl.to_batches(max_chunksize=self._max_chunksize)
+        if not batches:
+            batches = [pa.RecordBatch.from_arrays(
+                [pa.array([], type=field.type) for field in tbl.schema],
+                schema=tbl.schema
+            )]
+        for batch in batches:
+            derived = func(*batch.columns, *(scalars or []), **(params or {}))
+            yield pa.RecordBatch.from_arrays([derived], names=[name])
+
+    def _attach(self, ticket: str, name: str, batches: List[pa.RecordBatch]):
+        """Add a column to a filed dataset in place.
+
+        The ticket keeps its columns and gains one more; the columns
+        it already has are not copied.
+        """
+        with self._lock:
+            column = pa.chunked_array(
+                [batch.column(0) for batch in batches],
+                type=batches[0].schema.field(0).type
+            )
+            digest = column_digest(column)
+            if digest not in self._data:
+                self._data[digest] = pa.table([column], names=['data'])
+                record_written(column.nbytes)
+            self._append(ticket, name, column.type, digest)
+
+    def _append(self, ticket: str, name: str, data_type: pa.DataType, digest: str):
+        """Add a column to the schema and manifest of a dataset."""
+        schema, manifest = self._schemas[ticket], self._manifests[ticket]
+        previous = table_digest(schema, manifest)
+        if self._digests.get(previous) == ticket:
+            del self._digests[previous]
+        schema = schema.append(pa.field(name, data_type))
+        manifest = manifest + [digest]
+        self._schemas[ticket] = schema
+        self._manifests[ticket] = manifest
+        self._column_tickets.setdefault(digest, set()).add(ticket)
+        self._digests.setdefault(table_digest(schema, manifest), ticket)
+
+    @track('cabinet.derive')
+    def derive(
+        self,
+        ticket: str,
+        name: str,
+        transform: str,
+        columns: List[str],
+        scalars: List = None,
+        params: Dict[str, Any] = None
+    ) -> pa.Table:
+        """Add a column computed from other columns of a dataset.
+
+        The new column is computed batch by batch and added to the
+        dataset under the same ticket.
+
+        Parameters
+        ----------
+        ticket: str
+            This is the ticket the data was filed under.
+        name: str
+            This is the name of the new column.
+        transform: str
+            This is the name of a registered transformation; see
+            themodelshop.utils.data.transforms.
+        columns: List[str]
+            These are the columns passed to the transformation.
+        scalars: List = None
+            These are passed to the transformation after the columns,
+            i.e. the exponent of 'power'.
+        params: Dict[str,Any] = None
+            These are passed to the transformation as keywords.
+
+        Returns
+        -------
+        derived: pyarrow.Table
+            A table holding only the new column.
+        """
+        batches = list(self._derive(ticket, name, transform, columns, scalars, params))
+        self._attach(ticket, name, batches)
+        return pa.Table.from_batches(batches)
+
+    def federate(
+        self,
+        ticket: str,
+        schema: pa.Schema,
+        partitions: List[Tuple[str, int]]
+    ):
+        """Record a dataset partitioned across cabinets.
+
+        Parameters
+        ----------
+        ticket: str
+            This is the ticket of the whole dataset. Partition i is
+            filed under the ticket '{ticket}/{i}'.
+        schema: pyarrow.Schema
+            This is the schema of the dataset.
+        partitions: List[Tuple[str,int]]
+            This is the location of the cabinet holding each
+            partition and the number of rows in it, in order.
+
+        Returns
+        -------
+        previous: List[Tuple[str,int]]
+            These are the partitions previously recorded under the
+            ticket, if any, so that the caller can discard those
+            which were not refiled.
+        """
+        with self._lock:
+            previous = self._partitions.get(ticket, (None, []))[1]
+            self._partitions[ticket] = (schema, [tuple(part) for part in partitions])
+            return previous
+
+    def discard(self, ticket: str):
+        """Remove the data filed under a ticket, if there is any.
+
+        The columns stay in storage, since other tables may share
+        them.
+        """
+        with self._lock:
+            if ticket in self._manifests:
+                self._unfile(ticket)
+            self._lineage.pop(ticket, None)
+            self._datasets.pop(ticket, None)
+            self._partitions.pop(ticket, None)
+
+    def _flight_info(
+        self,
+        descriptor: fl.FlightDescriptor,
+        ticket: str,
+        columns: List[str] = None,
+        filters: List = None
+    ) -> fl.FlightInfo:
+        """Describe where the parts of a dataset can be fetched."""
+        if ticket in self._partitions:
+            schema, partitions = self._partitions[ticket]
+            endpoints = [
+                fl.FlightEndpoint(make_ticket(f"{ticket}/{i}", columns, filters), [location])
+                for i, (location, _) in enumerate(partitions)
+            ]
+            rows = sum(rows for _, rows in partitions)
+        elif ticket in self._schemas:
+            schema, manifest = self._schemas[ticket], self._manifests[ticket]
+            # No location means the cabinet which was asked.
+            endpoints = [fl.FlightEndpoint(make_ticket(ticket, columns, filters), [])]
+            rows = -1
+            if manifest and manifest[0] in self._data:
+                rows = self._data[manifest[0]].num_rows
+        else:
+            raise TicketError("No data filed under ticket.", ticket)
+        if columns is not None:
+            schema = pa.schema(
+                [schema.field(name) for name in columns],
+                metadata=schema.metadata
+            )
+        if filters is not None:
+            rows = -1
+        return fl.FlightInfo(schema, descriptor, endpoints, rows, -1)
+
+    ################################################################
+    # Flight endpoints
+    #   1. get_flight_info
+    #   2. list_flights
+    #   3. do_get
+    #   4. do_put
+    #   5. do_exchange
+    #   6. do_action
+    ################################################################
+    def get_flight_info(self, context, descriptor: fl.FlightDescriptor) -> fl.FlightInfo:
+        """Describe how to fetch a dataset.
+
+        The descriptor is either a path whose first element is the
+        ticket, or a command holding a ticket made by make_ticket. A
+        dataset partitioned across a federation has one endpoint for
+        every partition, at the cabinet holding it, so that clients
+        can fetch the partitions in parallel.
+        """
+        if descriptor.descriptor_type == fl.DescriptorType.PATH:
+            ticket, columns, filters = descriptor.path[0].decode(), None, None
+        else:
+            ticket, columns, filters = _read_ticket(descriptor.command)
+        return self._flight_info(descriptor, ticket, columns, filters)
+
+    def list_flights(self, context, criteria: bytes) -> Iterator[fl.FlightInfo]:
+        """Describe every dataset in the cabinet.
+
+        This includes the partitioned datasets this cabinet routes as
+        well as the datasets, and partitions, filed here.
+        """
+        for ticket in list(self._partitions) + list(self._schemas):
+            yield self._flight_info(fl.FlightDescriptor.for_path(ticket), ticket)
+
+    @track('cabinet.do_get')
+    def do_get(self, context, ticket: fl.Ticket) -> fl.RecordBatchStream:
+        """Stream a dataset out of the cabinet.
+
+        The record batches are zero-copy slices of the filed table,
+        so serving the same dataset many times does not create any
+        additional copies of it. Column projections and filters
+        carried by the ticket are applied before streaming.
+        """
+        ticket, columns, filters = _read_ticket(ticket.ticket)
+        if columns is None and filters is None:
+            tbl = self._get(ticket)
+            record_written(tbl.nbytes)
+            reader = pa.RecordBatchReader.from_batches(
+                tbl.schema,
+                tbl.to_batches(max_chunksize=self._max_chunksize)
+            )
+        else:
+            reader = self._scan(ticket, columns, filters).to_reader()
+        return fl.RecordBatchStream(reader)
+
+    @track('cabinet.do_put')
+    def do_put(self, context, descriptor: fl.FlightDescriptor, reader, writer):
+        """File a stream of record batches into the cabinet.
+
+        Each batch is added to the column digests as it arrives, so
+        the upload is hashed while it streams in rather than in a
+        second pass once it is complete. The batches themselves are
+        kept, since the cabinet holds its columns in memory, and are
+        assembled into a table without copying their buffers. If the
+        descriptor has a path the data is filed under the first
+        element of the path, otherwise a new ticket is generated. The
+        ticket is written back to the client as metadata.
+        """
+        ticket = None
+        if (
+            descriptor.descriptor_type == fl.DescriptorType.PATH
+            and descriptor.path
+        ):
+            ticket = descriptor.path[0].decode()
+        digests = StreamDigest(reader.schema)
+        batches = []
+        for chunk in reader:
+            digests.update(chunk.data)
+            record_read(chunk.data.nbytes)
+            batches.append(chunk.data)
+        ticket = self._file(
+            pa.Table.from_batches(batches, schema=reader.schema),
+            digests.hexdigests(),
+            ticket
+        )
+        writer.write(pa.py_buffer(ticket.encode()))
 
+    @track('cabinet.do_exchange')
+    def do_exchange(self, context, descriptor: fl.FlightDescriptor, reader, writer):
+        """Derive a new column next to the data.
+
+        The descriptor is a command holding a JSON object with the
+        arguments of derive: the 'ticket' of the dataset, the 'name'
+        of the new column, the 'transform', its input 'columns', and
+        optionally 'scalars' and 'params'. The client sends no data.
+        The new column is streamed back as it is computed and then
+        added to the dataset.
+        """
+        spec = json.loads(descriptor.command)
+        batches = []
+        for batch in self._derive(
+            spec['ticket'],
+            spec['name'],
+            spec['transform'],
+            spec['columns'],
+            spec.get('scalars'),
+            spec.get('params')
+        ):
+            if not batches:
+                writer.begin(batch.schema)
+            writer.write_batch(batch)
+            record_written(batch.nbytes)
+            batches.append(batch)
+        self._attach(spec['ticket'], spec['name'], batches)
+
+    def list_actions(self, context):
+        return [
+            ('discard', 'Remove the data filed under a ticket.'),
+            ('federate', 'Record where the partitions of a dataset are filed.'),
+            ('local_paths', 'Location of the Arrow IPC files for a ticket.'),
+            ('propose', 'Add a column which is computed when it is read.'),
+            ('query', 'Metadata of the datasets matching a query.')
+        ]
+
+    def do_action(self, context, action: fl.Action):
+        """Run a named action.
+
+        Actions
+        -------
+        discard: The body is a ticket; see discard.
+        federate: The body is a JSON object with the 'ticket', the
+            hexadecimal serialized 'schema', and the 'partitions' of
+            a partitioned dataset; see federate. The result is a JSON
+            list of the partitions previously recorded.
+        local_paths: The body is a ticket. The result is a JSON
+            object with the location of the Arrow IPC file holding
+            each column of that dataset.
+        propose: The body is a JSON object with the arguments of
+            propose. The result is the digest of the column.
+        query: The body is a JSON object of exact filter criteria,
+            see query. The result is the matching metadata as an
+            Arrow IPC stream.
+        """
+        if action.type == 'discard':
+            self.discard(action.body.to_pybytes().decode())
+            return []
+        if action.type == 'federate':
+            request = json.loads(action.body.to_pybytes())
+            schema = pa.ipc.read_schema(pa.py_buffer(bytes.fromhex(request['schema'])))
+            previous = self.federate(request['ticket'], schema, request['partitions'])
+            return [fl.Result(pa.py_buffer(json.dumps(previous).encode()))]
+        if action.type == 'local_paths':
+            paths = self.local_paths(action.body.to_pybytes().decode())
+            return [fl.Result(pa.py_buffer(json.dumps(paths).encode()))]
+        if action.type == 'propose':
+            digest = self.propose(**json.loads(action.body.to_pybytes()))
+            return [fl.Result(pa.py_buffer(digest.encode()))]
+        if action.type == 'query':
+            criteria = json.loads(action.body.to_pybytes() or b'{}')
+            metadata = self.query(**criteria)
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, metadata.schema) as writer:
+                writer.write_table(metadata)
+            return [fl.Result(sink.getvalue())]
+        raise NotImplementedError(f"Unknown action {action.type}.")
+
+    def _register(self, manifest: Dict[str, Any]):
+        """Register the datasets in a manifest written by close."""
+        import pyarrow.dataset as ds
+        root = os.path.join(self._location, 'cabinet')
+        self._datasets = {}
+        self._on_disk = {}
+        for ticket, entry in manifest['datasets'].items():
+            schema = _read_schema(entry['schema'])
+            stored = pa.schema(
+                [schema.field(name) for name in entry['columns']],
+                metadata=schema.metadata
+            )
+            partitioning = None
+            if entry['partition_by']:
+                partitioning = ds.partitioning(
+                    pa.schema([schema.field(name) for name in entry['partition_by']]),
+                    flavor='hive'
+                )
+                stored = stored.append(pa.field(_ROW, pa.int64()))
+            # The schema is known, so no file is opened until a scan.
+            dataset = ds.dataset(
+                os.path.join(root, entry['path']),
+                schema=stored,
+                format='parquet',
+                partitioning=partitioning
+            )
+            self._datasets[ticket] = (dataset, entry)
+            digests = entry['manifest']
+            if ticket not in self._schemas:
+                self._schemas[ticket] = schema
+                self._manifests[ticket] = digests
+                for digest in digests:
+                    self._column_tickets.setdefault(digest, set()).add(ticket)
+                self._digests.setdefault(table_digest(schema, digests), ticket)
+            for name in entry['columns']:
+                digest = digests[schema.get_field_index(name)]
+                self._on_disk.setdefault(
+                    digest, (dataset, name, bool(entry['partition_by']))
+                )
+        for digest, node in manifest['expressions'].items():
+            self._expressions.setdefault(
+                digest, {**node, 'type': _read_schema(node['type']).field(0).type}
+            )
+        self._lineage.update(manifest['lineage'])
+        for ticket, entry in manifest['partitions'].items():
+            self.federate(ticket, _read_schema(entry['schema']), entry['partitions'])
+
+    @track('cabinet.open')
     def open(self):
         """Opens a closed cabinet.
 
-        Opening a cabinet will check the branch workspace for a
-        cabinet (if it exists in metadata already) and make available
-        all information in this workspace by registering persistent
-        datasets. Each filing cabinet is associated with a UUID and
-        as a result cabinets can be opened and closed at will to
-        allow for projects to easily be cleaned up and instantiated.
+        Opening a cabinet will check the workspace for a cabinet
+        written by close and make available all information in this
+        workspace by registering persistent datasets. Only the
+        manifest is read; every stored column is read from disk the
+        first time it is needed, so opening takes the same time no
+        matter how large the datasets are. Filtered gets of stored
+        columns only read the row groups which may hold matching
+        rows. Proposed columns are proposed again, and computed when
+        they are read. Nothing is done if no cabinet was written.
         """
-        raise NotImplementedError
+        root = os.path.join(self._location, 'cabinet')
+        try:
+            with open(os.path.join(root, 'cabinet.json')) as stream:
+                manifest = json.load(stream)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._register(manifest)
+        metadata = os.path.join(root, 'metadata.parquet')
+        if os.path.exists(metadata):
+            import pyarrow.parquet as pq
+            catalog = MetadataCatalog()
+            for row in pq.read_table(metadata).to_pylist():
+                catalog.add(row)
+            with self._lock:
+                self._metadata = catalog
 
-    def close(self):
+    @track('cabinet.close')
+    def close(
+        self,
+        row_group_size: int = 131072,
+        rows_per_file: int = 1048576,
+        compression: str = 'zstd',
+        partition_by: Dict[str, List[str]] = None
+    ):
         """Closes an open cabinet.
 
-        Write all workspace specific non-temporary datasets to disk
-        if required. Delete all temporary datasets in this workspace
-        from metadata. Publish all persistent information to higher
-        level cabinets, if that information is in use elsewhere.
+        Every dataset is written to a folder of Parquet files in the
+        workspace, along with the metadata catalog, the lineage of
+        the datasets, the expression graph of proposed columns, and
+        the partitions of federated datasets. Proposed columns are
+        not computed; they are proposed again on open. Datasets which
+        were read from disk and have not been refiled since are not
+        written again. Row groups are written whole, with min/max
+        statistics for every column, so filtered gets after open skip
+        the row groups which cannot match; string columns are
+        dictionary encoded. The memory held by the datasets is then
+        released and they remain available as if the cabinet was
+        just opened.
+
+        Parameters
+        ----------
+        row_group_size: int = 131072
+            The number of rows in a row group. Smaller row groups
+            let filters skip more precisely at the cost of more
+            statistics to read.
+        rows_per_file: int = 1048576
+            The largest number of rows in one Parquet file. This must
+            be at least the row group size.
+        compression: str = 'zstd'
+            The Parquet compression codec.
+        partition_by: Dict[str,List[str]] = None
+            The columns to partition each dataset by, keyed by
+            ticket. Partitioned datasets are written as hive style
+            folders. Filtered gets return their rows grouped by
+            partition, while whole columns are read in order.
         """
-        raise NotImplementedError
+        import pyarrow.dataset as ds
+        root = os.path.join(self._location, 'cabinet')
+        partition_by = partition_by or {}
+        with self._lock:
+            manifest = {
+                'name': self._name,
+                'datasets': {},
+                'expressions': {
+                    digest: {
+                        **node,
+                        'type': _write_schema(pa.schema([pa.field('data', node['type'])]))
+                    }
+                    for digest, node in self._expressions.items()
+                },
+                'lineage': self._lineage,
+                'partitions': {
+                    ticket: {
+                        'schema': _write_schema(schema),
+                        'partitions': partitions
+                    }
+                    for ticket, (schema, partitions) in self._partitions.items()
+                },
+            }
+            # Stored columns may be read from the folders of other
+            # datasets, so read everything which is written before
+            # any folder is replaced.
+            pending = {}
+            for ticket, schema in self._schemas.items():
+                digests = self._manifests[ticket]
+                stored = [
+                    name for name, digest in zip(schema.names, digests)
+                    if digest not in self._expressions
+                ]
+                entry = self._datasets.get(ticket, (None, {}))[1]
+                columns = partition_by.get(ticket, entry.get('partition_by'))
+                if entry.get('columns') != stored or entry.get('partition_by') != columns:
+                    entry = {'path': quote(ticket, safe=''), 'columns': stored}
+                    pending[ticket] = self._get(ticket, stored)
+                manifest['datasets'][ticket] = {
+                    **entry,
+                    'schema': _write_schema(schema),
+                    'manifest': digests,
+                    'partition_by': columns,
+                }
+            os.makedirs(root, exist_ok=True)
+            file_format = ds.ParquetFileFormat()
+            for ticket, tbl in pending.items():
+                entry = manifest['datasets'][ticket]
+                path = os.path.join(root, entry['path'])
+                partitioning = None
+                if entry['partition_by']:
+                    partitioning = ds.partitioning(
+                        pa.schema([tbl.schema.field(name) for name in entry['partition_by']]),
+                        flavor='hive'
+                    )
+                    tbl = tbl.append_column(
+                        _ROW, pa.array(np.arange(tbl.num_rows, dtype=np.int64))
+                    )
+                dictionary = [
+                    field.name for field in tbl.schema
+                    if pa.types.is_string(field.type)
+                    or pa.types.is_large_string(field.type)
+                    or pa.types.is_binary(field.type)
+                    or pa.types.is_dictionary(field.type)
+                ]
+                shutil.rmtree(path, ignore_errors=True)
+                os.makedirs(path)
+                ds.write_dataset(
+                    tbl,
+                    path,
+                    format=file_format,
+                    file_options=file_format.make_write_options(
+                        use_dictionary=dictionary or False,
+                        compression=compression,
+                        write_statistics=True
+                    ),
+                    partitioning=partitioning,
+                    max_rows_per_group=row_group_size,
+                    min_rows_per_group=row_group_size,
+                    max_rows_per_file=rows_per_file,
+                    existing_data_behavior='overwrite_or_ignore'
+                )
+                record_written(tbl.nbytes)
+            del pending
+            if len(self._metadata):
+                import pyarrow.parquet as pq
+                pq.write_table(
+                    self._metadata.to_table(),
+                    os.path.join(root, 'metadata.parquet')
+                )
+            with open(os.path.join(root, 'cabinet.json'), 'w') as stream:
+                json.dump(manifest, stream)
+            # Release the datasets which are now on disk.
+            for key in list(self._data):
+                del self._data[key]
+            self._register(manifest)
+
+
+def open_local(client: fl.FlightClient, ticket: str) -> pa.Table:
+    """Open a dataset from a cabinet on the same host.
+
+    This asks the cabinet where the dataset is stored and memory maps
+    those files, so no data is copied or sent over the wire. If the
+    files are not visible from this host the dataset is streamed with
+    do_get instead.
+
+    Parameters
+    ----------
+    client: pyarrow.flight.FlightClient
+        This is a client connected to the cabinet.
+    ticket: str
+        This is the ticket the data was filed under.
+
+    Returns
+    -------
+    data: pyarrow.Table
+        This is the data filed under the ticket.
+    """
+    action = fl.Action('local_paths', ticket.encode())
+    result = next(iter(client.do_action(action)))
+    paths = json.loads(result.body.to_pybytes())
+    if all(os.path.exists(path) for path in paths.values()):
+        return pa.table({
+            name: handle_pyarrow_Table.read(path).column(0)
+            for name, path in paths.items()
+        })
+    return client.do_get(fl.Ticket(ticket)).read_all()
 
 
 def main():
@@ -1,5 +1,11 @@
-from collections import deque
-from numpy import array as nparray
+import numpy as np
+
+from numpy.random import default_rng
+from typing import (
+    Any,
+    Dict,
+    Mapping
+)
 
 
 class LaborPool():
@@ -9,20 +15,213 @@ class LaborPool():
     workers. Each of the workers is represented by a minimal set of
     representative numbers. Each item has additional
     statistics such as 'average accuracy', etc...
+
+    The pool is a fixed capacity buffer laid out as a structure of
+    arrays; every statistic is a NumPy array with one slot per
+    worker. Hiring workers simply marks their slots empty. Adding
+    workers fills empty slots first and, once the pool is full,
+    replaces the oldest workers, so that like a deque with a maxlen
+    the pool holds the most recently added workers. Both are done
+    for whole batches of workers at once.
+
+    Every worker also carries a random integer, 'seed', which is
+    passed to the fuzzing algorithm when the worker is hired.
+
+    Parameters
+    ----------
+    *statistics: str
+        The names of the statistics kept for each worker, i.e.
+        'mspe'.
+    maxlen: int = 10000
+        The number of workers the pool can hold.
+    dtypes: Dict[str,Any] = None
+        The NumPy dtype of each statistic. Statistics default to
+        float64.
+    seed: int = None
+        Seed for the random draws made by the pool.
     """
     def __init__(
         self,
         *statistics,
-        maxlen:int=10000
+        maxlen:int=10000,
+        dtypes:Dict[str,Any]=None,
+        seed:int=None
     ):
-        self.pool = {statistic: deque(maxlen=maxlen) for statistic in statistics}
+        dtypes = {'seed': np.int64, **(dtypes or {})}
+        statistics = list(dict.fromkeys(statistics + ('seed',)))
+        self._statistics = statistics[:-1] if statistics[-1] == 'seed' else statistics
+        self._maxlen = maxlen
+        self.pool = {
+            statistic: np.zeros(maxlen, dtype=dtypes.get(statistic, np.float64))
+            for statistic in statistics
+        }
+        self._occupied = np.zeros(maxlen, dtype=bool)
+        # The order in which each slot was filled.
+        self._stamp = np.zeros(maxlen, dtype=np.int64)
+        self._clock = 0
+        self._size = 0
+        self._rng = default_rng(seed)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def statistics(self):
+        """The statistics kept for each worker."""
+        return list(self._statistics)
+
+    def insert(self, **statistics) -> np.ndarray:
+        """Add a batch of workers to the pool.
+
+        Parameters
+        ----------
+        **statistics: array-like
+            The value of each statistic for each new worker. Scalars
+            are broadcast to every worker. Workers without a seed
+            are given a random one. Empty arrays add no workers.
+
+        Returns
+        -------
+        slots: numpy.ndarray
+            The slots the workers were written to.
+        """
+        unknown = set(statistics) - set(self.pool)
+        if unknown:
+            raise KeyError(f"{unknown} are not statistics in this pool.")
+        sizes = [np.size(value) for value in statistics.values()]
+        n = 0 if 0 in sizes else max(sizes + [1])
+        if n == 0:
+            return np.zeros(0, dtype=np.intp)
+        if 'seed' not in statistics:
+            statistics['seed'] = self._rng.integers(np.iinfo(np.int64).max, size=n)
+        # Only the last maxlen workers of a very large batch survive.
+        keep = min(n, self._maxlen)
+        slots = self._allocate(keep)
+        for statistic, column in self.pool.items():
+            values = np.broadcast_to(statistics.get(statistic, 0), n)
+            column[slots] = values[n - keep:]
+        self._size += keep - self._occupied[slots].sum()
+        self._occupied[slots] = True
+        self._stamp[slots] = self._clock + np.arange(keep)
+        self._clock += keep
+        return slots
+
+    def _allocate(self, n: int) -> np.ndarray:
+        """Find slots for n workers, replacing the oldest if needed."""
+        slots = np.flatnonzero(~self._occupied)[:n]
+        short = n - len(slots)
+        if short:
+            occupied = np.flatnonzero(self._occupied)
+            oldest = np.argpartition(self._stamp[occupied], short - 1)[:short]
+            slots = np.concatenate([slots, occupied[oldest]])
+        return slots
+
+    def copy_worker(self, worker: Mapping[str, Any], copies: int = 1) -> Dict[str, np.ndarray]:
+        """Copy a worker.
+
+        The copies carry all the statistics of the worker, along with
+        a new random seed each.
 
-    def copy_worker(self,worker):
-        # Get 
-        raise NotImplementedError
+        Parameters
+        ----------
+        worker: Mapping[str,Any]
+            The statistics of the worker.
+        copies: int = 1
+            The number of copies to make.
 
-    def seed_pool(self,worker):
+        Returns
+        -------
+        copies: Dict[str,numpy.ndarray]
+            The statistics of the copies, one array per statistic.
+        """
+        workers = {
+            statistic: np.full(copies, worker[statistic], dtype=self.pool[statistic].dtype)
+            for statistic in self._statistics
+        }
+        workers['seed'] = self._rng.integers(np.iinfo(np.int64).max, size=copies)
+        return workers
+
+    def seed_pool(self, worker: Mapping[str, Any], copies: int = 1) -> np.ndarray:
+        """Add copies of a worker to the pool.
+
+        This is used when a modeler finishes their contract, when W_r
+        copies of them are added to the pool.
+        """
         # This adds workers to the pool.
-        workers = self.copy_worker(worker)
+        return self.insert(**self.copy_worker(worker, copies))
+
+    def evict(self, slots: np.ndarray):
+        """Remove the workers in these slots from the pool."""
+        slots = np.asarray(slots)
+        self._size -= self._occupied[slots].sum()
+        self._occupied[slots] = False
+
+    def probabilities(self, statistic: str = None, temperature: float = 1.0) -> np.ndarray:
+        """The probability of hiring each slot.
+
+        Workers are hired from a softmax of their negated statistic,
+        so workers with low error are the most likely to be hired.
+        Empty slots have probability zero, so every probability is
+        zero if the pool is empty.
+        """
+        if self._size == 0:
+            return np.zeros(self._maxlen)
+        logits = self._logits(statistic, temperature)
+        weights = np.exp(logits - logits[self._occupied].max())
+        return weights / weights.sum()
+
+    def _logits(self, statistic: str, temperature: float) -> np.ndarray:
+        if statistic is None:
+            statistic = self._statistics[0]
+        logits = np.full(self._maxlen, -np.inf)
+        logits[self._occupied] = -self.pool[statistic][self._occupied] / temperature
+        return logits
+
+    def hire(
+        self,
+        n: int,
+        statistic: str = None,
+        temperature: float = 1.0
+    ) -> Dict[str, np.ndarray]:
+        """Hire workers, removing them from the pool.
+
+        Workers are drawn without replacement from a softmax of their
+        negated statistic. All n workers are drawn at once using the
+        Gumbel top-k trick; adding Gumbel noise to the logits and
+        taking the n largest is the same as drawing n workers one at
+        a time, renormalizing after each draw. The noise is drawn as
+        the negated log of standard exponentials, which is cheaper
+        than drawing Gumbel variates directly.
+
+        Parameters
+        ----------
+        n: int
+            The number of workers to hire. If the pool has fewer
+            workers all of them are hired.
+        statistic: str = None
+            The statistic the softmax is taken over. This defaults to
+            the first statistic of the pool.
+        temperature: float = 1.0
+            Higher temperatures make hiring more uniform.
+
+        Returns
+        -------
+        workers: Dict[str,numpy.ndarray]
+            The statistics of the hired workers, including their seeds.
+        """
+        n = min(n, self._size)
+        if n == 0:
+            return {statistic: column[:0].copy() for statistic, column in self.pool.items()}
+        if statistic is None:
+            statistic = self._statistics[0]
+        occupied = np.flatnonzero(self._occupied)
+        keys = self.pool[statistic][occupied] / -temperature
+        keys -= np.log(self._rng.standard_exponential(len(occupied)))
+        slots = occupied[np.argpartition(keys, len(keys) - n)[len(keys) - n:]]
+        workers = {statistic: column[slots] for statistic, column in self.pool.items()}
+        self.evict(slots)
+        return workers
 
-    
\ No newline at end of file
+    def workers(self) -> Dict[str, np.ndarray]:
+        """The statistics of every worker in the pool."""
+        return {statistic: column[self._occupied] for statistic, column in self.pool.items()}
@@ -1,10 +1,20 @@
 import argparse
-import pyarrow.flight as fl
+import asyncio
+import json
+import os
+import pyarrow as pa
+import re
 import sys
 from numpy import array as nparray
 from typing import Dict
 
-from secretary.filecabinet import FileCabinet
+from themodelshop.cabinet_client import CabinetClient
+from themodelshop.file_cabinet import FileCabinet
+from themodelshop.utils.data.transactions import TransactionLog
+from themodelshop.utils.system.profiling import (
+    LEDGER,
+    track
+)
 
 class Secretary():
     """
@@ -23,18 +33,26 @@ class Secretary():
         self,
         laborpool='default_pool',
         employees='default_employee_class',
-        max_transactions=100000
+        max_transactions=100000,
+        location=".data"
     ):
         self._laborpool = laborpool
         self._employees = employees
         self._max_transactions = max_transactions
-        self._transaction_history = []
+        self._location = location
+        # Transactions beyond max_transactions are rolled over to disk,
+        #   next to the datasets in the filing cabinet.
+        self._transaction_history = TransactionLog(
+            max_transactions, os.path.join(location, 'transactions')
+        )
 
     ################################################################
     # Employee management
     #   1. hire_employees
     #   2. fire_employees
-    #   3. employee_report
+    #   3. record_transaction
+    #   4. employee_report
+    #   5. cost_report
     ################################################################
 
     def hire_employee(self,employee):
@@ -45,9 +63,57 @@ class Secretary():
         # This removes the agent
         raise NotImplementedError
 
-    def employee_report(self):
-        # This reports statistics on the employees in the pool
-        raise NotImplementedError
+    def record_transaction(
+        self,
+        agent_id,
+        action,
+        variable_id=-1,
+        price=0.,
+        timestamp=None
+    ):
+        """Record a hire, fire, purchase, or sale.
+
+        Arguments may be arrays to record many transactions at once;
+        see TransactionLog.record.
+        """
+        self._transaction_history.record(
+            agent_id, action, variable_id, price, timestamp
+        )
+
+    @track('secretary.employee_report')
+    def employee_report(self, by: str = 'agent_id') -> pa.Table:
+        """Report statistics on the transactions of employees.
+
+        Parameters
+        ----------
+        by: str = 'agent_id'
+            The transaction field to group by.
+
+        Returns
+        -------
+        report: pyarrow.Table
+            One row per group with the number of each action, the
+            total spent, and the times of the first and last
+            transaction.
+        """
+        return self._transaction_history.report(by)
+
+    def cost_report(self, by: str = 'action') -> pa.Table:
+        """Report the cost of the actions agents have taken.
+
+        Parameters
+        ----------
+        by: str = 'action'
+            The field to group by, i.e. 'agent_id'.
+
+        Returns
+        -------
+        report: pyarrow.Table
+            The number of actions and their total wall time, CPU
+            time, bytes read and written, and Arrow allocations in
+            each group; see themodelshop.utils.system.profiling.
+        """
+        return LEDGER.summary(by)
 
     ################################################################
     # Data management
@@ -64,7 +130,10 @@ class Secretary():
         #   feature and stores all of this information in a
         #   large numpy array.
         # This is the place to bake in security.
-        self._cabinet = FileCabinet(dataset_metadata=dataset_metadata)
+        self._cabinet = FileCabinet(
+            location=self._location,
+            dataset_metadata=dataset_metadata
+        )
 
     def get_papers(
         self,
@@ -105,16 +174,34 @@ def print_response(data):
     print(data)
     print("================")
 
-def get_by_ticket(args, client):
-    ticket_name = args.name
-    response = client.do_get(fl.Ticket(ticket_name)).read_all()
-    print_response(response)
+# A filter is written as 'column operator value', i.e. 'Age >= 30'.
+_FILTER_PATTERN = re.compile(
+    r"^\s*(?P<column>.+?)\s*(?P<op>==|!=|<=|>=|<|>|=|\s+not in\s+|\s+in\s+)\s*(?P<value>.+?)\s*$"
+)
+
+def parse_filter(text: str):
+    """Parse a command line filter into a (column, op, value) tuple.
 
-def get_by_ticket_pandas(args, client):
-    ticket_name = args.name
-    response = client.do_get(fl.Ticket(ticket_name)).read_pandas()
+    Values are read as JSON where possible, so numbers and lists are
+    typed appropriately; anything else is treated as a string.
+    """
+    match = _FILTER_PATTERN.match(text)
+    if match is None:
+        raise argparse.ArgumentTypeError(f"Unable to parse filter: {text}")
+    try:
+        value = json.loads(match.group('value'))
+    except json.JSONDecodeError:
+        value = match.group('value').strip('\'"')
+    return (match.group('column'), match.group('op').strip(), value)
+
+async def get_by_ticket(args, client):
+    response = await client.get(args.name, args.columns, args.filter)
     print_response(response)
 
+async def get_by_ticket_pandas(args, client):
+    response = await client.get(args.name, args.columns, args.filter)
+    print_response(response.to_pandas())
+
 
 def main():
     parser = argparse.ArgumentParser()
@@ -122,11 +209,14 @@ def main():
 
     cmd_get_by_t = subcommands.add_parser('get_by_ticket')
     cmd_get_by_t.set_defaults(action='get_by_ticket')
-    cmd_get_by_t.add_argument('-n', '--name', type=str, help="Name of the ticket to fetch.")
 
     cmd_get_by_tp = subcommands.add_parser('get_by_ticket_pandas')
     cmd_get_by_tp.set_defaults(action='get_by_ticket_pandas')
-    cmd_get_by_tp.add_argument('-n', '--name', type=str, help="Name of the ticket to fetch.")
+
+    for cmd in (cmd_get_by_t, cmd_get_by_tp):
+        cmd.add_argument('-n', '--name', type=str, help="Name of the ticket to fetch.")
+        cmd.add_argument('-c', '--columns', type=str, nargs='+', help="Columns to fetch.")
+        cmd.add_argument('-f', '--filter', type=parse_filter, action='append', help="Filter to apply, i.e. 'Age >= 30'. May be repeated.")
 
     args = parser.parse_args()
     if not hasattr(args, 'action'):
@@ -138,9 +228,11 @@ def main():
         'get_by_ticket_pandas': get_by_ticket_pandas,
     }
 
-    client = fl.connect("grpc://0.0.0.0:8815")
+    async def run():
+        async with CabinetClient("grpc://0.0.0.0:8815") as client:
+            await commands[args.action](args, client)
 
-    commands[args.action](args, client)
+    asyncio.run(run())
 
 
 if __name__ == '__main__':
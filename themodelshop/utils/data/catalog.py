@@ -0,0 +1,210 @@
+"""An indexed catalog of metadata for filed objects.
+
+Every object registered in a filing cabinet has a row of metadata.
+The catalog stores those rows in PyArrow and maintains a hash index
+for every metadata field, so exact-match queries only touch the rows
+that match instead of rebuilding and scanning the whole catalog.
+
+Rows are buffered as they are added and flushed into Arrow chunks,
+which means registration never forces a rebuild of the catalog.
+
+Values are indexed by their type as well as their value, so 1, 1.0
+and True are different keys even though they compare equal.
+"""
+import pyarrow as pa
+
+from bisect import bisect_left
+from collections.abc import Hashable
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple
+)
+
+
+class MetaDataError(Exception):
+    """Raised when querying metadata fields which do not exist."""
+    def __init__(self, *args):
+        if args:
+            self.message = args[0]
+        else:
+            self.message = None
+
+    def __str__(self):
+        if self.message:
+            return f'MetaDataError, {self.message}'
+        else:
+            return 'Metadata field does not exist'
+
+
+def _key(value: Hashable) -> Tuple[type, Hashable]:
+    """The index key of a metadata value."""
+    return (type(value), value)
+
+
+class MetadataCatalog():
+    """Stores and indexes metadata rows.
+
+    Parameters
+    ----------
+    flush_size: int = 1024
+        The number of rows which are buffered before they are
+        written into an Arrow chunk.
+    max_chunks: int = 64
+        The number of chunks which may accumulate before they are
+        combined into contiguous columns.
+    """
+    def __init__(
+        self,
+        flush_size: int = 1024,
+        max_chunks: int = 64
+    ):
+        self._flush_size = flush_size
+        self._max_chunks = max_chunks
+        self._chunks = []
+        self._pending = []
+        self._table = None
+        self._num_rows = 0
+        # field -> (type, value) -> row numbers
+        self._index = {}
+        # row number -> field -> (type, value), so that the index
+        # entries of a row can be found when it is updated.
+        self._keys = []
+
+    def __len__(self):
+        return self._num_rows
+
+    def add(self, row: Dict[str, Any]) -> int:
+        """Add a row of metadata to the catalog.
+
+        Parameters
+        ----------
+        row: Dict[str,Any]
+            This is a dictionary of metadata fields. Fields which
+            have not been seen before are added to the catalog and
+            are null for all previous rows.
+
+        Returns
+        -------
+        row_number: int
+            This is the position of the row in the catalog.
+        """
+        row_number = self._num_rows
+        self._pending.append(row)
+        # The row is only indexed once it is known to fit in a chunk.
+        if len(self._pending) >= self._flush_size:
+            try:
+                self._flush()
+            except Exception:
+                self._pending.pop()
+                raise
+        keys = {}
+        for field, value in row.items():
+            index = self._index.setdefault(field, {})
+            if isinstance(value, Hashable):
+                keys[field] = _key(value)
+                index.setdefault(keys[field], []).append(row_number)
+        self._keys.append(keys)
+        self._num_rows += 1
+        self._table = None
+        return row_number
+
+    def update(self, row_number: int, row: Dict[str, Any]):
+        """Change the fields of a row of metadata.
+
+        Fields which are not passed keep their values.
+
+        Parameters
+        ----------
+        row_number: int
+            This is the position of the row in the catalog.
+        row: Dict[str,Any]
+            This is a dictionary of the metadata fields to change.
+        """
+        if not 0 <= row_number < self._num_rows:
+            raise IndexError(f"{row_number} is not a row of the catalog.")
+        tbl = self.to_table()
+        chunks = [
+            tbl.slice(0, row_number),
+            pa.table({
+                **tbl.slice(row_number, 1).to_pydict(),
+                **{field: [value] for field, value in row.items()}
+            }),
+            tbl.slice(row_number + 1)
+        ]
+        # Fail before the index is changed if the values do not fit.
+        pa.concat_tables(chunks, promote_options='default')
+        keys = self._keys[row_number]
+        for field, value in row.items():
+            index = self._index.setdefault(field, {})
+            if field in keys:
+                old = keys.pop(field)
+                matches = index[old]
+                del matches[bisect_left(matches, row_number)]
+                if not matches:
+                    del index[old]
+            if isinstance(value, Hashable):
+                keys[field] = _key(value)
+                matches = index.setdefault(keys[field], [])
+                matches.insert(bisect_left(matches, row_number), row_number)
+        self._table = None
+        self._chunks = chunks
+
+    def _flush(self):
+        """Write the buffered rows into an Arrow chunk."""
+        if self._pending:
+            # Rows do not need to share fields, so collect all of them.
+            fields = dict.fromkeys(
+                field for row in self._pending for field in row
+            )
+            self._chunks.append(pa.table({
+                field: [row.get(field) for row in self._pending]
+                for field in fields
+            }))
+            self._pending = []
+
+    def to_table(self) -> pa.Table:
+        """Return the entire catalog as a PyArrow Table."""
+        if self._table is None:
+            self._flush()
+            if not self._chunks:
+                return pa.table({})
+            tbl = pa.concat_tables(self._chunks, promote_options='default')
+            if tbl.column(0).num_chunks > self._max_chunks:
+                tbl = tbl.combine_chunks()
+            self._chunks = [tbl]
+            self._table = tbl
+        return self._table
+
+    def rows(self, **kwargs: Any) -> List[int]:
+        """Find the row numbers which exactly match all the filters.
+
+        Raises
+        ------
+        MetaDataError
+            If any of the filtered fields are not in the catalog.
+        """
+        matches = []
+        for field, value in kwargs.items():
+            if field not in self._index:
+                raise MetaDataError(f"{field} is not a metadata field.")
+            if not isinstance(value, Hashable):
+                raise MetaDataError(f"{field} can not be filtered on {value}.")
+            matches.append(self._index[field].get(_key(value), []))
+        # Start from the most selective filter.
+        matches.sort(key=len)
+        rows = set(matches[0])
+        for match in matches[1:]:
+            rows.intersection_update(match)
+        return sorted(rows)
+
+    def query(self, **kwargs: Any) -> pa.Table:
+        """Return the metadata rows which exactly match the filters.
+
+        If no filters are passed the entire catalog is returned.
+        """
+        if not kwargs:
+            return self.to_table()
+        rows = pa.array(self.rows(**kwargs), type=pa.int64())
+        return self.to_table().take(rows)
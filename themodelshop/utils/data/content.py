@@ -0,0 +1,147 @@
+"""Content addressing for data filed in a cabinet.
+
+Columns are identified by a digest of their type and of the Arrow
+buffers which back each of their chunks. Tables are identified by a
+digest of their schema and the digests of their columns. Two columns
+with the same digest hold the same data, which allows a cabinet to
+keep one copy of a column no matter how many tables contain it.
+
+Digests are computed from the physical layout of the data, so the
+same data split into differently sized chunks has a different digest.
+Data that is filed again as it was first filed (the same table, or
+the same record batches sent over Flight) always has the same digest.
+
+Derived columns which have not been computed are identified by a
+digest of the expression which computes them instead, so the same
+expression proposed twice refers to the same column.
+"""
+import hashlib
+import json
+import pyarrow as pa
+
+from typing import (
+    Any,
+    Dict,
+    List
+)
+
+# The number of bytes in a digest.
+_DIGEST_SIZE = 16
+
+
+def _update(digest, array: pa.Array):
+    """Add the contents of an array chunk to a digest."""
+    digest.update(f"{array.offset}:{len(array)}:{array.null_count};".encode())
+    if pa.types.is_dictionary(array.type):
+        _update(digest, array.indices)
+        _update(digest, array.dictionary)
+        return
+    for buf in array.buffers():
+        if buf is None:
+            digest.update(b'-')
+        else:
+            digest.update(f"{buf.size}:".encode())
+            digest.update(buf)
+
+
+class StreamDigest():
+    """Digests the columns of a stream of record batches.
+
+    Each batch is added to the digests as it arrives, so a stream
+    can be filed without a second pass over its data. The digests
+    match those of column_digest for the table the batches form.
+
+    Parameters
+    ----------
+    schema: pyarrow.Schema
+        This is the schema of the stream.
+    """
+    def __init__(self, schema: pa.Schema):
+        self._digests = []
+        for field in schema:
+            digest = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+            digest.update(str(field.type).encode())
+            self._digests.append(digest)
+
+    def update(self, batch: pa.RecordBatch):
+        """Add a record batch to the digests of the columns."""
+        for digest, column in zip(self._digests, batch.columns):
+            _update(digest, column)
+
+    def hexdigests(self) -> List[str]:
+        """The digests of the columns seen so far, in order."""
+        return [digest.hexdigest() for digest in self._digests]
+
+
+def column_digest(column: pa.ChunkedArray) -> str:
+    """Compute the digest of a column.
+
+    Parameters
+    ----------
+    column: pyarrow.ChunkedArray
+        This is the column to digest.
+
+    Returns
+    -------
+    digest: str
+        A hexadecimal digest of the type and contents of the column.
+    """
+    digest = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+    digest.update(str(column.type).encode())
+    for chunk in column.chunks:
+        _update(digest, chunk)
+    return digest.hexdigest()
+
+
+def table_digest(schema: pa.Schema, column_digests: List[str]) -> str:
+    """Compute the digest of a table from its column digests.
+
+    Parameters
+    ----------
+    schema: pyarrow.Schema
+        This is the schema of the table, including its metadata.
+    column_digests: List[str]
+        These are the digests of the columns, in order.
+
+    Returns
+    -------
+    digest: str
+        A hexadecimal digest of the table.
+    """
+    digest = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+    digest.update(schema.serialize())
+    for column in column_digests:
+        digest.update(column.encode())
+    return digest.hexdigest()
+
+
+def expression_digest(
+    transform: str,
+    parents: List[str],
+    scalars: List = None,
+    params: Dict[str, Any] = None
+) -> str:
+    """Compute the digest of a derived column from its expression.
+
+    Parameters
+    ----------
+    transform: str
+        This is the name of the transformation.
+    parents: List[str]
+        These are the digests of the input columns, in order.
+    scalars: List = None
+        These are the scalar arguments of the transformation.
+    params: Dict[str,Any] = None
+        These are the keyword arguments of the transformation.
+
+    Returns
+    -------
+    digest: str
+        A hexadecimal digest of the expression.
+    """
+    digest = hashlib.blake2b(digest_size=_DIGEST_SIZE, person=b'expression')
+    digest.update(json.dumps(
+        [transform, parents, scalars or [], params or {}],
+        sort_keys=True
+    ).encode())
+    return digest.hexdigest()
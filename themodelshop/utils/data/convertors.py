@@ -0,0 +1,93 @@
+"""Tools to convert arbitrary objects into PyArrow.
+
+Everything that is filed into a cabinet is discarded in favor of
+PyArrow. These functions take the objects the agents hand to the
+cabinet and return PyArrow Tables, using the handler registered for
+the type of each object.
+
+Conversions avoid copying wherever Arrow can use the memory of the
+original object directly. Contiguous NumPy arrays and numeric pandas
+columns are wrapped as they are, while text columns are dictionary
+encoded. Each conversion can report which columns had to be copied
+and what those copies cost.
+"""
+import pyarrow as pa
+
+from typing import (
+    Any,
+    Dict,
+    Tuple,
+    Union
+)
+
+from themodelshop.utils.data.handlers import get_handler
+
+
+class ConversionReport():
+    """Records the copies made while standardizing an object.
+
+    Handlers call record for every column they could not wrap
+    without copying it.
+    """
+    def __init__(self):
+        self.copies: Dict[str, int] = {}
+
+    def record(self, column: str, nbytes: int):
+        """Record that a column was copied.
+
+        Parameters
+        ----------
+        column: str
+            This is the name of the column which was copied.
+        nbytes: int
+            This is the number of bytes allocated for the copy.
+        """
+        self.copies[column] = self.copies.get(column, 0) + nbytes
+
+    @property
+    def copied(self) -> bool:
+        """Whether any column was copied."""
+        return bool(self.copies)
+
+    @property
+    def bytes_copied(self) -> int:
+        """The number of bytes allocated for copies."""
+        return sum(self.copies.values())
+
+    def __repr__(self):
+        return (
+            f"ConversionReport(copied={self.copied}, "
+            f"bytes_copied={self.bytes_copied}, copies={self.copies})"
+        )
+
+
+def standardize(
+    data: Any,
+    report: bool = False
+) -> Union[pa.Table, Tuple[pa.Table, ConversionReport]]:
+    """Cast an object to a PyArrow Table.
+
+    Parameters
+    ----------
+    data: Any
+        This is the object to convert. The handler registered for its
+        type does the conversion; see themodelshop.utils.data.handlers.
+    report: bool = False
+        Also return a ConversionReport listing the columns which
+        had to be copied.
+
+    Returns
+    -------
+    tbl, (report): pyarrow.Table, ConversionReport
+        The standardized data and an optional report of copies.
+
+    Raises
+    ------
+    TypeError
+        If no handler is registered for the type of the object.
+    """
+    conversion = ConversionReport()
+    tbl = get_handler(data).standardize(data, report=conversion)
+    if report:
+        return tbl, conversion
+    return tbl
@@ -21,19 +21,190 @@ Come back to this.
 
 3. Mimic
 https://mimic.physionet.org/gettingstarted/access/
+
+Every download is converted to an Arrow IPC file and kept in a local
+cache, keyed by the URL and by the checksum of the source data when
+one is known. Later loads memory map the cached file instead of
+downloading and parsing the source again. The cache lives in
+~/.cache/themodelshop/datasets unless THEMODELSHOP_CACHE is set, and
+setting THEMODELSHOP_OFFLINE=1 forbids downloads entirely, so that
+only cached datasets can be loaded.
 """
+import email.parser
+import hashlib
+import http.client
+import json
+import os
 import pyarrow as pa
 import pyarrow.dataset as ds
+import socket
+import tempfile
 from urllib.request import (
     urlretrieve,
     ContentTooShortError
 )
+from urllib.error import (
+    HTTPError,
+    URLError
+)
+from typing import (
+    Optional,
+    Tuple
+)
+
+from themodelshop.utils.data.handlers import handle_pyarrow_Table
 
 __TITANIC_PATH__ = 'https://web.stanford.edu/class/archive/cs/cs109/cs109.1166/stuff/titanic.csv'
 
+__CACHE_DIR__ = os.path.join(
+    os.path.expanduser('~'), '.cache', 'themodelshop', 'datasets'
+)
+
+def _cache_dir(cache_dir: Optional[str] = None) -> str:
+    """The folder cached datasets are stored in."""
+    if cache_dir is None:
+        cache_dir = os.environ.get('THEMODELSHOP_CACHE', __CACHE_DIR__)
+    return cache_dir
+
+def _offline(offline: Optional[bool] = None) -> bool:
+    """Whether downloads are forbidden."""
+    if offline is None:
+        offline = os.environ.get('THEMODELSHOP_OFFLINE', '') not in ('', '0')
+    return offline
+
+def _sha256(path: str) -> str:
+    """The SHA256 checksum of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _transient(error: Exception) -> bool:
+    """Whether a failed download is worth trying again.
+
+    Downloads cut short, timeouts, dropped connections, and server
+    errors are transient; anything else, such as a missing file, will
+    fail the same way every time.
+    """
+    if isinstance(error, ContentTooShortError):
+        return True
+    if isinstance(error, HTTPError):
+        return error.code >= 500 or error.code == 429
+    if isinstance(error, URLError):
+        error = error.reason
+    return isinstance(error, (TimeoutError, ConnectionError, socket.timeout))
+
+def _download(url: str, path: str, retries: int) -> http.client.HTTPMessage:
+    """Download a file to path, retrying transient failures."""
+    for attempt in range(max(retries, 1)):
+        try:
+            return urlretrieve(url, path)[1]
+        except (ContentTooShortError, URLError, TimeoutError, ConnectionError) as error:
+            if not _transient(error):
+                raise FileNotFoundError(f"Unable to download {url}: {error}") from error
+    errmsg = f"""Unable to download file
+    {retries} number of attempts exceeded.
+    """
+    raise FileNotFoundError(errmsg)
+
+def cached(
+    url: str,
+    name: str,
+    sha256: str = None,
+    format: str = 'csv',
+    retries: int = 3,
+    cache_dir: str = None,
+    offline: bool = None,
+    verify: bool = False
+) -> Tuple[pa.Table, http.client.HTTPMessage]:
+    """Load a dataset through the local cache.
+
+    Parameters
+    ----------
+    url: str
+        The location of the source data.
+    name: str
+        A short name for the dataset, used to name the cached file.
+    sha256: str = None
+        The expected checksum of the source data. If this is passed
+        downloads which do not match are rejected, and the checksum
+        is part of the cache key.
+    format: str = 'csv'
+        The format of the source data, as understood by
+        pyarrow.dataset.
+    retries: int = 3
+        The number of attempts made to download the data. Only
+        transient failures, such as timeouts, are retried.
+    cache_dir: str = None
+        The folder the cache lives in. See the module documentation.
+    offline: bool = None
+        Forbid downloads. See the module documentation.
+    verify: bool = False
+        Check the cached file against the checksum recorded when it
+        was written before using it.
+
+    Returns
+    -------
+    tbl, httpmessage: pyarrow.Table, httpmessage
+        The memory mapped dataset and the headers of the download
+        which populated the cache.
+    """
+    cache_dir = _cache_dir(cache_dir)
+    key = hashlib.sha256(url.encode()).hexdigest()[:16]
+    if sha256 is not None:
+        key = f"{key}-{sha256[:16]}"
+    path = os.path.join(cache_dir, f"{name}-{key}.arrow")
+    record_path = f"{path}.json"
+    if os.path.exists(path) and os.path.exists(record_path):
+        with open(record_path) as source:
+            record = json.load(source)
+        if not verify or _sha256(path) == record['arrow_sha256']:
+            httpmsg = email.parser.Parser(
+                _class=http.client.HTTPMessage
+            ).parsestr(record['headers'])
+            return handle_pyarrow_Table.read(path), httpmsg
+    if _offline(offline):
+        raise FileNotFoundError(f"{name} is not cached and downloads are disabled.")
+    os.makedirs(cache_dir, exist_ok=True)
+    # Everything is written to temporary files in the cache first and
+    # renamed into place, so a partially written file is never mistaken
+    # for a cached dataset, and removed if anything fails.
+    temporary = []
+    try:
+        for suffix in ('.download', '.arrow', '.json'):
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=suffix)
+            os.close(fd)
+            temporary.append(tmp_path)
+        download_path, arrow_path, json_path = temporary
+        httpmsg = _download(url, download_path, retries)
+        checksum = _sha256(download_path)
+        if sha256 is not None and checksum != sha256:
+            raise ValueError(f"{name} checksum {checksum} does not match {sha256}.")
+        # Turn the dataset into a pyarrow table
+        tbl = ds.dataset(download_path, format=format).to_table()
+        handle_pyarrow_Table.write(tbl, arrow_path)
+        record = dict(
+            url = url,
+            source_sha256 = checksum,
+            arrow_sha256 = _sha256(arrow_path),
+            headers = str(httpmsg)
+        )
+        with open(json_path, 'w') as sink:
+            json.dump(record, sink)
+        os.replace(arrow_path, path)
+        os.replace(json_path, record_path)
+    finally:
+        for tmp_path in temporary:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return handle_pyarrow_Table.read(path), httpmsg
+
 def titanic(
     retries: int = 3,
-    verbose: bool = False
+    verbose: bool = False,
+    cache_dir: str = None,
+    offline: bool = None
 ):
     """Go snag the titanic dataset
 
@@ -46,6 +217,10 @@ def titanic(
         investigate whether you have access to that CSV.
     verbose: bool = False
         Return the httpmessage as well
+    cache_dir: str = None
+        The folder cached datasets are stored in.
+    offline: bool = None
+        Only load the dataset from the cache.
 
     Returns
     -------
@@ -53,24 +228,13 @@ def titanic(
         This is the Titanic dataset, read in as a PyArrow table.
         This also has an optional httpmessage.
     """
-    attempt = 1
-    # This is just a blanket assignment to prevent silliness and get
-    #   my linter to stop yelling at me.
-    fpath, httpmsg = None, None
-    while attempt < 4:
-        try:
-            fpath, httpmsg = urlretrieve(__TITANIC_PATH__)
-            break
-        except ContentTooShortError:
-            fpath, httpmsg = None, None
-            attempt +=1
-    if fpath is None:
-        errmsg = f"""Unable to download file
-        {retries} number of attempts exceeded.
-        """
-        raise FileNotFoundError(errmsg)
-    # Turn the dataset into a pyarrow table
-    tbl = ds.dataset(fpath,format='csv').to_table()
+    tbl, httpmsg = cached(
+        __TITANIC_PATH__,
+        'titanic',
+        retries=retries,
+        cache_dir=cache_dir,
+        offline=offline
+    )
     if verbose:
         return tbl, httpmsg
     else:
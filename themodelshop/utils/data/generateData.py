@@ -24,13 +24,24 @@ Design requirements:
 
 This is going to be required to generate high quality datasets on demand.
 
-Come back to this after the secretary work is complete.
+Datasets are generated as a stream of PyArrow record batches. The
+problem (the cluster centroids, the coefficients, and so on) is drawn
+once from the base generator, while every chunk of rows is drawn from
+its own child seed spawned off the base generator. Chunks can be
+generated in parallel processes and the output is the same no matter
+how many processes are used.
 """
-from sklearn.datasets import (
-    make_classification,
-    make_regression
-)
+import numpy as np
+import pyarrow as pa
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from numpy.random import default_rng
+from typing import (
+    Any,
+    Dict,
+    Iterator
+)
 
 class InputError(Exception):
     def __init__(self, *args):
@@ -46,6 +57,90 @@ class InputError(Exception):
             return 'Input validation error'
 
 
+def _hypercube(rng, n_vertices: int, n_dims: int) -> np.ndarray:
+    """Draw distinct vertices of a unit hypercube."""
+    if n_dims > 30:
+        # Collisions are vanishingly unlikely in this many dimensions.
+        return rng.integers(0, 2, size=(n_vertices, n_dims)).astype(float)
+    vertices = rng.choice(2 ** n_dims, size=n_vertices, replace=False)
+    return ((vertices[:, None] >> np.arange(n_dims)) & 1).astype(float)
+
+
+def _classification_chunk(
+    problem: Dict[str, Any],
+    seed: np.random.SeedSequence,
+    n_rows: int
+) -> pa.RecordBatch:
+    """Generate rows of a classification problem.
+
+    This follows the algorithm of sklearn.datasets.make_classification
+    with the problem itself drawn ahead of time, so that independently
+    generated chunks are samples of the same problem.
+    """
+    rng = default_rng(seed)
+    n_informative = problem['n_informative']
+    n_redundant = problem['n_redundant']
+    n_classes = problem['n_classes']
+    clusters = rng.choice(
+        len(problem['centroids']),
+        size=n_rows,
+        p=problem['cluster_weights']
+    )
+    # Each feature is a contiguous row, so every column can be handed
+    # to Arrow without copying it.
+    X = rng.standard_normal((problem['n_features'], n_rows))
+    informative = X[:n_informative]
+    for k, centroid in enumerate(problem['centroids']):
+        in_cluster = clusters == k
+        informative[:, in_cluster] = (
+            problem['covariances'][k].T @ informative[:, in_cluster]
+            + centroid[:, None]
+        )
+    X[n_informative:n_informative + n_redundant] = (
+        problem['redundant'].T @ informative
+    )
+    y = clusters % n_classes
+    flip = rng.random(n_rows) < problem['flip_y']
+    y[flip] = rng.integers(0, n_classes, size=flip.sum())
+    return _to_batch(problem, X, y)
+
+
+def _regression_chunk(
+    problem: Dict[str, Any],
+    seed: np.random.SeedSequence,
+    n_rows: int
+) -> pa.RecordBatch:
+    """Generate rows of a regression problem.
+
+    This follows the algorithm of sklearn.datasets.make_regression
+    with the coefficients drawn ahead of time.
+    """
+    rng = default_rng(seed)
+    X = rng.standard_normal((problem['n_features'], n_rows))
+    y = problem['coef'] @ X[:problem['n_informative']] + problem['bias']
+    if problem['noise'] > 0:
+        y += problem['noise'] * rng.standard_normal(n_rows)
+    return _to_batch(problem, X, y)
+
+
+def _to_batch(
+    problem: Dict[str, Any],
+    X: np.ndarray,
+    y: np.ndarray
+) -> pa.RecordBatch:
+    """Wrap generated features and target in a record batch."""
+    n_features = problem['n_features']
+    arrays = [pa.array(X[i]) for i in problem['order']] + [pa.array(y)]
+    names = [f"x{i}" for i in range(n_features)] + ['y']
+    return pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+_CHUNKS = {
+    'classification': _classification_chunk,
+    'regression': _regression_chunk,
+}
+
+
 class DataGenerator():
     """This is a class which can generate data upon demand
 
@@ -57,6 +152,43 @@ class DataGenerator():
     ----------
     seed: int
         This is an integer which may be passed to enforce repeatability.
+    problem_domain: str
+        This is one of 'classification' or 'regression'.
+    n_features: int = 20
+        The number of features.
+    n_informative: int = 2
+        The number of features the target depends on.
+    n_redundant: int = 2
+        Classification only. The number of features which are random
+        linear combinations of the informative features.
+    n_classes: int = 2
+        Classification only. The number of classes.
+    n_clusters_per_class: int = 2
+        Classification only. The number of clusters in each class.
+    weights: List[float] = None
+        Classification only. The proportion of rows in each class.
+        Classes are balanced if this is not passed.
+    flip_y: float = 0.01
+        Classification only. The fraction of rows with random labels.
+    class_sep: float = 1.0
+        Classification only. The size of the hypercube the clusters
+        are placed on.
+    bias: float = 0.0
+        Regression only. The intercept of the target.
+    noise: float = 0.0
+        Regression only. The standard deviation of the noise added
+        to the target.
+
+    Methods
+    -------
+    generate(n_samples, chunk_size, n_jobs): Stream the dataset as
+        record batches of at most chunk_size rows.
+
+    to_parquet(path, n_samples, chunk_size, n_jobs): Stream the
+        dataset into a Parquet file.
+
+    to_cabinet(client, name, n_samples, chunk_size, n_jobs): Stream
+        the dataset into a filing cabinet with do_put.
     """
     # These are the problems the generator can generate data for.
     defined_problems = [
@@ -66,16 +198,36 @@ class DataGenerator():
     def __init__(
         self,
         seed: int,
-        problem_domain: str
-    ) -> DataGenerator:
+        problem_domain: str,
+        n_features: int = 20,
+        n_informative: int = 2,
+        n_redundant: int = 2,
+        n_classes: int = 2,
+        n_clusters_per_class: int = 2,
+        weights: list = None,
+        flip_y: float = 0.01,
+        class_sep: float = 1.0,
+        bias: float = 0.0,
+        noise: float = 0.0
+    ):
 
         self.args = dict(
             seed = seed,
-            problem_domain = problem_domain
+            problem_domain = problem_domain,
+            n_features = n_features,
+            n_informative = n_informative,
+            n_redundant = n_redundant,
+            n_classes = n_classes,
+            n_clusters_per_class = n_clusters_per_class,
+            weights = weights,
+            flip_y = flip_y,
+            class_sep = class_sep,
+            bias = bias,
+            noise = noise
         )
         self._verify_args()
         self._init_generators()
-        return self
+        self._init_problem()
 
     def _verify_args(self):
         """Check and validate all input"""
@@ -89,27 +241,172 @@ class DataGenerator():
             raise InputError('The problem domain should be a string.')
         if not self.args['problem_domain'] in self.defined_problems:
             raise InputError(f'The problem domain should be in {self.defined_problems}.')
+        self.problem_domain = self.args['problem_domain']
+
+        # 3) Shape
+        n_used = self.args['n_informative']
+        if self.problem_domain == 'classification':
+            n_used += self.args['n_redundant']
+            n_clusters = self.args['n_classes'] * self.args['n_clusters_per_class']
+            if self.args['n_informative'] < 30 and n_clusters > 2 ** self.args['n_informative']:
+                raise InputError('Too few informative features for the number of clusters.')
+            weights = self.args['weights']
+            if weights is not None and len(weights) != self.args['n_classes']:
+                raise InputError('There should be one weight for each class.')
+        if n_used > self.args['n_features']:
+            raise InputError('There are more informative features than features.')
 
     def _init_generators(self):
         # This base rng will be used to draw any of the initial generators
         self._base_rng = default_rng(self.seed)
 
-    def _make_classification(self):
-        make_classification(
-            n_samples=100,
-            n_features=20,
-            n_informative=2,
-            n_redundant=2,
-            n_repeated=0,
-            n_classes=2,
-            n_clusters_per_class=2,
-            weights=None,
-            flip_y=0.01,
-            class_sep=1.0,
-            hypercube=True,
-            shift=0.0,
-            scale=1.0,
-            shuffle=True,
-            random_state=None
+    def _init_problem(self):
+        """Draw the definition of the problem from the base generator."""
+        rng = self._base_rng
+        n_features = self.args['n_features']
+        n_informative = self.args['n_informative']
+        self._problem = dict(
+            n_features = n_features,
+            n_informative = n_informative,
+            # Shuffle the features so the informative ones are not first.
+            order = rng.permutation(n_features)
+        )
+        if self.problem_domain == 'classification':
+            n_classes = self.args['n_classes']
+            n_clusters = n_classes * self.args['n_clusters_per_class']
+            weights = self.args['weights']
+            if weights is None:
+                weights = np.full(n_classes, 1 / n_classes)
+            weights = np.asarray(weights, dtype=float) / np.sum(weights)
+            # Cluster k belongs to class k % n_classes.
+            cluster_weights = weights[np.arange(n_clusters) % n_classes]
+            class_sep = self.args['class_sep']
+            self._problem.update(
+                n_redundant = self.args['n_redundant'],
+                n_classes = n_classes,
+                flip_y = self.args['flip_y'],
+                cluster_weights = cluster_weights / cluster_weights.sum(),
+                centroids = (
+                    _hypercube(rng, n_clusters, n_informative)
+                    * 2 * class_sep - class_sep
+                ),
+                covariances = 2 * rng.random(
+                    (n_clusters, n_informative, n_informative)
+                ) - 1,
+                redundant = 2 * rng.random(
+                    (n_informative, self.args['n_redundant'])
+                ) - 1
+            )
+        else:
+            self._problem.update(
+                coef = 100 * rng.random(n_informative),
+                bias = self.args['bias'],
+                noise = self.args['noise']
+            )
+
+    @property
+    def schema(self) -> pa.Schema:
+        """The schema of the generated record batches."""
+        target = pa.int64() if self.problem_domain == 'classification' else pa.float64()
+        return pa.schema(
+            [(f"x{i}", pa.float64()) for i in range(self.args['n_features'])]
+            + [('y', target)]
+        )
+
+    def generate(
+        self,
+        n_samples: int,
+        chunk_size: int = 100000,
+        n_jobs: int = 1
+    ) -> Iterator[pa.RecordBatch]:
+        """Stream a dataset as record batches.
+
+        Every chunk is drawn from its own child seed, spawned off the
+        base generator, so the batches are identical whatever the
+        value of n_jobs. Each call spawns new seeds and so draws new
+        samples from the same problem.
+
+        Parameters
+        ----------
+        n_samples: int
+            The number of rows to generate.
+        chunk_size: int = 100000
+            The number of rows in each record batch.
+        n_jobs: int = 1
+            The number of processes generating chunks. At most two
+            chunks per process are generated ahead of the consumer.
+
+        Returns
+        -------
+        batches: Iterator[pyarrow.RecordBatch]
+            The dataset, in order.
+        """
+        n_chunks = -(-n_samples // chunk_size)
+        seeds = self._base_rng.bit_generator.seed_seq.spawn(n_chunks)
+        sizes = [chunk_size] * (n_chunks - 1) + [n_samples - chunk_size * (n_chunks - 1)]
+        make_chunk = _CHUNKS[self.problem_domain]
+        if n_jobs == 1:
+            for seed, size in zip(seeds, sizes):
+                yield make_chunk(self._problem, seed, size)
+            return
+        with ProcessPoolExecutor(n_jobs) as executor:
+            pending = deque()
+            for seed, size in zip(seeds, sizes):
+                pending.append(executor.submit(make_chunk, self._problem, seed, size))
+                if len(pending) >= 2 * n_jobs:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def to_parquet(
+        self,
+        path: str,
+        n_samples: int,
+        chunk_size: int = 100000,
+        n_jobs: int = 1,
+        **kwargs
+    ):
+        """Stream a dataset into a Parquet file.
+
+        Each chunk is written as it is generated, so the dataset is
+        never held in memory. Additional keyword arguments are passed
+        to pyarrow.parquet.ParquetWriter.
+        """
+        import pyarrow.parquet as pq
+        with pq.ParquetWriter(path, self.schema, **kwargs) as writer:
+            for batch in self.generate(n_samples, chunk_size, n_jobs):
+                writer.write_batch(batch)
+
+    def to_cabinet(
+        self,
+        client,
+        name: str,
+        n_samples: int,
+        chunk_size: int = 100000,
+        n_jobs: int = 1
+    ) -> str:
+        """Stream a dataset into a filing cabinet.
+
+        Parameters
+        ----------
+        client: pyarrow.flight.FlightClient
+            This is a client connected to the cabinet.
+        name: str
+            This is the ticket to file the dataset under.
+
+        Returns
+        -------
+        ticket: str
+            This is the ticket the cabinet filed the dataset under.
+        """
+        import pyarrow.flight as fl
+        writer, reader = client.do_put(
+            fl.FlightDescriptor.for_path(name),
+            self.schema
         )
-#p
\ No newline at end of file
+        for batch in self.generate(n_samples, chunk_size, n_jobs):
+            writer.write_batch(batch)
+        writer.done_writing()
+        ticket = reader.read().to_pybytes().decode()
+        writer.close()
+        return ticket
@@ -1,6 +1,194 @@
 """Contains all exposed elements from the handlers.
 
+A handler is a module which knows how to read, write, and
+standardize one type of object. Each handler module exposes:
+
+* read(path, **kwargs): Read the object from disk.
+* write(obj, path, **kwargs): Write the object to disk.
+* standardize(obj, report=None): Convert the object into a PyArrow
+  Table. If a report is passed, call report.record(column, nbytes)
+  for every column which had to be copied.
+
+Handlers are named for the type they handle, handle_<package>_<Type>,
+i.e. handle_pandas_DataFrame handles pandas DataFrames. Because the
+type is in the name, handlers are discovered by scraping file names
+and are only imported the first time an object of their type is
+handled. Importing the handlers does not import pandas, NumPy, or any
+other optional backend.
+
+Additional handlers can be registered with register_handler, found
+in a folder with _get_handlers, or published by other packages under
+the 'themodelshop.handlers' entry point group; the entry point name
+is the handled type, '<package>.<Type>', and the value is the module.
 """
-# Run an OS scrape of the handlers folder and return
-#  the read_x and write_x for each handler.
-__all__ = []
\ No newline at end of file
+import importlib
+import importlib.util
+import os
+import threading
+
+from types import ModuleType
+from typing import (
+    Any,
+    Dict
+)
+
+__all__ = [
+    'get_handler',
+    'handler_key',
+    'register_handler',
+    'registered_handlers',
+]
+
+# This is the entry point group which is searched for handlers.
+_ENTRY_POINT_GROUP = 'themodelshop.handlers'
+
+# '<package>.<Type>' -> module name or file location
+_REGISTRY = {}
+# '<package>.<Type>' -> imported module
+_LOADED = {}
+_DISCOVERED = False
+# Handlers are looked up from the threads of the Flight server, so
+# discovery and loading happen under a lock.
+_LOCK = threading.RLock()
+
+
+def _get_handlers(location: str = "") -> Dict[str, str]:
+    """Returns available file handlers.
+
+    This checks for a handlers folder at this location and will
+    scrape the handlers available, returning them, along with all
+    the handlers in this package, as a dictionary keyed by the file
+    type.
+
+    Parameters
+    ----------
+    location: str = ""
+        The location where *extra* handlers should be examined for.
+        Note that any malformed handlers will simply be skipped.
+
+    Returns
+    -------
+    handlers: Dict[str,str]
+        The module name of each packaged handler, or the file
+        location of each extra handler, keyed by the handled type.
+    """
+    handlers = {}
+    folders = [(os.path.dirname(__file__), __name__)]
+    if location and os.path.isdir(location):
+        folders.append((location, None))
+    for folder, package in folders:
+        for file_name in sorted(os.listdir(folder)):
+            stem, extension = os.path.splitext(file_name)
+            if extension != '.py' or not stem.startswith('handle_'):
+                continue
+            try:
+                _, package_name, type_name = stem.split('_', 2)
+            except ValueError:
+                continue
+            if package is None:
+                handlers[f"{package_name}.{type_name}"] = os.path.join(folder, file_name)
+            else:
+                handlers[f"{package_name}.{type_name}"] = f"{package}.{stem}"
+    return handlers
+
+
+def _discover():
+    """Fill the registry with packaged and published handlers."""
+    global _DISCOVERED
+    if _DISCOVERED:
+        return
+    with _LOCK:
+        if _DISCOVERED:
+            return
+        for key, source in _get_handlers().items():
+            _REGISTRY.setdefault(key, source)
+        try:
+            from importlib.metadata import entry_points
+            published = entry_points()
+            if hasattr(published, 'select'):
+                published = published.select(group=_ENTRY_POINT_GROUP)
+            else:
+                published = published.get(_ENTRY_POINT_GROUP, [])
+        except Exception:
+            published = []
+        for entry_point in published:
+            _REGISTRY.setdefault(entry_point.name, entry_point.value)
+        # This is only set once the registry is full, so other
+        # threads never see a partial registry.
+        _DISCOVERED = True
+
+
+def register_handler(key: str, source: str):
+    """Register a handler for a type.
+
+    Parameters
+    ----------
+    key: str
+        The handled type, '<package>.<Type>', i.e. 'pandas.DataFrame'.
+    source: str
+        The module name of the handler or the location of its file.
+        It is not imported until it is needed.
+    """
+    _discover()
+    with _LOCK:
+        _REGISTRY[key] = source
+        _LOADED.pop(key, None)
+
+
+def registered_handlers() -> Dict[str, str]:
+    """Return the registered handlers keyed by handled type."""
+    _discover()
+    with _LOCK:
+        return dict(_REGISTRY)
+
+
+def handler_key(cls: type) -> str:
+    """Return the '<package>.<Type>' key for a class."""
+    return f"{cls.__module__.split('.')[0]}.{cls.__name__}"
+
+
+def _load(key: str) -> ModuleType:
+    """Import the handler registered for a type."""
+    with _LOCK:
+        if key not in _LOADED:
+            source = _REGISTRY[key]
+            if source.endswith('.py'):
+                spec = importlib.util.spec_from_file_location(
+                    f"{__name__}._extra.{key}", source
+                )
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+            else:
+                module = importlib.import_module(source)
+            _LOADED[key] = module
+        return _LOADED[key]
+
+
+def get_handler(obj: Any) -> ModuleType:
+    """Find the handler for an object.
+
+    The handler is chosen by walking the method resolution order of
+    the object's type, so subclasses use the handler of their
+    closest handled parent.
+
+    Parameters
+    ----------
+    obj: Any
+        The object to handle.
+
+    Returns
+    -------
+    handler: module
+        The handler module, which has read, write, and standardize.
+
+    Raises
+    ------
+    TypeError
+        If no handler is registered for the object.
+    """
+    _discover()
+    for cls in type(obj).__mro__:
+        key = handler_key(cls)
+        if key in _REGISTRY:
+            return _load(key)
+    raise TypeError(f"No handler is registered for {type(obj)}.")
@@ -0,0 +1,89 @@
+"""Provides read and write functionality for NumPy ndarray
+
+Arrays are stored in the NumPy format, which allows them to be
+memory mapped when they are read back.
+
+Standardizing an array wraps its memory without copying whenever
+Arrow can use it directly; that is, for contiguous numeric columns
+without a separate null mask. Text is dictionary encoded, and
+everything else is copied into Arrow memory.
+"""
+import numpy as np
+import pyarrow as pa
+
+from typing import Tuple
+
+
+def read(path: str, memory_map: bool = True) -> np.ndarray:
+    """This is a function that reads a NumPy array from disk"""
+    return np.load(path, mmap_mode='r' if memory_map else None)
+
+
+def write(arr: np.ndarray, path: str) -> int:
+    """This is a function that writes a NumPy array to disk"""
+    with open(path, 'wb') as sink:
+        np.save(sink, arr)
+        return sink.tell()
+
+
+def _shares_memory(arr: pa.Array, values: np.ndarray) -> bool:
+    """Check whether an Arrow array is backed by a NumPy array."""
+    data = arr.buffers()[-1]
+    start = values.__array_interface__['data'][0]
+    return data is not None and start <= data.address < start + max(values.nbytes, 1)
+
+
+def to_arrow(values: np.ndarray) -> Tuple[pa.Array, int]:
+    """Convert a one dimensional array into an Arrow array.
+
+    Parameters
+    ----------
+    values: numpy.ndarray
+        This is the array to convert. Contiguous numeric arrays are
+        wrapped without copying them. Object and text arrays are
+        dictionary encoded; None is treated as null.
+
+    Returns
+    -------
+    arr, nbytes: pyarrow.Array, int
+        The Arrow array and the number of bytes which were copied to
+        create it, which is zero if no copy was needed.
+    """
+    if values.dtype.kind in 'OUS':
+        arr = pa.array(values, from_pandas=True)
+        if (
+            pa.types.is_string(arr.type)
+            or pa.types.is_large_string(arr.type)
+            or pa.types.is_binary(arr.type)
+        ):
+            arr = arr.dictionary_encode()
+        return arr, arr.get_total_buffer_size()
+    arr = pa.array(values)
+    if _shares_memory(arr, values):
+        return arr, 0
+    return arr, arr.get_total_buffer_size()
+
+
+def standardize(arr: np.ndarray, report=None) -> pa.Table:
+    """Convert an array into a table.
+
+    Structured arrays have a column for each field, two dimensional
+    arrays have a column for each column of the array (x0, x1, ...),
+    and one dimensional arrays are a single column, x. The columns
+    of two dimensional arrays are only contiguous, and so only
+    wrapped without copying, if the array is in Fortran order.
+    """
+    if arr.dtype.names is not None:
+        columns = {name: arr[name] for name in arr.dtype.names}
+    elif arr.ndim == 1:
+        columns = {'x': arr}
+    elif arr.ndim == 2:
+        columns = {f"x{i}": arr[:, i] for i in range(arr.shape[1])}
+    else:
+        raise TypeError("Only one and two dimensional arrays can be standardized.")
+    arrays = {}
+    for name, values in columns.items():
+        arrays[name], nbytes = to_arrow(values)
+        if nbytes and report is not None:
+            report.record(name, nbytes)
+    return pa.table(arrays)
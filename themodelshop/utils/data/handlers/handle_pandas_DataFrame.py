@@ -0,0 +1,54 @@
+"""Provides read and write functionality for pandas DataFrame
+
+Standardizing a DataFrame wraps each NumPy backed column without
+copying it whenever Arrow can use its memory directly. Text and
+object columns are dictionary encoded. The index is dropped.
+
+Note that floating point NaN values in NumPy backed columns are kept
+as NaN rather than being converted to nulls, which would require an
+extra validity buffer for every column.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from themodelshop.utils.data.handlers import (
+    handle_numpy_ndarray,
+    handle_pyarrow_Table
+)
+
+
+def read(path: str, memory_map: bool = True) -> pd.DataFrame:
+    """This is a function that reads a pandas DataFrame from disk"""
+    return handle_pyarrow_Table.read(path, memory_map).to_pandas()
+
+
+def write(df: pd.DataFrame, path: str) -> int:
+    """This is a function that writes a pandas DataFrame to disk"""
+    return handle_pyarrow_Table.write(standardize(df), path)
+
+
+def _extension_to_arrow(series: pd.Series):
+    """Convert a column which is not backed by a NumPy array."""
+    before = pa.total_allocated_bytes()
+    arr = pa.array(series)
+    if pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type):
+        arr = arr.dictionary_encode()
+        return arr, arr.get_total_buffer_size()
+    return arr, max(pa.total_allocated_bytes() - before, 0)
+
+
+def standardize(df: pd.DataFrame, report=None) -> pa.Table:
+    """Convert a DataFrame into a table."""
+    arrays = {}
+    for name, series in df.items():
+        name = str(name)
+        if isinstance(series.dtype, np.dtype):
+            arrays[name], nbytes = handle_numpy_ndarray.to_arrow(
+                series.to_numpy(copy=False)
+            )
+        else:
+            arrays[name], nbytes = _extension_to_arrow(series)
+        if nbytes and report is not None:
+            report.record(name, nbytes)
+    return pa.table(arrays)
@@ -0,0 +1,29 @@
+"""Provides read and write functionality for PyArrow Dataset
+
+Datasets are collections of Parquet files. Opening one only reads
+the file footers; data is read when the dataset is scanned.
+"""
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+
+def read(path: str, **kwargs) -> ds.Dataset:
+    """This is a function that opens a Parquet dataset on disk"""
+    return ds.dataset(path, format='parquet', **kwargs)
+
+
+def write(dataset: ds.Dataset, path: str, **kwargs):
+    """This is a function that writes a dataset to disk as Parquet"""
+    ds.write_dataset(dataset, path, format='parquet', **kwargs)
+
+
+def standardize(dataset: ds.Dataset, report=None) -> pa.Table:
+    """Read a dataset into a table.
+
+    Every column is read into newly allocated memory.
+    """
+    tbl = dataset.to_table()
+    if report is not None:
+        for name, column in zip(tbl.column_names, tbl.columns):
+            report.record(name, column.get_total_buffer_size())
+    return tbl
@@ -0,0 +1,19 @@
+"""Provides read and write functionality for PyArrow RecordBatch"""
+import pyarrow as pa
+
+from themodelshop.utils.data.handlers import handle_pyarrow_Table
+
+
+def read(path: str, memory_map: bool = True) -> pa.RecordBatch:
+    """This is a function that reads a pyarrow RecordBatch from disk"""
+    return handle_pyarrow_Table.read(path, memory_map).combine_chunks().to_batches()[0]
+
+
+def write(batch: pa.RecordBatch, path: str) -> int:
+    """This is a function that writes a pyarrow RecordBatch to disk"""
+    return handle_pyarrow_Table.write(standardize(batch), path)
+
+
+def standardize(batch: pa.RecordBatch, report=None) -> pa.Table:
+    """Wrap a record batch in a table without copying it."""
+    return pa.Table.from_batches([batch])
@@ -0,0 +1,36 @@
+"""Provides read and write functionality for PyArrow RecordBatchReader
+
+Readers are streamed; writing a reader to disk writes each batch as
+it is read, so the whole stream is never held in memory.
+"""
+import pyarrow as pa
+
+
+def read(path: str, memory_map: bool = True) -> pa.RecordBatchReader:
+    """This is a function that opens an Arrow IPC file as a stream"""
+    if memory_map:
+        source = pa.memory_map(path, 'r')
+    else:
+        source = pa.OSFile(path, 'rb')
+    reader = pa.ipc.open_file(source)
+    return pa.RecordBatchReader.from_batches(
+        reader.schema,
+        (reader.get_batch(i) for i in range(reader.num_record_batches))
+    )
+
+
+def write(reader: pa.RecordBatchReader, path: str) -> int:
+    """This is a function that writes a stream of batches to disk"""
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+        return sink.tell()
+
+
+def standardize(reader: pa.RecordBatchReader, report=None) -> pa.Table:
+    """Collect the batches of a reader into a table.
+
+    The batches are not copied; they are owned by the table.
+    """
+    return reader.read_all()
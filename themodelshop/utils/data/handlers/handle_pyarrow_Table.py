@@ -1,8 +1,58 @@
-"""Provides read and write functionality for PyArrow Table"""
-
-def read():
-    """This is a function that reads a pyarrow Table from disk"""
-    pass
-def write():
-    """This is a function that writes a pyarrow Table to disk"""
-    pass
\ No newline at end of file
+"""Provides read and write functionality for PyArrow Table
+
+Tables are written as uncompressed Arrow IPC (Feather V2) files so
+that they can be memory mapped when they are read back. Reading a
+memory mapped table does not copy any data onto the heap; the pages
+are loaded by the operating system as they are touched and shared
+between every process which maps the same file.
+"""
+import pyarrow as pa
+
+
+def read(path: str, memory_map: bool = True) -> pa.Table:
+    """This is a function that reads a pyarrow Table from disk
+
+    Parameters
+    ----------
+    path: str
+        This is the location of an Arrow IPC file.
+    memory_map: bool = True
+        Memory map the file instead of reading it onto the heap.
+
+    Returns
+    -------
+    tbl: pyarrow.Table
+        The table stored in the file.
+    """
+    if memory_map:
+        source = pa.memory_map(path, 'r')
+    else:
+        source = pa.OSFile(path, 'rb')
+    with source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def write(tbl: pa.Table, path: str) -> int:
+    """This is a function that writes a pyarrow Table to disk
+
+    Parameters
+    ----------
+    tbl: pyarrow.Table
+        The table to write.
+    path: str
+        This is the location to write an Arrow IPC file to.
+
+    Returns
+    -------
+    nbytes: int
+        The size of the written file.
+    """
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, tbl.schema) as writer:
+            writer.write_table(tbl)
+        return sink.tell()
+
+
+def standardize(tbl: pa.Table, report=None) -> pa.Table:
+    """Tables are already standardized."""
+    return tbl
@@ -0,0 +1,222 @@
+"""Keeps the tables in a filing cabinet within a memory budget.
+
+Tables are held in memory until the total size of the resident
+tables exceeds the budget. At that point tables are spilled to Arrow IPC files on disk. Spilled tables are
+read back on demand by memory mapping the file, which means the
+reloaded data lives in the page cache of the operating system rather
+than on the heap and does not count against the budget.
+
+Tables can also be persisted as soon as they are added. Persisted
+tables are only ever held as memory maps, so every process on the
+host which maps the same file shares a single copy of the data.
+
+Tables which can be computed again, such as derived columns, can be
+memoized along with the time they took to compute. Memoized tables
+are dropped rather than spilled. Tables are chosen for eviction by
+GreedyDual-Size: each resident table is priced at the cost of getting
+it back per byte, which is the time to compute it for memoized tables
+and the time to spill and read it back for the rest, and the cheapest
+table per byte among the least recently used goes first. Tables which
+are never memoized are evicted in least recently used order.
+
+The manager is safe to use from several threads, such as the threads
+a Flight server handles requests on.
+"""
+import os
+import pyarrow as pa
+import threading
+
+from collections.abc import MutableMapping
+from itertools import count
+from typing import (
+    Hashable,
+    Iterator
+)
+
+from themodelshop.utils.data.handlers import handle_pyarrow_Table
+
+
+class ResidencyManager(MutableMapping):
+    """A dictionary of tables with cost aware spilling.
+
+    Parameters
+    ----------
+    location: str
+        This is the folder which spilled tables are written to. It
+        is created the first time a table is spilled.
+    budget: int = None
+        This is the number of bytes which resident tables may use.
+        If this is not passed tables are never spilled.
+    write_through: bool = False
+        Persist every table as soon as it is added.
+    bandwidth: float = 1e9
+        The bytes per second at which tables are spilled and read
+        back. This prices spilling a table against computing a
+        memoized table again.
+    """
+    def __init__(
+        self,
+        location: str,
+        budget: int = None,
+        write_through: bool = False,
+        bandwidth: float = 1e9
+    ):
+        self._location = os.path.abspath(location)
+        self._budget = budget
+        self._write_through = write_through
+        self._bandwidth = bandwidth
+        self._resident = {}
+        self._nbytes = {}
+        self._mapped = {}
+        self._spilled = {}
+        self._used = 0
+        # GreedyDual-Size state; the inflation is the priority of the
+        # last evicted table, so that tables which are not used age.
+        self._costs = {}
+        self._priority = {}
+        self._inflation = 0.
+        self._clock = count()
+        self._lock = threading.RLock()
+
+    @property
+    def used(self) -> int:
+        """The number of bytes used by resident tables."""
+        return self._used
+
+    def is_resident(self, key: Hashable) -> bool:
+        """Whether a table is held in memory."""
+        with self._lock:
+            return key in self._resident
+
+    def is_memoized(self, key: Hashable) -> bool:
+        """Whether a table is dropped rather than spilled."""
+        with self._lock:
+            return key in self._costs
+
+    def path(self, key: Hashable) -> str:
+        """The location a table is spilled to."""
+        return os.path.join(self._location, f"{key}.arrow")
+
+    def persist(self, key: Hashable) -> str:
+        """Write a table to disk and replace it with a memory map.
+
+        Parameters
+        ----------
+        key: Hashable
+            This is the key of the table to persist. Tables which are
+            already on disk are left as they are.
+
+        Returns
+        -------
+        path: str
+            The location of the Arrow IPC file holding the table.
+        """
+        with self._lock:
+            if key in self._resident:
+                self._costs.pop(key, None)
+                self._spill(key)
+            elif key not in self._spilled:
+                raise KeyError(key)
+            return self._spilled[key]
+
+    def __getitem__(self, key: Hashable) -> pa.Table:
+        with self._lock:
+            if key in self._resident:
+                self._touch(key)
+                return self._resident[key]
+            if key not in self._mapped:
+                if key not in self._spilled:
+                    raise KeyError(key)
+                self._mapped[key] = handle_pyarrow_Table.read(self._spilled[key])
+            return self._mapped[key]
+
+    def __setitem__(self, key: Hashable, tbl: pa.Table):
+        with self._lock:
+            self._add(key, tbl)
+            if self._write_through:
+                self._spill(key)
+            self._evict()
+
+    def memoize(self, key: Hashable, tbl: pa.Table, cost: float):
+        """Hold a table which can be computed again.
+
+        The table is never written through, and when memory is needed
+        it is dropped instead of spilled, after which the key is no
+        longer in the manager. Persisting the table makes it an
+        ordinary table.
+
+        Parameters
+        ----------
+        key: Hashable
+            This is the key of the table.
+        tbl: pyarrow.Table
+            This is the table.
+        cost: float
+            This is the number of seconds the table took to compute.
+        """
+        with self._lock:
+            self._add(key, tbl, cost)
+            self._evict()
+
+    def _add(self, key: Hashable, tbl: pa.Table, cost: float = None):
+        if key in self:
+            del self[key]
+        self._resident[key] = tbl
+        self._nbytes[key] = tbl.get_total_buffer_size()
+        self._used += self._nbytes[key]
+        if cost is not None:
+            self._costs[key] = cost
+        self._touch(key)
+
+    def _touch(self, key: Hashable):
+        """Price a resident table as it is used."""
+        size = max(self._nbytes[key], 1)
+        cost = self._costs.get(key, size / self._bandwidth)
+        self._priority[key] = (self._inflation + cost / size, next(self._clock))
+
+    def __delitem__(self, key: Hashable):
+        with self._lock:
+            if key in self._resident:
+                del self._resident[key]
+                del self._priority[key]
+                self._costs.pop(key, None)
+                self._used -= self._nbytes.pop(key)
+            elif key in self._spilled:
+                self._mapped.pop(key, None)
+                os.remove(self._spilled.pop(key))
+            else:
+                raise KeyError(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._resident or key in self._spilled
+
+    def __iter__(self) -> Iterator[Hashable]:
+        with self._lock:
+            keys = list(self._resident) + list(self._spilled)
+        yield from keys
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._resident) + len(self._spilled)
+
+    def _evict(self):
+        """Evict the cheapest tables until within budget."""
+        if self._budget is None:
+            return
+        while self._used > self._budget and self._resident:
+            key = min(self._priority, key=self._priority.__getitem__)
+            self._inflation = self._priority[key][0]
+            if key in self._costs:
+                del self[key]
+            else:
+                self._spill(key)
+
+    def _spill(self, key: Hashable):
+        """Move a resident table to disk."""
+        tbl = self._resident.pop(key)
+        del self._priority[key]
+        self._used -= self._nbytes.pop(key)
+        os.makedirs(self._location, exist_ok=True)
+        handle_pyarrow_Table.write(tbl, self.path(key))
+        self._spilled[key] = self.path(key)
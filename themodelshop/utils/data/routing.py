@@ -0,0 +1,81 @@
+"""Routes tickets to the cabinets of a federation.
+
+Tickets are placed on a consistent hash ring. Every cabinet owns many
+points on the ring, its virtual nodes, and a ticket belongs to the
+cabinet owning the first point after the hash of the ticket, wrapping
+around to the first point on the ring.
+The same ticket always routes to the same cabinet, and adding or
+removing a cabinet only moves the tickets next to its points.
+"""
+import hashlib
+
+from bisect import bisect_left, bisect_right
+from typing import (
+    Iterable,
+    List
+)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+class HashRing():
+    """A consistent hash ring.
+
+    Parameters
+    ----------
+    nodes: Iterable[str] = ()
+        The nodes on the ring, i.e. cabinet locations.
+    replicas: int = 64
+        The number of virtual nodes for every node. More virtual
+        nodes spread tickets more evenly.
+    """
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 64):
+        self._replicas = replicas
+        self._points = []
+        self._owners = []
+        self._nodes = []
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        """The nodes on the ring, in the order they were added."""
+        return list(self._nodes)
+
+    def add(self, node: str):
+        """Add a node to the ring."""
+        if node in self._nodes:
+            raise ValueError(f"{node} is already on the ring.")
+        self._nodes.append(node)
+        for replica in range(self._replicas):
+            point = _hash(f"{node}#{replica}")
+            position = bisect_left(self._points, point)
+            self._points.insert(position, point)
+            self._owners.insert(position, node)
+
+    def remove(self, node: str):
+        """Remove a node from the ring."""
+        self._nodes.remove(node)
+        keep = [i for i, owner in enumerate(self._owners) if owner != node]
+        self._points = [self._points[i] for i in keep]
+        self._owners = [self._owners[i] for i in keep]
+
+    def node(self, key: str) -> str:
+        """Find the node a key routes to.
+
+        Raises
+        ------
+        LookupError
+            If the ring is empty.
+        """
+        if not self._points:
+            raise LookupError("The ring has no nodes.")
+        position = bisect_right(self._points, _hash(key)) % len(self._points)
+        return self._owners[position]
+
+    def __len__(self) -> int:
+        return len(self._nodes)
@@ -0,0 +1,259 @@
+"""A compact log of the transactions made by agents.
+
+Every hire, fire, and variable purchase is recorded as a row of five
+numbers: the agent, the action, the variable, the price, and the
+time. Rows are written into preallocated NumPy columns, so recording
+a transaction allocates nothing. When the columns are full they are
+rolled over into a Parquet file and reused, which keeps the memory
+used by the log fixed no matter how long the run is. Every log names
+its files after a random id, so several logs may share a folder.
+
+Reports are computed with Arrow's hash aggregation over each file and
+the columns in memory, and the partial results are then combined, so
+reporting never needs the whole log in memory at once.
+"""
+import numpy as np
+import os
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import tempfile
+import time
+import uuid
+
+from typing import (
+    Any,
+    Iterator,
+    List,
+    Union
+)
+
+# The actions which can be recorded; the code of an action is its
+# position in this tuple.
+ACTIONS = ('hire', 'fire', 'purchase', 'sell')
+
+SCHEMA = pa.schema([
+    ('agent_id', pa.int64()),
+    ('action', pa.int8()),
+    ('variable_id', pa.int32()),
+    ('price', pa.float64()),
+    ('timestamp', pa.timestamp('ns')),
+])
+
+# The NumPy type each column is held in while in memory.
+_DTYPES = dict(
+    agent_id=np.int64,
+    action=np.int8,
+    variable_id=np.int32,
+    price=np.float64,
+    timestamp=np.int64
+)
+
+# The aggregates in a report which are combined by summing.
+_SUMS = [f"n_{action}" for action in ACTIONS] + ['spent']
+
+
+def action_code(action: Union[str, int]) -> int:
+    """Return the code of an action given its name or code."""
+    if isinstance(action, str):
+        try:
+            return ACTIONS.index(action)
+        except ValueError:
+            raise ValueError(
+                f"{action} is not an action, use one of {ACTIONS}."
+            ) from None
+    return action
+
+
+class TransactionLog():
+    """Records transactions in fixed memory.
+
+    Parameters
+    ----------
+    capacity: int = 100000
+        The number of transactions held in memory before they are
+        rolled over to disk.
+    location: str = None
+        The folder which rolled over transactions are written to. It
+        is created at the first rollover. If this is not passed a
+        temporary folder is made at the first rollover.
+    """
+    def __init__(
+        self,
+        capacity: int = 100000,
+        location: str = None
+    ):
+        self._capacity = capacity
+        self.location = location
+        self._id = uuid.uuid4().hex
+        self._columns = {
+            name: np.zeros(capacity, dtype=dtype)
+            for name, dtype in _DTYPES.items()
+        }
+        self._size = 0
+        self._parts = []
+        self._rolled = 0
+
+    def __len__(self):
+        return self._rolled + self._size
+
+    @property
+    def parts(self) -> List[str]:
+        """The Parquet files holding rolled over transactions."""
+        return list(self._parts)
+
+    def record(
+        self,
+        agent_id: Any,
+        action: Union[str, Any],
+        variable_id: Any = -1,
+        price: Any = 0.,
+        timestamp: Any = None
+    ):
+        """Record one or more transactions.
+
+        Every argument may be a scalar or an array; scalars are
+        broadcast, so a batch of purchases by one agent can be
+        recorded with a single call.
+
+        Parameters
+        ----------
+        agent_id: int or array of int
+            The agent making the transaction.
+        action: str, int, or array of int
+            The name or code of the action; see ACTIONS.
+        variable_id: int or array of int = -1
+            The variable bought or sold, or -1 if there is none.
+        price: float or array of float = 0.
+            The price paid.
+        timestamp: int or array of int = None
+            The time in nanoseconds since the epoch. This defaults
+            to the current time.
+        """
+        if timestamp is None:
+            timestamp = time.time_ns()
+        values = dict(
+            agent_id=agent_id,
+            action=action_code(action),
+            variable_id=variable_id,
+            price=price,
+            timestamp=timestamp
+        )
+        n = max(np.size(value) for value in values.values())
+        values = {
+            name: np.broadcast_to(value, n) for name, value in values.items()
+        }
+        start = 0
+        while start < n:
+            stop = min(n, start + self._capacity - self._size)
+            rows = slice(self._size, self._size + stop - start)
+            for name, column in self._columns.items():
+                column[rows] = values[name][start:stop]
+            self._size += stop - start
+            start = stop
+            if self._size == self._capacity:
+                self.rollover()
+
+    def _buffer(self) -> pa.Table:
+        """A copy of the transactions held in memory.
+
+        The columns are reused after every rollover, so they are
+        copied rather than wrapped.
+        """
+        return pa.Table.from_arrays(
+            [
+                pa.array(self._columns[field.name][:self._size].copy(), type=field.type)
+                for field in SCHEMA
+            ],
+            schema=SCHEMA
+        )
+
+    def rollover(self):
+        """Write the transactions held in memory to a Parquet file."""
+        if self._size == 0:
+            return
+        if self.location is None:
+            self.location = tempfile.mkdtemp(prefix='transactions-')
+        os.makedirs(self.location, exist_ok=True)
+        path = os.path.join(
+            self.location, f"part-{self._id}-{len(self._parts):05d}.parquet"
+        )
+        pq.write_table(self._buffer(), path)
+        self._parts.append(path)
+        self._rolled += self._size
+        self._size = 0
+
+    def _tables(self, filter: pc.Expression = None) -> Iterator[pa.Table]:
+        """Yield the log one file at a time, ending with memory."""
+        for path in self._parts:
+            yield pq.read_table(path, schema=SCHEMA, filters=filter)
+        tbl = self._buffer()
+        yield tbl if filter is None else tbl.filter(filter)
+
+    def to_table(self, **kwargs: Any) -> pa.Table:
+        """Return the transactions matching every keyword, in order.
+
+        Parameters
+        ----------
+        **kwargs: Any
+            Column values to match, i.e. agent_id=3, action='purchase'.
+
+        Returns
+        -------
+        transactions: pyarrow.Table
+            The matching transactions in the order they were made.
+        """
+        unknown = set(kwargs) - set(SCHEMA.names)
+        if unknown:
+            raise KeyError(f"{unknown} are not transaction fields.")
+        if 'action' in kwargs:
+            kwargs['action'] = action_code(kwargs['action'])
+        filter = None
+        for name, value in kwargs.items():
+            term = pc.field(name) == value
+            filter = term if filter is None else filter & term
+        return pa.concat_tables(self._tables(filter))
+
+    def report(self, by: str = 'agent_id') -> pa.Table:
+        """Summarize the log.
+
+        Parameters
+        ----------
+        by: str = 'agent_id'
+            The field to group by, i.e. 'variable_id' to summarize
+            the purchases of each variable.
+
+        Returns
+        -------
+        report: pyarrow.Table
+            One row per group with the number of each action, the
+            total spent, and the times of the first and last
+            transaction.
+        """
+        partials = [self._summarize(tbl, by) for tbl in self._tables()]
+        report = pa.concat_tables(partials).group_by(by).aggregate(
+            [(name, 'sum') for name in _SUMS]
+            + [('first', 'min'), ('last', 'max')]
+        )
+        # The position of the keys differs between versions of
+        # PyArrow, so the aggregates are selected by name.
+        return report.select(
+            [by] + [f"{name}_sum" for name in _SUMS] + ['first_min', 'last_max']
+        ).rename_columns([by] + _SUMS + ['first', 'last']).sort_by(by)
+
+    @staticmethod
+    def _summarize(tbl: pa.Table, by: str) -> pa.Table:
+        """Aggregate one table of transactions."""
+        for code, action in enumerate(ACTIONS):
+            tbl = tbl.append_column(
+                f"n_{action}",
+                pc.cast(pc.equal(tbl['action'], code), pa.int64())
+            )
+        summary = tbl.group_by(by).aggregate(
+            [(f"n_{action}", 'sum') for action in ACTIONS]
+            + [('price', 'sum'), ('timestamp', 'min'), ('timestamp', 'max')]
+        )
+        return summary.select(
+            [by] + [f"n_{action}_sum" for action in ACTIONS]
+            + ['price_sum', 'timestamp_min', 'timestamp_max']
+        ).rename_columns([by] + _SUMS + ['first', 'last'])
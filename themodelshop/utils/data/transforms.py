@@ -0,0 +1,107 @@
+"""The transformations a cabinet can apply to its datasets.
+
+A transformation builds a new column from columns of a dataset. It
+is a vectorized function called with one Arrow array per input
+column, along with any parameters as keywords, which returns an
+Arrow array of the same length. Cabinets apply transformations batch
+by batch, so a transformation must only use the rows of the batch it
+is given.
+
+Only registered transformations can be applied. The registry holds
+the element-wise PyArrow compute functions and NumPy ufuncs listed
+below, and more can be added with register_transform.
+"""
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from typing import (
+    Any,
+    Callable,
+    Dict
+)
+
+__all__ = [
+    'get_transform',
+    'register_transform',
+    'registered_transforms',
+]
+
+# name -> transformation
+_TRANSFORMS: Dict[str, Callable] = {}
+
+# Element-wise PyArrow compute functions.
+_COMPUTE = [
+    'abs', 'add', 'ceil', 'cos', 'divide', 'equal', 'exp', 'floor',
+    'greater', 'greater_equal', 'less', 'less_equal', 'ln', 'log10',
+    'log1p', 'log2', 'max_element_wise', 'min_element_wise',
+    'multiply', 'negate', 'not_equal', 'power', 'round', 'sign',
+    'sin', 'sqrt', 'subtract', 'tan',
+]
+
+# NumPy ufuncs without a PyArrow equivalent.
+_UFUNCS = [
+    'arctan', 'cbrt', 'expm1', 'hypot', 'square', 'tanh',
+]
+
+
+def _ufunc(ufunc: np.ufunc) -> Callable:
+    """Wrap a NumPy ufunc as a transformation.
+
+    Arrays without nulls are handed to the ufunc without copying.
+    Nulls are passed through.
+    """
+    def transform(*arrays: pa.Array, **params: Any) -> pa.Array:
+        mask = None
+        for array in arrays:
+            if array.null_count:
+                nulls = array.is_null().to_numpy(zero_copy_only=False)
+                mask = nulls if mask is None else mask | nulls
+        values = [
+            array.fill_null(0).to_numpy(zero_copy_only=False)
+            if array.null_count else array.to_numpy(zero_copy_only=False)
+            for array in arrays
+        ]
+        return pa.array(ufunc(*values, **params), mask=mask)
+    transform.__name__ = ufunc.__name__
+    return transform
+
+
+def register_transform(name: str, transform: Callable):
+    """Register a transformation.
+
+    Parameters
+    ----------
+    name: str
+        The name clients use to request the transformation.
+    transform: Callable
+        A function of one Arrow array per input column, and keyword
+        parameters, which returns an Arrow array of the same length.
+    """
+    _TRANSFORMS[name] = transform
+
+
+def registered_transforms() -> Dict[str, Callable]:
+    """Return the registered transformations keyed by name."""
+    return dict(_TRANSFORMS)
+
+
+def get_transform(name: str) -> Callable:
+    """Find a registered transformation.
+
+    Raises
+    ------
+    KeyError
+        If no transformation is registered under the name.
+    """
+    try:
+        return _TRANSFORMS[name]
+    except KeyError:
+        raise KeyError(f"No transformation is registered as {name}.") from None
+
+
+for _name in _COMPUTE:
+    if hasattr(pc, _name):
+        register_transform(_name, getattr(pc, _name))
+for _name in _UFUNCS:
+    register_transform(_name, _ufunc(getattr(np, _name)))
@@ -1,6 +1,10 @@
 """Tools for monitoring convergence of arrays
 
 The following tools are used to estimate convergence in arrays.
+check_for_convergence works on an entire array while the
+ConvergenceMonitor takes one value at a time, in constant time, and
+agrees with check_for_convergence on the same data.
+check_for_convergence_batch checks many series at once.
 TODO: Does this need to be here? This was part of a project that I wound up *not* using.
 """
 # https://docs.scipy.org/doc/scipy/reference/generated/scipy.optimize.differential_evolution.html
@@ -8,8 +12,13 @@ TODO: Does this need to be here? This was part of a project that I wound up *not
 import numpy as np
 import pandas as pd
 
+from collections import deque
 from scipy.linalg import lstsq
-from typing import Union
+from scipy.signal import lfilter
+from typing import (
+    Sequence,
+    Union
+)
 
 def check_for_convergence(
     x: Union[pd.Series,np.ndarray],
@@ -76,3 +85,305 @@ def check_for_convergence(
     p_2, res_2, _, _ = lstsq(M, d_2.tail(buffer_size))
     # This is a short term fix.
     return abs(p_1[1]) <= .00001 and abs(p_2[1]) <= .00001
+
+
+def _ragged_gradient(x: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """np.gradient along each row, where row i has lengths[i] values.
+
+    Values past the end of each row are left as they are computed from
+    the padding and should be ignored.
+    """
+    g = np.empty_like(x)
+    g[:, 1:-1] = (x[:, 2:] - x[:, :-2]) / 2
+    g[:, 0] = x[:, 1] - x[:, 0]
+    rows = np.arange(x.shape[0])
+    g[rows, lengths - 1] = x[rows, lengths - 1] - x[rows, lengths - 2]
+    return g
+
+
+def _ewm(x: np.ndarray, spans: np.ndarray) -> np.ndarray:
+    """An exponentially weighted mean along each row.
+
+    This matches pandas' ewm(span, adjust=False). Rows which share a
+    span are filtered together.
+    """
+    out = np.empty_like(x)
+    for span in np.unique(spans):
+        rows = spans == span
+        alpha = 2 / (span + 1)
+        out[rows], _ = lfilter(
+            [alpha],
+            [1, alpha - 1],
+            x[rows],
+            axis=1,
+            zi=(1 - alpha) * x[rows, :1]
+        )
+    return out
+
+
+def _window_slopes(
+    y: np.ndarray,
+    lengths: np.ndarray,
+    buffer_sizes: np.ndarray
+) -> np.ndarray:
+    """The slope of a line fit to the last buffer_sizes values of each row."""
+    width = buffer_sizes.max()
+    positions = np.arange(width)
+    in_window = positions[None, :] < buffer_sizes[:, None]
+    columns = (lengths - buffer_sizes)[:, None] + positions[None, :]
+    window = np.take_along_axis(y, np.where(in_window, columns, 0), axis=1)
+    window = np.where(in_window, window, 0.0)
+    size = buffer_sizes.astype(float)
+    s0 = window.sum(axis=1)
+    s1 = (window * positions).sum(axis=1)
+    sx = size * (size - 1) / 2
+    sxx = (size - 1) * size * (2 * size - 1) / 6
+    denominator = size * sxx - sx ** 2
+    slopes = np.zeros(len(y))
+    fit = denominator != 0
+    slopes[fit] = (size[fit] * s1[fit] - sx[fit] * s0[fit]) / denominator[fit]
+    return slopes
+
+
+def check_for_convergence_batch(
+    x: Union[np.ndarray, Sequence[np.ndarray]],
+    buffer_size: Union[int,float] = .05,
+    tolerance: float = .00001
+) -> np.ndarray:
+    """Checks for convergence in many one-dimensional arrays at once.
+
+    This gives the same result as calling check_for_convergence on
+    each array, but the smoothing, gradients, and least squares fits
+    are computed for every array together.
+
+    Parameters
+    ----------
+    x: Union[numpy.ndarray, Sequence[numpy.ndarray]]
+        Either a two dimensional array with one series per row, or a
+        list of one dimensional series of different lengths.
+    buffer_size: Union[int,float] = .05
+        The span of the smoothing and the number of values the lines
+        are fit to. A float is a fraction of the length of each series.
+    tolerance: float = .00001
+        The slopes of both lines must be within this of zero.
+
+    Returns
+    -------
+    converged: numpy.ndarray
+        A boolean mask with one value for each series.
+    """
+    ################################################################
+    # Bookkeeping
+    ################################################################
+    if not isinstance(buffer_size, (int,float)):
+        errmsg = "Buffer size type mismatch. Expecting integer or float."
+        raise TypeError(errmsg)
+    if isinstance(x, np.ndarray) and x.ndim == 2:
+        lengths = np.full(x.shape[0], x.shape[1])
+        padded = x.astype(float)
+    else:
+        series = [np.asarray(row, dtype=float).ravel() for row in x]
+        lengths = np.array([len(row) for row in series])
+        padded = np.empty((len(series), lengths.max()))
+        for i, row in enumerate(series):
+            # Repeat the last value so the padding is finite.
+            padded[i, :len(row)] = row
+            padded[i, len(row):] = row[-1]
+    if lengths.min() < 2:
+        raise Exception("Every series needs at least two values.")
+    if isinstance(buffer_size, float):
+        buffer_sizes = np.round(buffer_size * lengths).astype(int)
+    else:
+        buffer_sizes = np.full(len(lengths), buffer_size)
+    if (buffer_sizes > lengths).any():
+        raise Exception("Buffer size must be smaller than array size")
+    ################################################################
+    # Smoothed derivatives and their trends
+    ################################################################
+    d_1 = _ewm(np.abs(_ragged_gradient(padded, lengths)), buffer_sizes)
+    d_2 = _ewm(np.abs(_ragged_gradient(d_1, lengths)), buffer_sizes)
+    p_1 = _window_slopes(d_1, lengths, buffer_sizes)
+    p_2 = _window_slopes(d_2, lengths, buffer_sizes)
+    return (np.abs(p_1) <= tolerance) & (np.abs(p_2) <= tolerance)
+
+class _SlidingFit():
+    """Running sums for a least squares line over a sliding window.
+
+    This holds the most recent values of a series, up to capacity,
+    along with the sum of the values and the sum of each value times
+    its position in the window. Both sums are updated in constant
+    time as values enter and leave the window, and are recomputed
+    from the window once per capacity updates to stop rounding error
+    from accumulating.
+    """
+    def __init__(self, capacity: int):
+        self._capacity = max(capacity, 0)
+        self._values = deque(maxlen=self._capacity or 1)
+        self._s0 = 0.0
+        self._s1 = 0.0
+        self._updates = 0
+
+    def push(self, value: float):
+        if self._capacity == 0:
+            return
+        if len(self._values) < self._capacity:
+            self._s1 += len(self._values) * value
+            self._s0 += value
+        else:
+            oldest = self._values[0]
+            self._s1 += (self._capacity - 1) * value - (self._s0 - oldest)
+            self._s0 += value - oldest
+        self._values.append(value)
+        self._updates += 1
+        if self._updates % self._capacity == 0:
+            self._s0 = sum(self._values)
+            self._s1 = sum(j * v for j, v in enumerate(self._values))
+
+    def slope(self, tentative: list, size: int) -> float:
+        """The slope of a line fit to the last size values.
+
+        Parameters
+        ----------
+        tentative: list
+            Values which follow the values in the window but which
+            may still change.
+        size: int
+            The number of values to fit; the window holds the first
+            size - len(tentative) of them.
+        """
+        tentative = tentative[-size:]
+        offset = size - len(tentative)
+        s0, s1 = self._s0, self._s1
+        for k, value in enumerate(tentative):
+            s0 += value
+            s1 += (offset + k) * value
+        sx = size * (size - 1) / 2
+        sxx = (size - 1) * size * (2 * size - 1) / 6
+        denominator = size * sxx - sx ** 2
+        if denominator == 0:
+            return 0.0
+        return (size * s1 - sx * s0) / denominator
+
+
+class ConvergenceMonitor():
+    """Checks for convergence of a series one value at a time.
+
+    This is a streaming version of check_for_convergence. Feeding the
+    values of an array to update one at a time gives the same result
+    as calling check_for_convergence on the array, but each update
+    costs constant time rather than time proportional to the length
+    of the series.
+
+    The last value of a gradient is a one sided difference which
+    becomes a central difference when the next value arrives. The
+    monitor therefore keeps the settled values of the smoothed
+    derivatives in running least squares windows and recomputes only
+    the few trailing values which are still unsettled.
+
+    Parameters
+    ----------
+    buffer_size: int
+        The span of the smoothing and the number of values the lines
+        are fit to. Unlike check_for_convergence this can not be a
+        fraction, as the length of the series is not known up front.
+    tolerance: float = .00001
+        The slopes of both lines must be within this of zero.
+    """
+    def __init__(
+        self,
+        buffer_size: int,
+        tolerance: float = .00001
+    ):
+        if not isinstance(buffer_size, int):
+            errmsg = "Buffer size type mismatch. Expecting integer."
+            raise TypeError(errmsg)
+        if buffer_size < 1:
+            raise Exception("Buffer size must be at least one.")
+        self._buffer_size = buffer_size
+        self._tolerance = tolerance
+        self._alpha = 2 / (buffer_size + 1)
+        self._n = 0
+        # The last two values of the series.
+        self._x = deque(maxlen=2)
+        # The last two settled values of the smoothed first derivative.
+        self._d_1 = deque(maxlen=2)
+        # The last settled value of the smoothed second derivative.
+        self._d_2 = None
+        self._fit_1 = _SlidingFit(buffer_size - 1)
+        self._fit_2 = _SlidingFit(buffer_size - 2)
+        self._slopes = (np.nan, np.nan)
+
+    @property
+    def n(self) -> int:
+        """The number of values seen."""
+        return self._n
+
+    @property
+    def slopes(self) -> tuple:
+        """The slopes of the lines fit to the two derivatives."""
+        return self._slopes
+
+    def _smooth(self, previous: float, value: float) -> float:
+        if previous is None:
+            return value
+        return (1 - self._alpha) * previous + self._alpha * value
+
+    def _settle(self, x_new: float):
+        """Settle the values which depended on the arrival of x_new."""
+        # The gradient at n - 1 becomes a central difference.
+        if self._n == 1:
+            g = x_new - self._x[-1]
+        else:
+            g = (x_new - self._x[0]) / 2
+        d_1 = self._smooth(self._d_1[-1] if self._d_1 else None, abs(g))
+        self._d_1.append(d_1)
+        self._fit_1.push(d_1)
+        # Which settles the gradient of d_1 at n - 2.
+        if len(self._d_1) == 2 and self._n >= 2:
+            if self._n == 2:
+                h = self._d_1[1] - self._d_1[0]
+            else:
+                h = (self._d_1[1] - self._d_1_before) / 2
+            self._d_2 = self._smooth(self._d_2, abs(h))
+            self._fit_2.push(self._d_2)
+
+    def update(self, value: float) -> bool:
+        """Add a value to the series.
+
+        Parameters
+        ----------
+        value: float
+            The next value of the series.
+
+        Returns
+        -------
+        converged: bool
+            Whether the series has converged. This is False until
+            there are at least buffer_size values, and at least two.
+        """
+        value = float(value)
+        if self._n >= 1:
+            # Remember d_1 at n - 3 before it leaves the deque.
+            self._d_1_before = self._d_1[0] if len(self._d_1) == 2 else None
+            self._settle(value)
+        self._x.append(value)
+        self._n += 1
+        if self._n < max(self._buffer_size, 2):
+            return False
+        # The unsettled trailing values, computed as the batch
+        # function would compute them for the series so far.
+        d_1_last = self._smooth(self._d_1[-1], abs(self._x[1] - self._x[0]))
+        if self._n == 2:
+            h_2 = d_1_last - self._d_1[-1]
+        else:
+            h_2 = (d_1_last - self._d_1[0]) / 2
+        d_2_second = self._smooth(self._d_2, abs(h_2))
+        d_2_last = self._smooth(d_2_second, abs(d_1_last - self._d_1[-1]))
+        self._slopes = (
+            self._fit_1.slope([d_1_last], self._buffer_size),
+            self._fit_2.slope([d_2_second, d_2_last], self._buffer_size)
+        )
+        return (
+            abs(self._slopes[0]) <= self._tolerance
+            and abs(self._slopes[1]) <= self._tolerance
+        )
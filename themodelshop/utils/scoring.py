@@ -0,0 +1,175 @@
+"""Harmonic Percentile Error.
+
+Models are scored on how evenly they perform across the range of the
+target. The observations are split into buckets; the classes of a
+categorical target, or the percentile buckets of a continuous target.
+The accuracy of a model is measured within every bucket and the
+accuracies are combined with a harmonic mean, so a model which does
+poorly on any one bucket scores poorly overall.
+
+Scores are estimated on stratified bootstrap samples of the test data
+which draw the same number of observations from every bucket. The
+buckets and the resamples depend only on the target, so they are
+drawn once when the scorer is built as a matrix of observation
+indices, one row per resample. The scorer holds that matrix, which is
+B times the number of observations drawn. The bucket accuracies are
+gathered with it one resample, and as many models as fit in a fixed
+working buffer, at a time, so beyond that buffer scoring only
+allocates the result, of size models times B times buckets.
+"""
+import numpy as np
+
+from numpy.random import default_rng
+from typing import Any
+
+# The number of accuracies gathered at once by bucket_accuracy.
+_GATHER_SIZE = 1 << 22
+
+
+class HPEScorer():
+    """Scores predictions with bootstrapped Harmonic Percentile Error.
+
+    For a categorical target the accuracy of an observation is 1 if
+    it was predicted correctly and 0 if it was not. For a continuous
+    target the target and predictions are mapped to percentiles of
+    the target, and the accuracy is 1 less the squared difference of
+    the percentiles.
+
+    Parameters
+    ----------
+    y: array-like
+        The target of the test data.
+    n_buckets: int = 10
+        The number of percentile buckets for a continuous target.
+    n_bootstraps: int = 100
+        The number of bootstrap resamples, B.
+    samples_per_bucket: int = None
+        The number of observations drawn from each bucket in every
+        resample. This defaults to the mean bucket size.
+    categorical: bool = None
+        Whether the target is categorical. By default targets which
+        are not floating point are categorical.
+    seed: int = None
+        Seed for the resamples.
+    """
+    def __init__(
+        self,
+        y: Any,
+        n_buckets: int = 10,
+        n_bootstraps: int = 100,
+        samples_per_bucket: int = None,
+        categorical: bool = None,
+        seed: int = None
+    ):
+        y = np.asarray(y)
+        if categorical is None:
+            categorical = not np.issubdtype(y.dtype, np.floating)
+        self.categorical = categorical
+        self._y = y
+        if categorical:
+            _, buckets = np.unique(y, return_inverse=True)
+        else:
+            self._sorted = np.sort(y)
+            self._percentiles = self._percentile(y)
+            buckets = np.minimum(
+                (self._percentiles * n_buckets).astype(np.intp), n_buckets - 1
+            )
+            # Ties may leave buckets empty.
+            _, buckets = np.unique(buckets, return_inverse=True)
+        buckets = buckets.ravel()
+        self.n_buckets = buckets.max() + 1
+        self.buckets = buckets
+        self.n_bootstraps = n_bootstraps
+        sizes = np.bincount(buckets, minlength=self.n_buckets)
+        if samples_per_bucket is None:
+            samples_per_bucket = max(1, len(y) // self.n_buckets)
+        self.samples_per_bucket = samples_per_bucket
+        # Draw every resample at once. Row b of indices holds the
+        # observations in resample b, bucket by bucket.
+        order = np.argsort(buckets, kind='stable')
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        draws = default_rng(seed).random(
+            (n_bootstraps, self.n_buckets, samples_per_bucket)
+        )
+        positions = starts[:, None] + (draws * sizes[:, None]).astype(np.intp)
+        self.indices = order[positions].reshape(n_bootstraps, -1)
+
+    def _percentile(self, values: np.ndarray) -> np.ndarray:
+        """Map values to percentiles of the target."""
+        lower = np.searchsorted(self._sorted, values, side='left')
+        upper = np.searchsorted(self._sorted, values, side='right')
+        return (lower + upper) / (2 * len(self._sorted))
+
+    def accuracy(self, predictions: Any) -> np.ndarray:
+        """The accuracy of every prediction.
+
+        Parameters
+        ----------
+        predictions: array-like
+            One prediction vector, or a matrix with one row of
+            predictions per model.
+
+        Returns
+        -------
+        accuracy: numpy.ndarray
+            The accuracy of each prediction, with the same shape.
+        """
+        predictions = np.asarray(predictions)
+        if self.categorical:
+            return (predictions == self._y).astype(float)
+        return 1 - (self._percentile(predictions) - self._percentiles) ** 2
+
+    def bucket_accuracy(self, predictions: Any) -> np.ndarray:
+        """The mean accuracy within every bucket of every resample.
+
+        Returns
+        -------
+        accuracy: numpy.ndarray
+            An array of shape (models, B, buckets), or (B, buckets)
+            for a single prediction vector.
+        """
+        accuracy = self.accuracy(predictions)
+        single = accuracy.ndim == 1
+        accuracy = np.atleast_2d(accuracy)
+        n_models = len(accuracy)
+        means = np.empty((n_models, self.n_bootstraps, self.n_buckets))
+        step = max(1, _GATHER_SIZE // max(accuracy.shape[1], self.indices.shape[1]))
+        for start in range(0, n_models, step):
+            # Observations are gathered as rows, which is much faster
+            # than gathering columns of the accuracy of every model.
+            rows = np.ascontiguousarray(accuracy[start:start + step].T)
+            for b, indices in enumerate(self.indices):
+                means[start:start + step, b] = rows[indices].reshape(
+                    self.n_buckets, self.samples_per_bucket, -1
+                ).mean(axis=1).T
+        return means[0] if single else means
+
+    def score(self, predictions: Any) -> np.ndarray:
+        """The HPE of predictions on every resample.
+
+        Parameters
+        ----------
+        predictions: array-like
+            One prediction vector, or a matrix with one row of
+            predictions per model.
+
+        Returns
+        -------
+        hpe: numpy.ndarray
+            An array of shape (models, B), or (B,) for a single
+            prediction vector. A bucket with no accurate predictions
+            gives an HPE of 0.
+        """
+        accuracy = self.bucket_accuracy(predictions)
+        with np.errstate(divide='ignore'):
+            return self.n_buckets / (1 / accuracy).sum(axis=-1)
+
+
+def hpe(y: Any, predictions: Any, **kwargs: Any) -> np.ndarray:
+    """Estimate the HPE of predictions.
+
+    This is the mean HPE over bootstrap resamples; keywords are
+    passed to HPEScorer. Build an HPEScorer directly to score
+    against the same target more than once.
+    """
+    return HPEScorer(y, **kwargs).score(predictions).mean(axis=-1)
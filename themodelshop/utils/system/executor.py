@@ -0,0 +1,294 @@
+"""Runs employee contracts in parallel on one host.
+
+Contracts are run in a pool of processes. The dataset is never sent to
+the workers; when a worker starts it memory maps the Arrow IPC files
+the cabinet keeps for each column (see FileCabinet.local_paths), so
+every worker reads the same pages of the operating system's page
+cache and the dataset exists in memory once no matter how many
+employees are working on it. Each task only carries the indices of
+the columns the employee purchased.
+
+Tasks are pulled from one shared queue by whichever worker is idle,
+so long contracts do not hold up short ones. Fired employees are
+cancelled through an array of flags in shared memory which running
+contracts can poll, while contracts which have not started are
+dropped from the queue.
+"""
+import json
+import multiprocessing
+import numpy as np
+import pyarrow as pa
+import threading
+import time
+
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor
+)
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    NamedTuple,
+    Sequence
+)
+
+from themodelshop.utils.data.handlers import handle_pyarrow_Table
+from themodelshop.utils.system.profiling import (
+    LEDGER,
+    enabled
+)
+
+# These are set in every worker by _attach.
+_FEATURES = None
+_TARGET = None
+_CANCELLED = None
+
+
+class ContractResult(NamedTuple):
+    """The outcome of one contract."""
+    employee_id: Any
+    score: Any
+    wall_time: float
+    cpu_time: float
+    cancelled: bool
+
+
+def _attach(paths: Dict[str, str], target: str, cancelled):
+    """Memory map the dataset in a worker."""
+    global _FEATURES, _TARGET, _CANCELLED
+    columns = {
+        name: handle_pyarrow_Table.read(path).column(0)
+        for name, path in paths.items()
+    }
+    _TARGET = columns.pop(target)
+    _FEATURES = pa.table(columns)
+    _CANCELLED = cancelled
+
+
+def _run(
+    employee_id: Any,
+    slot: int,
+    contract: Callable,
+    columns: Sequence[int],
+    kwargs: Dict[str, Any]
+) -> ContractResult:
+    """Run a contract in a worker."""
+    wall, cpu = time.perf_counter(), time.process_time()
+    def cancelled() -> bool:
+        return bool(_CANCELLED[slot])
+    score = None
+    if not cancelled():
+        score = contract(_FEATURES.select(list(columns)), _TARGET, cancelled, **kwargs)
+    return ContractResult(
+        employee_id,
+        score,
+        time.perf_counter() - wall,
+        time.process_time() - cpu,
+        cancelled()
+    )
+
+
+def linear_contract(
+    features: pa.Table,
+    target: pa.ChunkedArray,
+    cancelled: Callable[[], bool],
+    months: int = 12
+) -> float:
+    """A contract which fits a linear model once a month.
+
+    The rows are split into months. Every month a least squares model
+    is fit on the rows seen so far and scored on the next month. The
+    contract stops early if the employee is fired.
+
+    Returns
+    -------
+    mse: float
+        The mean squared error of the last month scored.
+    """
+    x = np.column_stack(
+        [np.ones(features.num_rows)]
+        + [column.to_numpy() for column in features.columns]
+    )
+    y = target.to_numpy()
+    bounds = np.linspace(0, len(y), months + 1).astype(int)
+    mse = np.nan
+    for month in range(1, months):
+        if cancelled():
+            break
+        seen, upcoming = slice(0, bounds[month]), slice(bounds[month], bounds[month + 1])
+        coefficients = np.linalg.lstsq(x[seen], y[seen], rcond=None)[0]
+        mse = np.mean((x[upcoming] @ coefficients - y[upcoming]) ** 2)
+    return mse
+
+
+def _account(future: Future):
+    """Record the cost of a finished contract in the ledger.
+
+    Contracts are timed in the workers, whose ledgers the caller
+    cannot see.
+    """
+    if future.cancelled() or future.exception() is not None or not enabled():
+        return
+    result = future.result()
+    agent_id = result.employee_id
+    if not isinstance(agent_id, (int, np.integer)):
+        agent_id = -1
+    LEDGER.record('contract', agent_id, result.wall_time, result.cpu_time)
+
+
+class ContractExecutor():
+    """Runs employee contracts in a pool of processes.
+
+    A contract is a function, which must be importable by the worker
+    processes, called as
+
+        contract(features, target, cancelled, **kwargs)
+
+    where features is a table of the purchased columns, target is
+    the target column, and cancelled is a function which returns True
+    once the employee has been fired. Its return value is the score.
+
+    Parameters
+    ----------
+    paths: Dict[str,str]
+        The Arrow IPC file of each column, as returned by
+        FileCabinet.local_paths.
+    target: str
+        The target column. The remaining columns are the features,
+        which are purchased by their index.
+    max_workers: int = None
+        The number of worker processes. This defaults to the number
+        of cores.
+    max_employees: int = 65536
+        The number of contracts which may be queued or running at
+        once. The slot of a contract is reused once it is done.
+    mp_context: multiprocessing.context.BaseContext = None
+        The context used to start workers.
+    """
+    def __init__(
+        self,
+        paths: Dict[str, str],
+        target: str,
+        max_workers: int = None,
+        max_employees: int = 65536,
+        mp_context=None
+    ):
+        self.features = [name for name in paths if name != target]
+        self._cancelled = multiprocessing.RawArray('b', max_employees)
+        self._slots = {}
+        self._futures: Dict[Any, Future] = {}
+        self._free = list(range(max_employees - 1, -1, -1))
+        # Slots are released by the threads of the pool.
+        self._lock = threading.Lock()
+        self._pool = ProcessPoolExecutor(
+            max_workers,
+            mp_context=mp_context,
+            initializer=_attach,
+            initargs=(paths, target, self._cancelled)
+        )
+
+    @classmethod
+    def from_cabinet(cls, cabinet: Any, ticket: str, target: str, **kwargs: Any):
+        """Build an executor for a dataset in a cabinet.
+
+        Parameters
+        ----------
+        cabinet: FileCabinet or pyarrow.flight.FlightClient
+            The cabinet, or a client connected to a cabinet on this
+            host.
+        ticket: str
+            The ticket the dataset was filed under.
+        target: str
+            The target column.
+        """
+        if hasattr(cabinet, 'local_paths'):
+            paths = cabinet.local_paths(ticket)
+        else:
+            import pyarrow.flight as fl
+            action = fl.Action('local_paths', ticket.encode())
+            result = next(iter(cabinet.do_action(action)))
+            paths = json.loads(result.body.to_pybytes())
+        return cls(paths, target, **kwargs)
+
+    def submit(
+        self,
+        employee_id: Any,
+        contract: Callable,
+        columns: Sequence[int],
+        **kwargs: Any
+    ) -> Future:
+        """Start a contract.
+
+        Parameters
+        ----------
+        employee_id: Any
+            Identifies the employee; it must be unique.
+        contract: Callable
+            The contract to run.
+        columns: Sequence[int]
+            The indices of the purchased features.
+        **kwargs: Any
+            Passed to the contract.
+
+        Returns
+        -------
+        future: concurrent.futures.Future
+            Resolves to a ContractResult.
+        """
+        with self._lock:
+            if employee_id in self._slots:
+                raise ValueError(f"Employee {employee_id} already has a contract.")
+            if not self._free:
+                raise RuntimeError("The executor has run out of contracts.")
+            slot = self._free.pop()
+            self._cancelled[slot] = 0
+            self._slots[employee_id] = slot
+            future = self._pool.submit(
+                _run, employee_id, slot, contract, list(columns), kwargs
+            )
+            self._futures[employee_id] = future
+        future.add_done_callback(_account)
+        future.add_done_callback(lambda _: self._release(employee_id))
+        return future
+
+    def _release(self, employee_id: Any):
+        """Forget a finished contract and free its slot."""
+        with self._lock:
+            self._futures.pop(employee_id)
+            self._free.append(self._slots.pop(employee_id))
+
+    def cancel(self, employee_id: Any) -> bool:
+        """Fire an employee.
+
+        A contract which is still queued is never run. A running
+        contract sees cancelled() return True. The pool hands a
+        contract or two to the workers ahead of time, and those
+        return at once without running.
+
+        Returns
+        -------
+        dropped: bool
+            Whether the contract was dropped before it started. This
+            is False if the contract has already finished.
+        """
+        with self._lock:
+            if employee_id not in self._slots:
+                return False
+            self._cancelled[self._slots[employee_id]] = 1
+            future = self._futures[employee_id]
+        return future.cancel()
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers."""
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # If the caller failed nobody is left to fire the employees.
+        if exc_type is not None:
+            for employee_id in list(self._slots):
+                self.cancel(employee_id)
+        self.shutdown()
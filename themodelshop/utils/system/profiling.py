@@ -0,0 +1,313 @@
+"""Tags the actions agents take with what they cost.
+
+Any action can be tracked with track, which is both a decorator and
+a context manager. Every tracked action adds a row to a ledger with
+the wall time, the CPU time, the bytes read and written, the bytes
+allocated by Arrow, and optionally the peak memory allocated by
+Python. Rows are written into preallocated NumPy columns; the ledger
+keeps the most recent rows and can be queried as a PyArrow table.
+
+Bytes read and written cannot be seen from outside an action, so the
+code being tracked reports them with record_read and record_written,
+which add to the innermost tracked action on the current thread. CPU
+time is measured for the whole process, so work handed to a thread
+pool is included, as is the work of any other thread running at the
+same time.
+
+Peak memory is measured with tracemalloc from the start of an action.
+Python 3.8 cannot reset the peak, so there it is measured from when
+tracing started, which is the start of the outermost action measuring
+memory.
+
+Tracking can be switched off with disable, after which a tracked
+function costs one extra function call and a flag check.
+"""
+import functools
+import numpy as np
+import pyarrow as pa
+import threading
+import time
+import tracemalloc
+
+from typing import (
+    Any,
+    Callable
+)
+
+_STATE = threading.local()
+_ENABLED = True
+# Python 3.8 has no tracemalloc.reset_peak.
+_RESET_PEAK = getattr(tracemalloc, 'reset_peak', None)
+
+
+def enable():
+    """Turn tracking on."""
+    global _ENABLED
+    _ENABLED = True
+
+
+def disable():
+    """Turn tracking off."""
+    global _ENABLED
+    _ENABLED = False
+
+
+def enabled() -> bool:
+    """Whether tracking is on."""
+    return _ENABLED
+
+
+class CostLedger():
+    """A columnar record of the cost of actions.
+
+    Parameters
+    ----------
+    capacity: int = 100000
+        The number of actions kept. Once full, the oldest actions are
+        overwritten.
+    """
+    _COLUMNS = dict(
+        action=np.int32,
+        agent_id=np.int64,
+        timestamp=np.int64,
+        wall_time=np.float64,
+        cpu_time=np.float64,
+        bytes_read=np.int64,
+        bytes_written=np.int64,
+        arrow_allocated=np.int64,
+        peak_memory=np.int64,
+    )
+
+    def __init__(self, capacity: int = 100000):
+        self._capacity = capacity
+        self._columns = {
+            name: np.zeros(capacity, dtype=dtype)
+            for name, dtype in self._COLUMNS.items()
+        }
+        self._actions = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self._count, self._capacity)
+
+    def record(
+        self,
+        action: str,
+        agent_id: int = -1,
+        wall_time: float = 0.,
+        cpu_time: float = 0.,
+        bytes_read: int = 0,
+        bytes_written: int = 0,
+        arrow_allocated: int = 0,
+        peak_memory: int = -1,
+        timestamp: int = None
+    ):
+        """Add the cost of one action.
+
+        A peak_memory of -1 means peak memory was not measured.
+        """
+        if timestamp is None:
+            timestamp = time.time_ns()
+        with self._lock:
+            code = self._actions.setdefault(action, len(self._actions))
+            row = self._count % self._capacity
+            columns = self._columns
+            columns['action'][row] = code
+            columns['agent_id'][row] = agent_id
+            columns['timestamp'][row] = timestamp
+            columns['wall_time'][row] = wall_time
+            columns['cpu_time'][row] = cpu_time
+            columns['bytes_read'][row] = bytes_read
+            columns['bytes_written'][row] = bytes_written
+            columns['arrow_allocated'][row] = arrow_allocated
+            columns['peak_memory'][row] = peak_memory
+            self._count += 1
+
+    def to_table(self) -> pa.Table:
+        """The recorded actions, oldest first."""
+        with self._lock:
+            n = len(self)
+            rows = (np.arange(self._count - n, self._count)) % self._capacity
+            columns = {name: column[rows] for name, column in self._columns.items()}
+            names = pa.array(list(self._actions), pa.string())
+        columns['action'] = pa.DictionaryArray.from_arrays(
+            pa.array(columns['action']), names
+        )
+        columns['timestamp'] = pa.array(columns['timestamp'], pa.timestamp('ns'))
+        return pa.table(columns)
+
+    def summary(self, by: str = 'action') -> pa.Table:
+        """Total the cost of actions.
+
+        Parameters
+        ----------
+        by: str = 'action'
+            The field to group by, i.e. 'agent_id'.
+
+        Returns
+        -------
+        summary: pyarrow.Table
+            The number of actions and the total of every cost in each
+            group, along with the largest peak memory.
+        """
+        tbl = self.to_table()
+        if by == 'action':
+            tbl = tbl.set_column(0, 'action', tbl['action'].cast(pa.string()))
+        totals = [
+            'wall_time', 'cpu_time', 'bytes_read', 'bytes_written', 'arrow_allocated'
+        ]
+        summary = tbl.group_by(by).aggregate(
+            [(by, 'count')]
+            + [(name, 'sum') for name in totals]
+            + [('peak_memory', 'max')]
+        )
+        return summary.select(
+            [by, f"{by}_count"] + [f"{name}_sum" for name in totals] + ['peak_memory_max']
+        ).rename_columns(
+            [by, 'count'] + totals + ['peak_memory']
+        ).sort_by(by)
+
+    def clear(self):
+        """Forget every recorded action."""
+        with self._lock:
+            self._count = 0
+
+
+# The ledger actions are recorded in unless another is passed.
+LEDGER = CostLedger()
+
+
+def _active() -> list:
+    """The stack of tracked actions on this thread."""
+    try:
+        return _STATE.stack
+    except AttributeError:
+        _STATE.stack = []
+        return _STATE.stack
+
+
+def record_read(nbytes: int):
+    """Add to the bytes read by the current action, if any."""
+    stack = _active()
+    if stack:
+        stack[-1].bytes_read += nbytes
+
+
+def record_written(nbytes: int):
+    """Add to the bytes written by the current action, if any."""
+    stack = _active()
+    if stack:
+        stack[-1].bytes_written += nbytes
+
+
+class track():
+    """Record the cost of an action.
+
+    This is a context manager,
+
+        with track('fit', agent_id=3):
+            ...
+
+    and a decorator,
+
+        @track('fit')
+        def fit(...):
+            ...
+
+    Parameters
+    ----------
+    action: str
+        The name of the action. Decorated functions default to the
+        qualified name of the function.
+    agent_id: int = -1
+        The agent taking the action.
+    memory: bool = False
+        Also measure the peak memory allocated by Python with
+        tracemalloc, which slows down the action considerably.
+    ledger: CostLedger = None
+        The ledger to record in. This defaults to LEDGER.
+    """
+    def __init__(
+        self,
+        action: str = None,
+        agent_id: int = -1,
+        memory: bool = False,
+        ledger: CostLedger = None
+    ):
+        self.action = action
+        self.agent_id = agent_id
+        self.memory = memory
+        self.ledger = ledger
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def __call__(self, func: Callable) -> Callable:
+        action = self.action or func.__qualname__
+        agent_id, memory, ledger = self.agent_id, self.memory, self.ledger
+
+        @functools.wraps(func)
+        def tracked(*args: Any, **kwargs: Any) -> Any:
+            if not _ENABLED:
+                return func(*args, **kwargs)
+            with track(action, agent_id, memory, ledger):
+                return func(*args, **kwargs)
+        return tracked
+
+    def __enter__(self) -> 'track':
+        self._on = _ENABLED
+        if not self._on:
+            return self
+        self.bytes_read = 0
+        self.bytes_written = 0
+        # The peaks of nested actions, which reset the peak traced.
+        self._peak = -1
+        if self.memory:
+            self._tracing = tracemalloc.is_tracing()
+            if not self._tracing:
+                tracemalloc.start()
+            elif _RESET_PEAK is not None:
+                # Keep the peak so far for the enclosing actions.
+                self._outer_peak = tracemalloc.get_traced_memory()[1]
+                _RESET_PEAK()
+        _active().append(self)
+        self._arrow = pa.total_allocated_bytes()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        if not self._on:
+            return
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        allocated = pa.total_allocated_bytes() - self._arrow
+        stack = _active()
+        stack.pop()
+        # Whatever this action read or wrote, its caller did as well.
+        if stack:
+            stack[-1].bytes_read += self.bytes_read
+            stack[-1].bytes_written += self.bytes_written
+        peak = -1
+        if self.memory:
+            peak = max(tracemalloc.get_traced_memory()[1], self._peak)
+            if not self._tracing:
+                tracemalloc.stop()
+            elif _RESET_PEAK is not None:
+                # The peak was reset on entry, so hand the peak from
+                # before to the enclosing action measuring memory.
+                for outer in reversed(stack):
+                    if outer.memory:
+                        outer._peak = max(outer._peak, self._outer_peak, peak)
+                        break
+        ledger = LEDGER if self.ledger is None else self.ledger
+        ledger.record(
+            self.action,
+            self.agent_id,
+            wall,
+            cpu,
+            self.bytes_read,
+            self.bytes_written,
+            allocated,
+            peak
+        )